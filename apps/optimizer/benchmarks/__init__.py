@@ -0,0 +1 @@
+"""Scaling benchmarks for the optimization engine."""
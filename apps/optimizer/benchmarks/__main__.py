@@ -0,0 +1,45 @@
+"""Command line entry point: ``python -m benchmarks``."""
+import argparse
+import json
+import sys
+
+from .generator import SIZES
+from .runner import compare_reports, run_benchmarks
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Benchmark the optimization engine on synthetic rosters.')
+    parser.add_argument('--sizes', nargs='+', default=['small', 'medium'], choices=sorted(SIZES))
+    parser.add_argument('--seeds', nargs='+', type=int, default=[0])
+    parser.add_argument('--time-limit', type=float, default=10.0, help='CP-SAT time limit per case, in seconds')
+    parser.add_argument('--workers', type=int, default=None, help='CP-SAT search workers (default: all cores)')
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='JSON report to compare against; exit 1 on regressions')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Relative slack before a metric regresses')
+    args = parser.parse_args(argv)
+
+    configs = [SIZES[size].model_copy(update={'seed': seed}) for size in args.sizes for seed in args.seeds]
+    report = run_benchmarks(configs, time_limit=args.time_limit, num_workers=args.workers)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report['regressions'] = compare_reports(json.load(baseline_file), report, args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            output_file.write(text + '\n')
+    else:
+        print(text)
+
+    for regression in report.get('regressions', []):
+        print(
+            f"Regression in {regression['name']} (seed {regression['seed']}): {regression['metric']} "
+            f"{regression['baseline']} -> {regression['current']}",
+            file=sys.stderr
+        )
+    return 1 if report.get('regressions') else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+"""Seeded synthetic roster generator."""
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from pydantic import BaseModel, Field
+
+from src.models.optimization_request import OptimizationRequest
+
+
+class InstanceConfig(BaseModel):
+    """Size and density of a synthetic optimization request."""
+    name: str = 'custom'
+    seed: int = 0
+    num_employees: int = Field(default=20, ge=1)
+    num_days: int = Field(default=7, ge=1)
+    shifts_per_day: int = Field(default=3, ge=1, le=6, description="Shifts per department and day")
+    num_departments: int = Field(default=1, ge=1)
+    num_skills: int = Field(default=5, ge=1)
+    skills_per_employee: int = Field(default=2, ge=1)
+    skill_density: float = Field(
+        default=0.5, ge=0.0, le=1.0, description="Chance that a shift requires one of the skills"
+    )
+    availability_density: float = Field(
+        default=0.3, ge=0.0, le=1.0, description="Share of employees with an availability pattern"
+    )
+    available_days: int = Field(default=5, ge=1, le=7, description="Days per week in a pattern")
+    min_staffing: int = Field(default=1, ge=0)
+    max_staffing: int = Field(default=3, ge=1)
+    constraint_types: List[str] = ['max_hours', 'min_rest']
+    objective: str = 'minimize_cost'
+
+
+# Preset sizes, from unit-test scale to a departmental month
+SIZES: Dict[str, InstanceConfig] = {
+    'tiny': InstanceConfig(name='tiny', num_employees=5, num_days=3, shifts_per_day=2),
+    'small': InstanceConfig(name='small', num_employees=20, num_days=7),
+    'medium': InstanceConfig(
+        name='medium', num_employees=60, num_days=14, num_departments=2, num_skills=10,
+        constraint_types=['max_hours', 'min_rest', 'max_consecutive_days']
+    ),
+    'large': InstanceConfig(
+        name='large', num_employees=150, num_days=28, num_departments=3, num_skills=20,
+        skills_per_employee=3,
+        constraint_types=['max_hours', 'min_rest', 'max_consecutive_days', 'min_consecutive_days']
+    ),
+}
+
+# Shift start hours and lengths by number of shifts per day
+_SHIFT_PATTERNS = {
+    1: [(9, 8)],
+    2: [(7, 8), (15, 8)],
+    3: [(6, 8), (14, 8), (22, 8)],
+    4: [(6, 6), (12, 6), (18, 6), (0, 6)],
+    5: [(6, 5), (11, 5), (16, 5), (21, 5), (2, 4)],
+    6: [(0, 4), (4, 4), (8, 4), (12, 4), (16, 4), (20, 4)],
+}
+
+_CONSTRAINT_RULES = {
+    'max_hours': {'maxHours': 40, 'periodInDays': 7, 'maxHoursPerDay': 12},
+    'min_rest': {'minRestHours': 11},
+    'max_consecutive_days': {'maxDays': 5},
+    'min_consecutive_days': {'minDays': 2},
+    'fair_distribution': {'maxShiftsPerEmployee': 20},
+}
+
+_START = datetime(2024, 1, 1, tzinfo=timezone.utc)  # a Monday
+
+
+def generate_request(config: InstanceConfig) -> OptimizationRequest:
+    """Build a reproducible optimization request for ``config``.
+
+    The same config (including ``seed``) always yields the same request.
+    Shifts only require skills some employee holds, and staffing is kept
+    within the headcount of each skill, so generated requests are rarely
+    rejected by the feasibility pre-check.
+    """
+    rng = random.Random(config.seed)
+    skills = [f'skill-{idx}' for idx in range(config.num_skills)]
+
+    employees = []
+    for emp_idx in range(config.num_employees):
+        employee = {
+            'id': f'emp-{emp_idx}',
+            'name': f'Employee {emp_idx}',
+            'email': f'emp{emp_idx}@example.com',
+            'skills': [{'name': name} for name in rng.sample(skills, min(config.skills_per_employee, len(skills)))],
+        }
+        if rng.random() < config.availability_density:
+            employee['availability_pattern'] = {'windows': _availability_windows(rng, config.available_days)}
+        employees.append(employee)
+
+    skill_holders = {name: sum(any(s['name'] == name for s in e['skills']) for e in employees) for name in skills}
+    held_skills = [name for name in skills if skill_holders[name]]
+    shifts = []
+    for day in range(config.num_days):
+        date = _START + timedelta(days=day)
+        for dept_idx in range(config.num_departments):
+            for slot, (hour, length) in enumerate(_SHIFT_PATTERNS[config.shifts_per_day]):
+                start = date + timedelta(hours=hour)
+                required = []
+                if rng.random() < config.skill_density:
+                    required = [rng.choice(held_skills)]
+                headcount = skill_holders[required[0]] if required else config.num_employees
+                min_staffing = min(config.min_staffing, max(headcount // config.shifts_per_day, 1))
+                shifts.append({
+                    'id': f'shift-{dept_idx}-{day}-{slot}',
+                    'department_id': f'dept-{dept_idx}',
+                    'required_skills': required,
+                    'min_staffing': min_staffing,
+                    'max_staffing': max(config.max_staffing, min_staffing),
+                    'start_time': _iso(start),
+                    'end_time': _iso(start + timedelta(hours=length)),
+                })
+
+    constraints = [
+        {'id': f'{constraint_type}-1', 'type': constraint_type, 'rules': dict(_CONSTRAINT_RULES[constraint_type])}
+        for constraint_type in config.constraint_types
+    ]
+    return OptimizationRequest(
+        employees=employees,
+        shifts=shifts,
+        constraints=constraints,
+        startDate=_iso(_START),
+        endDate=_iso(_START + timedelta(days=config.num_days)),
+        options={'objective': config.objective, 'solutionCount': 1},
+    )
+
+
+def _availability_windows(rng: random.Random, available_days: int) -> List[Dict]:
+    """Daytime, evening or all-day windows on ``available_days`` weekdays."""
+    start, end = rng.choice([('06:00', '18:00'), ('12:00', '23:59'), ('00:00', '23:59')])
+    return [
+        {'dayOfWeek': day, 'startTime': start, 'endTime': end}
+        for day in sorted(rng.sample(range(7), available_days))
+    ]
+
+
+def _iso(value: datetime) -> str:
+    return value.strftime('%Y-%m-%dT%H:%M:%SZ')
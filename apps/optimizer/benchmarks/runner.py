@@ -0,0 +1,142 @@
+"""Benchmark runner: solves generated instances and reports engine metrics."""
+import multiprocessing
+import os
+import platform
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
+
+import ortools
+
+from src.solvers.optimization_engine import OptimizationEngine
+from src.solvers.problem_instance import compile_request
+
+from .generator import InstanceConfig, generate_request
+
+# Metrics compared against a baseline report (lower is better), with the
+# absolute change below which a difference is treated as noise
+COMPARED_METRICS = {
+    'buildTimeMs': 20.0,
+    'solveTimeMs': 50.0,
+    'firstSolutionMs': 50.0,
+    'peakRssMb': 10.0,
+    'objective': 0.0,
+}
+
+
+def run_case(config: InstanceConfig, time_limit: float, num_workers: Optional[int] = None) -> Dict:
+    """Solve one generated instance with the engine and measure it.
+
+    Build time is everything outside CP-SAT's own wall time: eligibility,
+    variables, hints, constraints and objective, plus materializing the
+    solutions. Time to first solution counts from the start of the search.
+    Peak RSS is the high-water mark of the current process, so
+    :func:`run_benchmarks` runs each case in a fresh process.
+    """
+    request = generate_request(config)
+    options = request.get_options().model_copy(update={'maxOptimizationTime': max(int(time_limit), 1)})
+    instance = compile_request(request)
+    incumbents: List[Dict] = []
+    engine = OptimizationEngine(
+        employees=instance.employees,
+        shifts=instance.shifts,
+        constraints=request.get_constraints(),
+        current_schedules=[],
+        options=options,
+        instance=instance,
+        num_workers=num_workers,
+        on_solution=incumbents.append
+    )
+    engine.solver.parameters.max_time_in_seconds = float(time_limit)
+
+    started = time.perf_counter()
+    solutions = engine.solve()
+    total_ms = (time.perf_counter() - started) * 1000
+    solve_ms = engine.solver.WallTime() * 1000
+    proto = engine.model.Proto()
+
+    return {
+        'name': config.name,
+        'seed': config.seed,
+        'employees': instance.num_employees,
+        'shifts': instance.num_shifts,
+        'days': instance.num_days,
+        'eligiblePairs': len(engine.eligibility.pairs),
+        'variables': len(proto.variables),
+        'constraints': len(proto.constraints),
+        'status': engine.solver.StatusName(engine.status),
+        'objective': solutions[0]['score'] if solutions else None,
+        'bound': engine.solver.BestObjectiveBound() if solutions else None,
+        'buildTimeMs': round(total_ms - solve_ms, 1),
+        'solveTimeMs': round(solve_ms, 1),
+        'firstSolutionMs': round(incumbents[0]['solveTime'], 1) if incumbents else None,
+        'peakRssMb': round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1),
+    }
+
+
+def run_benchmarks(
+    configs: List[InstanceConfig],
+    time_limit: float = 10.0,
+    num_workers: Optional[int] = None,
+    isolate: bool = True,
+) -> Dict:
+    """Run every case and return a machine-readable report.
+
+    With ``isolate`` each case runs in its own spawned process, so peak RSS
+    is per case and no state leaks between cases.
+    """
+    cases = []
+    for config in configs:
+        if isolate:
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                cases.append(pool.submit(run_case, config, time_limit, num_workers).result())
+        else:
+            cases.append(run_case(config, time_limit, num_workers))
+
+    return {
+        'createdAt': datetime.now(timezone.utc).isoformat(),
+        'environment': {
+            'python': platform.python_version(),
+            'ortools': ortools.__version__,
+            'platform': platform.platform(),
+            'cpuCount': os.cpu_count(),
+        },
+        'timeLimit': time_limit,
+        'numWorkers': num_workers,
+        'cases': cases,
+    }
+
+
+def compare_reports(baseline: Dict, current: Dict, tolerance: float = 0.25) -> List[Dict]:
+    """Metrics of ``current`` more than ``tolerance`` worse than in ``baseline``.
+
+    Cases are matched by name and seed. Every compared metric, including
+    the minimized objective, is better when lower; differences below the
+    metric's noise floor are ignored. Cases that were solved in the
+    baseline but not now are always reported.
+    """
+    baseline_cases = {(case['name'], case['seed']): case for case in baseline['cases']}
+    regressions = []
+    for case in current['cases']:
+        before = baseline_cases.get((case['name'], case['seed']))
+        if before is None:
+            continue
+        if before['objective'] is not None and case['objective'] is None:
+            regressions.append({
+                'name': case['name'], 'seed': case['seed'], 'metric': 'objective',
+                'baseline': before['objective'], 'current': None,
+            })
+            continue
+        for metric, noise in COMPARED_METRICS.items():
+            old, new = before.get(metric), case.get(metric)
+            if old is None or new is None:
+                continue
+            change = new - old
+            if change > noise and change > tolerance * abs(old):
+                regressions.append({
+                    'name': case['name'], 'seed': case['seed'], 'metric': metric, 'baseline': old, 'current': new,
+                })
+    return regressions
@@ -0,0 +1,239 @@
+"""Columnar request bodies (MessagePack, Arrow IPC) decoded straight into arrays."""
+import json
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from ..models.employee_model import AvailabilityWindow, Employee
+from ..models.optimization_request import ColumnarRequest
+from ..models.schedule_model import Shift
+from ..solvers.problem_instance import local_week_minutes
+
+MSGPACK_TYPES = ('application/msgpack', 'application/x-msgpack', 'application/vnd.msgpack')
+ARROW_TYPES = ('application/vnd.apache.arrow.stream',)
+
+_EMPLOYEE_COLUMNS = ('id',)
+_SHIFT_COLUMNS = ('id', 'department_id', 'min_staffing', 'max_staffing', 'start', 'end')
+
+
+class UnsupportedFormatError(Exception):
+    """Raised for a body type that is unknown or whose decoder is not installed."""
+
+
+def decode_request(body: bytes, content_type: str) -> ColumnarRequest:
+    """Decode a MessagePack or Arrow IPC stream body by its content type.
+
+    Raises UnsupportedFormatError for other types and ValueError for
+    malformed payloads.
+    """
+    media_type = content_type.split(';')[0].strip().lower()
+    if media_type in MSGPACK_TYPES:
+        payload = _load_msgpack(body)
+    elif media_type in ARROW_TYPES:
+        payload = _load_arrow(body)
+    else:
+        supported = ', '.join(MSGPACK_TYPES + ARROW_TYPES)
+        raise UnsupportedFormatError(f"Unsupported content type '{media_type}'; use one of {supported}")
+    if not isinstance(payload, Mapping):
+        raise ValueError('Columnar body must be a map of request fields')
+    return build_request(payload)
+
+
+def build_request(payload: Mapping[str, Any]) -> ColumnarRequest:
+    """Build a request from decoded fields with columnar ``employees`` and ``shifts``.
+
+    ``employees`` and ``shifts`` map column names to equally long sequences.
+    Shift ``start`` and ``end`` are UTC epoch seconds and the optional
+    ``utc_offset_minutes`` gives each shift's local offset. The remaining
+    fields (constraints, currentSchedules, startDate, endDate, options) are
+    as in the JSON request. Malformed columns raise ValueError.
+    """
+    employees = _employees(payload.get('employees') or dict.fromkeys(_EMPLOYEE_COLUMNS, []))
+    shifts, shift_times = _shifts(payload.get('shifts') or dict.fromkeys(_SHIFT_COLUMNS, []))
+    return ColumnarRequest.from_models(
+        employees,
+        shifts,
+        shift_times,
+        constraints=payload.get('constraints') or [],
+        currentSchedules=payload.get('currentSchedules'),
+        startDate=payload.get('startDate'),
+        endDate=payload.get('endDate'),
+        options=payload.get('options'),
+    )
+
+
+def _load_msgpack(body: bytes) -> Any:
+    try:
+        import msgpack
+    except ImportError:
+        raise UnsupportedFormatError('MessagePack bodies need the msgpack package')
+    return msgpack.unpackb(body, raw=False)
+
+
+def _load_arrow(body: bytes) -> Dict[str, Any]:
+    """Read the shifts table of an Arrow IPC stream.
+
+    The stream's schema metadata holds the rest of the request, including
+    the employee columns, as JSON under ``request``.
+    """
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise UnsupportedFormatError('Arrow bodies need the pyarrow package')
+    table = pa.ipc.open_stream(pa.py_buffer(body)).read_all()
+    metadata = table.schema.metadata or {}
+    if b'request' not in metadata:
+        raise ValueError("Arrow stream needs the request fields as 'request' schema metadata")
+    payload = json.loads(metadata[b'request'])
+    payload['shifts'] = {
+        name: column.to_numpy() if pa.types.is_integer(column.type) else column.to_pylist()
+        for name, column in zip(table.column_names, table.columns)
+    }
+    return payload
+
+
+def _employees(columns: Mapping[str, Sequence]) -> List[Employee]:
+    """Employee models from employee columns."""
+    num_rows = _num_rows(columns, _EMPLOYEE_COLUMNS, 'employees')
+    ids = _strings(columns, 'id', 'employees')
+    names = _strings(columns, 'name', 'employees') if 'name' in columns else [''] * num_rows
+    emails = _strings(columns, 'email', 'employees') if 'email' in columns else [''] * num_rows
+    skills = _string_lists(columns, 'skills', num_rows, 'employees')
+    availability = _availability_patterns(columns, num_rows)
+    metadata = _mappings(columns, 'metadata', num_rows, 'employees')
+    return [
+        Employee.model_construct(
+            id=ids[idx],
+            name=names[idx],
+            email=emails[idx],
+            skills=[{'name': name} for name in skills[idx]] if skills[idx] is not None else None,
+            availability_pattern=availability[idx],
+            metadata=metadata[idx],
+        )
+        for idx in range(num_rows)
+    ]
+
+
+def _shifts(columns: Mapping[str, Sequence]) -> Tuple[List[Shift], Tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Shift models and their (start, end, week) minute arrays from shift columns."""
+    num_rows = _num_rows(columns, _SHIFT_COLUMNS, 'shifts')
+    ids = _strings(columns, 'id', 'shifts')
+    departments = _strings(columns, 'department_id', 'shifts')
+    start_seconds = _integers(columns, 'start')
+    end_seconds = _integers(columns, 'end')
+    min_staffing = _integers(columns, 'min_staffing')
+    max_staffing = _integers(columns, 'max_staffing')
+    offsets = _integers(columns, 'utc_offset_minutes') if 'utc_offset_minutes' in columns else np.zeros(
+        num_rows, dtype=np.int64
+    )
+    required_skills = _string_lists(columns, 'required_skills', num_rows, 'shifts')
+    metadata = _mappings(columns, 'metadata', num_rows, 'shifts')
+    if (min_staffing < 0).any():
+        raise ValueError('shifts.min_staffing must be at least 0')
+    if (max_staffing < 1).any():
+        raise ValueError('shifts.max_staffing must be at least 1')
+    if (end_seconds <= start_seconds).any():
+        raise ValueError('shifts.end must be after shifts.start')
+
+    start_times = _iso_strings(start_seconds, offsets)
+    end_times = _iso_strings(end_seconds, offsets)
+    min_values, max_values = min_staffing.tolist(), max_staffing.tolist()
+    shifts = [
+        Shift.model_construct(
+            id=ids[idx],
+            department_id=departments[idx],
+            required_skills=required_skills[idx],
+            min_staffing=min_values[idx],
+            max_staffing=max_values[idx],
+            start_time=start_times[idx],
+            end_time=end_times[idx],
+            metadata=metadata[idx],
+        )
+        for idx in range(num_rows)
+    ]
+    start_minutes = start_seconds // 60
+    return shifts, (start_minutes, end_seconds // 60, local_week_minutes(start_minutes, offsets))
+
+
+def _num_rows(columns: Mapping[str, Sequence], required: Sequence[str], table: str) -> int:
+    """Row count of a table, checking required columns and equal lengths."""
+    if not isinstance(columns, Mapping):
+        raise ValueError(f'{table} must map column names to values')
+    missing = [name for name in required if name not in columns]
+    if missing:
+        raise ValueError(f"{table} lacks column(s) {', '.join(missing)}")
+    for name, values in columns.items():
+        if isinstance(values, (str, bytes, Mapping)) or not isinstance(values, (Sequence, np.ndarray)):
+            raise ValueError(f'{table}.{name} must be a list of values')
+    lengths = {name: len(values) for name, values in columns.items()}
+    if len(set(lengths.values())) > 1:
+        raise ValueError(f'{table} columns differ in length: {lengths}')
+    return next(iter(lengths.values()), 0)
+
+
+def _column(columns: Mapping[str, Sequence], name: str, num_rows: int, default: Any) -> Sequence:
+    return columns[name] if name in columns else [default] * num_rows
+
+
+def _strings(columns: Mapping[str, Sequence], name: str, table: str) -> List[str]:
+    values = list(columns[name])
+    if not all(isinstance(value, str) for value in values):
+        raise ValueError(f'{table}.{name} must hold strings')
+    return values
+
+
+def _string_lists(columns: Mapping[str, Sequence], name: str, num_rows: int, table: str) -> List[Any]:
+    """Lists of strings (or None) per row; a bare string is not a list of names."""
+    values = []
+    for value in _column(columns, name, num_rows, None):
+        if value is not None:
+            if isinstance(value, (str, bytes, Mapping)) or not isinstance(value, (Sequence, np.ndarray)):
+                raise ValueError(f'{table}.{name} must hold lists of strings')
+            value = list(value)
+            if not all(isinstance(item, str) for item in value):
+                raise ValueError(f'{table}.{name} must hold lists of strings')
+        values.append(value)
+    return values
+
+
+def _mappings(columns: Mapping[str, Sequence], name: str, num_rows: int, table: str) -> Sequence:
+    values = _column(columns, name, num_rows, None)
+    if not all(value is None or isinstance(value, Mapping) for value in values):
+        raise ValueError(f'{table}.{name} must hold maps')
+    return values
+
+
+def _availability_patterns(columns: Mapping[str, Sequence], num_rows: int) -> Sequence:
+    """Availability patterns, with their windows checked as the JSON models would."""
+    patterns = _mappings(columns, 'availability_pattern', num_rows, 'employees')
+    for pattern in patterns:
+        windows = (pattern or {}).get('windows') or []
+        if not isinstance(windows, list):
+            raise ValueError('employees.availability_pattern windows must be a list')
+        for window in windows:
+            AvailabilityWindow.model_validate(window)
+    return patterns
+
+
+def _integers(columns: Mapping[str, Sequence], name: str) -> np.ndarray:
+    values = np.asarray(columns[name])
+    if values.ndim != 1 or (values.size and not np.issubdtype(values.dtype, np.integer)):
+        raise ValueError(f'shifts.{name} must hold integers')
+    return values.astype(np.int64)
+
+
+def _iso_strings(epoch_seconds: np.ndarray, offset_minutes: np.ndarray) -> List[str]:
+    """ISO strings of epoch seconds in local time with their UTC offsets."""
+    local = (epoch_seconds + offset_minutes * 60).astype('datetime64[s]')
+    text = np.datetime_as_string(local, unit='s').tolist()
+    if not offset_minutes.any():
+        return [value + 'Z' for value in text]
+    return [value + _offset_suffix(offset) for value, offset in zip(text, offset_minutes.tolist())]
+
+
+def _offset_suffix(offset_minutes: int) -> str:
+    if offset_minutes == 0:
+        return 'Z'
+    sign = '+' if offset_minutes > 0 else '-'
+    hours, minutes = divmod(abs(offset_minutes), 60)
+    return f'{sign}{hours:02d}:{minutes:02d}'
@@ -0,0 +1,232 @@
+"""Bounded process-pool executor for CP-SAT solves."""
+import asyncio
+import importlib
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..models.optimization_request import OptimizationRequest, RepairRequest
+from ..solvers.model_cache import ModelCache
+from ..solvers.profiling import add_profiling_hook
+from ..solvers.repair_solver import RepairSolver
+from ..solvers.schedule_solver import ScheduleSolver
+from .metrics import SolverMetrics
+
+# Built models of this pool process, shared by the solves it runs
+_model_cache: Optional[ModelCache] = None
+
+
+class SolverBusyError(Exception):
+    """Raised when every solve slot and queue position is taken."""
+
+
+def _init_worker(model_cache_size: int, profiling_hooks: Sequence[str] = ()):
+    """Create the model cache of a new pool process and register its profiling hooks."""
+    global _model_cache
+    _model_cache = ModelCache(model_cache_size) if model_cache_size else None
+    for path in profiling_hooks:
+        add_profiling_hook(resolve_hook(path))
+
+
+def resolve_hook(path: str) -> Callable[[str, float], None]:
+    """Import a profiling hook given as 'package.module:function'."""
+    module_name, _, attribute = path.partition(':')
+    if not attribute:
+        raise ValueError(f"Profiling hook '{path}' must look like 'package.module:function'")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def _solve_in_worker(
+    request: OptimizationRequest,
+    num_workers: int,
+    stop_event=None,
+    solution_queue=None,
+    hints: Optional[List[Tuple[str, str]]] = None,
+    start_event=None,
+) -> Dict:
+    """Run a solve, or a repair for a RepairRequest, inside a pool process.
+
+    ``start_event`` is set as the solve starts. Improving incumbents are put
+    on ``solution_queue`` as they are found, followed by ``None`` once the
+    search is over. Errors are re-raised as RuntimeError, since some (e.g.
+    pydantic's ValidationError) cannot be unpickled in the API process,
+    which would break the pool.
+    """
+    if start_event is not None:
+        start_event.set()
+    on_solution = solution_queue.put if solution_queue is not None else None
+    try:
+        if isinstance(request, RepairRequest):
+            solver = RepairSolver(num_workers=num_workers)
+        else:
+            solver = ScheduleSolver(num_workers=num_workers, model_cache=_model_cache)
+        return solver.solve(request, stop_event=stop_event, on_solution=on_solution, hints=hints)
+    except Exception as e:
+        raise RuntimeError(str(e)) from None
+    finally:
+        if solution_queue is not None:
+            solution_queue.put(None)
+
+
+class SolveExecutor:
+    """Runs solves in a process pool so they never block the event loop.
+
+    At most ``max_concurrent`` solves run at once; up to ``max_queued`` more
+    wait in the pool's queue, and anything beyond that is rejected with
+    :class:`SolverBusyError`. The CPU budget is split evenly so that the
+    CP-SAT search workers of all concurrent solves never exceed it. Each
+    pool process keeps its last ``model_cache_size`` built models and
+    registers the ``profiling_hooks`` ('package.module:function' paths),
+    since hooks added in this process never see pool solves. Finished
+    solves are recorded in ``metrics``.
+
+    A pool broken by a dying worker (e.g. killed for running out of memory)
+    fails the solves it held and is replaced for the next submission.
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int,
+        max_queued: int,
+        cpu_budget: int,
+        start_method: str = 'spawn',
+        model_cache_size: int = 0,
+        metrics: Optional[SolverMetrics] = None,
+        profiling_hooks: Sequence[str] = (),
+    ):
+        self.max_concurrent = max(1, min(max_concurrent, cpu_budget))
+        self.max_queued = max_queued
+        self.workers_per_solve = max(1, cpu_budget // self.max_concurrent)
+        self.model_cache_size = model_cache_size
+        self.metrics = metrics
+        # Resolve now so that a bad path fails at startup, not in every worker
+        for path in profiling_hooks:
+            resolve_hook(path)
+        self.profiling_hooks = tuple(profiling_hooks)
+        self._context = multiprocessing.get_context(start_method)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def active(self) -> int:
+        """Number of solves currently running."""
+        return min(self._pending, self.max_concurrent)
+
+    @property
+    def queued(self) -> int:
+        """Number of solves waiting for a free slot."""
+        return max(self._pending - self.max_concurrent, 0)
+
+    def create_stop_event(self):
+        """Create an event that stops a solve running in a pool process."""
+        return self._get_manager().Event()
+
+    def create_start_event(self):
+        """Create an event that a pool process sets when it starts a solve."""
+        return self._get_manager().Event()
+
+    def create_solution_queue(self):
+        """Create a queue that receives incumbents from a pool process."""
+        return self._get_manager().Queue()
+
+    def submit(
+        self,
+        request: OptimizationRequest,
+        stop_event=None,
+        solution_queue=None,
+        hints: Optional[List[Tuple[str, str]]] = None,
+        start_event=None,
+    ) -> Future:
+        """Queue a solve, raising SolverBusyError when the queue is full."""
+        with self._lock:
+            if self._pending >= self.max_concurrent + self.max_queued:
+                raise SolverBusyError(
+                    f'Solver at capacity ({self.active} running, {self.queued} queued)'
+                )
+            self._pending += 1
+            pool = self._get_pool()
+
+        args = (request, self.workers_per_solve, stop_event, solution_queue, hints, start_event)
+        try:
+            try:
+                future = pool.submit(_solve_in_worker, *args)
+            except BrokenProcessPool:
+                # A worker died since the last submission; retry on a fresh pool
+                self._discard_pool(pool)
+                with self._lock:
+                    pool = self._get_pool()
+                future = pool.submit(_solve_in_worker, *args)
+        except Exception:
+            self._release()
+            raise
+        # Release the slot when the solve finishes, even if the client went away
+        future.add_done_callback(self._release)
+        future.add_done_callback(partial(self._discard_if_broken, pool))
+        if self.metrics is not None:
+            future.add_done_callback(partial(self._observe, request))
+        return future
+
+    async def solve(
+        self,
+        request: OptimizationRequest,
+        stop_event=None,
+        hints: Optional[List[Tuple[str, str]]] = None,
+    ) -> Dict:
+        """Solve a request in the pool and wait for the result."""
+        return await asyncio.wrap_future(self.submit(request, stop_event, hints=hints))
+
+    def shutdown(self):
+        """Stop the pool, cancelling queued solves."""
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+            if self._manager is not None:
+                self._manager.shutdown()
+                self._manager = None
+
+    def _release(self, _future=None):
+        """Free a slot taken by a finished or failed submission."""
+        with self._lock:
+            self._pending -= 1
+
+    def _discard_if_broken(self, pool: ProcessPoolExecutor, future: Future):
+        """Drop the pool of a solve that failed because a worker died."""
+        if not future.cancelled() and isinstance(future.exception(), BrokenProcessPool):
+            self._discard_pool(pool)
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        """Shut down a broken pool so the next submission creates a new one."""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    def _observe(self, request: OptimizationRequest, future: Future):
+        """Record a finished solve in the metrics; cancelled solves never ran."""
+        if future.cancelled():
+            return
+        self.metrics.observe(request, None if future.exception() is not None else future.result())
+
+    def _get_manager(self):
+        """Start the multiprocessing manager that shares events and queues."""
+        with self._lock:
+            if self._manager is None:
+                self._manager = self._context.Manager()
+            return self._manager
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Create the process pool on first use."""
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_concurrent,
+                mp_context=self._context,
+                initializer=_init_worker,
+                initargs=(self.model_cache_size, self.profiling_hooks),
+            )
+        return self._pool
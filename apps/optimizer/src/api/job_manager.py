@@ -0,0 +1,181 @@
+"""Asynchronous optimization jobs: submit, poll, cancel and retain results."""
+import asyncio
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import Future
+from functools import partial
+from typing import Any, Dict, NamedTuple, Optional, Set
+
+from ..models.job_model import Job, JobStatus
+from ..models.optimization_request import OptimizationRequest
+from .executor import SolveExecutor
+from .job_store import JobStore
+from .solution_cache import SolutionCache
+
+
+class _LiveJob(NamedTuple):
+    """Handles of a job whose solve has not finished yet."""
+    future: Future
+    stop_event: Any
+    solution_queue: Any
+    start_event: Any
+
+
+class JobManager:
+    """Runs optimization jobs on the solve executor and tracks their state.
+
+    Finished jobs are written to the store with an ``expiresAt`` of
+    ``ttl_seconds`` after completion and evicted lazily on later calls.
+    Each job records the process that runs it as its ``owner``. Jobs a
+    process on this host left queued or running when it exited can never
+    finish, so they are marked failed when the manager starts; jobs of
+    processes that are still alive, or of other hosts, are left alone.
+    Solves, cancel and accept are local to the owning process: with a
+    store shared by several processes, a request for another process's
+    job only reads its stored state.
+    Solves are warm-started from ``solution_cache``, which in turn remembers
+    the result of every job that completes without being cancelled.
+    """
+
+    def __init__(
+        self,
+        executor: SolveExecutor,
+        store: JobStore,
+        ttl_seconds: int,
+        solution_cache: Optional[SolutionCache] = None,
+    ):
+        self.executor = executor
+        self.store = store
+        self.ttl_seconds = ttl_seconds
+        self.solution_cache = solution_cache
+        self._requests: Dict[str, OptimizationRequest] = {}
+        self._live: Dict[str, _LiveJob] = {}
+        self._cancel_requested: Set[str] = set()
+        self._lock = threading.Lock()
+        self.owner = f'{socket.gethostname()}:{os.getpid()}'
+        self.store.fail_unfinished('Service restarted before the job finished', ttl_seconds, orphaned=_is_orphaned)
+
+    def submit(self, request: OptimizationRequest, stream: bool = False) -> Job:
+        """Queue a job, raising SolverBusyError when the executor is full.
+
+        With ``stream`` set, improving incumbents are published on a queue
+        available from :meth:`solution_queue` while the job runs.
+        """
+        self.store.evict_expired()
+        job = Job(id=f"job_{uuid.uuid4().hex[:12]}", createdAt=time.time(), owner=self.owner)
+        stop_event = self.executor.create_stop_event()
+        start_event = self.executor.create_start_event()
+        solution_queue = self.executor.create_solution_queue() if stream else None
+        hints = self.solution_cache.hints_for(request) if self.solution_cache is not None else None
+        future = self.executor.submit(request, stop_event, solution_queue, hints=hints, start_event=start_event)
+        self.store.save(job)
+        with self._lock:
+            self._live[job.id] = _LiveJob(future, stop_event, solution_queue, start_event)
+            self._requests[job.id] = request
+        future.add_done_callback(partial(self._finish, job.id))
+        return job
+
+    def solution_queue(self, job_id: str):
+        """Get the incumbent queue of a running streamed job, if any."""
+        with self._lock:
+            live = self._live.get(job_id)
+        return live.solution_queue if live else None
+
+    async def wait(self, job_id: str) -> Optional[Job]:
+        """Wait for a job to finish and return it."""
+        with self._lock:
+            live = self._live.get(job_id)
+        if live:
+            await asyncio.wait([asyncio.wrap_future(live.future)])
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job, or None if it is unknown or its result has expired.
+
+        A job counts as running once its pool process has set its start
+        event; the pool hands out more work than it has processes, so a
+        running future may still be waiting in a worker's queue.
+        """
+        self.store.evict_expired()
+        job = self.store.get(job_id)
+        if job and job.status == JobStatus.QUEUED:
+            with self._lock:
+                live = self._live.get(job_id)
+            if live and live.start_event.is_set():
+                job.status = JobStatus.RUNNING
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued job or stop the CP-SAT search of a running one.
+
+        A stopped search still reports the best solutions found so far.
+        """
+        with self._lock:
+            live = self._live.get(job_id)
+            if live:
+                self._cancel_requested.add(job_id)
+        if live and not live.future.cancel():
+            live.stop_event.set()
+        return self.get(job_id)
+
+    def accept(self, job_id: str) -> Optional[Job]:
+        """Stop the search of a job and keep its best solutions as completed."""
+        with self._lock:
+            live = self._live.get(job_id)
+        if live:
+            live.stop_event.set()
+        return self.get(job_id)
+
+    def _finish(self, job_id: str, future: Future):
+        """Record the outcome of a job once its solve future is done."""
+        with self._lock:
+            self._live.pop(job_id, None)
+            request = self._requests.pop(job_id, None)
+            cancel_requested = job_id in self._cancel_requested
+            self._cancel_requested.discard(job_id)
+
+        job = self.store.get(job_id)
+        if job is None:
+            return
+
+        if future.cancelled():
+            job.status = JobStatus.CANCELLED
+        elif future.exception() is not None:
+            job.status = JobStatus.FAILED
+            job.error = str(future.exception())
+        else:
+            job.result = future.result()
+            job.status = JobStatus.CANCELLED if cancel_requested else JobStatus.COMPLETED
+
+        if job.status == JobStatus.COMPLETED and self.solution_cache is not None and request:
+            self.solution_cache.remember(request, job.result)
+
+        job.finishedAt = time.time()
+        job.expiresAt = job.finishedAt + self.ttl_seconds
+        self.store.save(job)
+
+
+def _is_orphaned(owner: Optional[str]) -> bool:
+    """Check that the process owning a job is gone.
+
+    Only processes on this host can be checked. A job owned by this
+    process's pid was left by an earlier process that had the same pid;
+    jobs without an owner predate owners being recorded.
+    """
+    if owner is None:
+        return True
+    host, _, pid = owner.rpartition(':')
+    if host != socket.gethostname():
+        return False
+    if int(pid) == os.getpid():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        pass  # alive, but run by another user
+    return False
@@ -0,0 +1,169 @@
+"""Pluggable storage for optimization jobs with TTL-based eviction."""
+import heapq
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..models.job_model import Job, JobStatus
+
+
+class JobStore(ABC):
+    """Stores jobs and evicts finished ones once their ``expiresAt`` passes."""
+
+    @abstractmethod
+    def save(self, job: Job) -> None:
+        """Insert or replace a job."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        """Get a job by id, or None if unknown or evicted."""
+
+    @abstractmethod
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        """Remove expired jobs and return how many were removed."""
+
+    @abstractmethod
+    def fail_unfinished(
+        self,
+        error: str,
+        ttl_seconds: float,
+        now: Optional[float] = None,
+        orphaned: Optional[Callable[[Optional[str]], bool]] = None,
+    ) -> int:
+        """Mark queued and running jobs as failed, expiring ``ttl_seconds`` from now.
+
+        With ``orphaned``, only jobs whose ``owner`` it accepts are failed.
+        Returns how many jobs were failed.
+        """
+
+
+class InMemoryJobStore(JobStore):
+    """Process-local job store.
+
+    Expiry times are kept in a min-heap so eviction only touches jobs that
+    are actually due.
+    """
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._expiry: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job.model_copy()
+            if job.expiresAt is not None:
+                heapq.heappush(self._expiry, (job.expiresAt, job.id))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        evicted = 0
+        with self._lock:
+            while self._expiry and self._expiry[0][0] <= now:
+                _, job_id = heapq.heappop(self._expiry)
+                job = self._jobs.get(job_id)
+                if job and job.expiresAt is not None and job.expiresAt <= now:
+                    del self._jobs[job_id]
+                    evicted += 1
+        return evicted
+
+    def fail_unfinished(
+        self,
+        error: str,
+        ttl_seconds: float,
+        now: Optional[float] = None,
+        orphaned: Optional[Callable[[Optional[str]], bool]] = None,
+    ) -> int:
+        now = time.time() if now is None else now
+        failed = 0
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.is_finished() and (orphaned is None or orphaned(job.owner)):
+                    _fail(job, error, now, ttl_seconds)
+                    heapq.heappush(self._expiry, (job.expiresAt, job.id))
+                    failed += 1
+        return failed
+
+
+class SQLiteJobStore(JobStore):
+    """Job store backed by a SQLite file, shared across service restarts."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'id TEXT PRIMARY KEY, expires_at REAL, data TEXT NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS jobs_expires_at ON jobs (expires_at)'
+            )
+
+    def save(self, job: Job) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO jobs (id, expires_at, data) VALUES (?, ?, ?)',
+                (job.id, job.expiresAt, job.model_dump_json())
+            )
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT data FROM jobs WHERE id = ?', (job_id,)
+            ).fetchone()
+        return Job.model_validate_json(row[0]) if row else None
+
+    def evict_expired(self, now: Optional[float] = None) -> int:
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'DELETE FROM jobs WHERE expires_at IS NOT NULL AND expires_at <= ?', (now,)
+            )
+        return cursor.rowcount
+
+    def fail_unfinished(
+        self,
+        error: str,
+        ttl_seconds: float,
+        now: Optional[float] = None,
+        orphaned: Optional[Callable[[Optional[str]], bool]] = None,
+    ) -> int:
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            # Only unfinished jobs lack an expiry
+            rows = self._conn.execute('SELECT data FROM jobs WHERE expires_at IS NULL').fetchall()
+            jobs = [
+                job for job in (Job.model_validate_json(row[0]) for row in rows)
+                if not job.is_finished() and (orphaned is None or orphaned(job.owner))
+            ]
+            for job in jobs:
+                _fail(job, error, now, ttl_seconds)
+            self._conn.executemany(
+                'UPDATE jobs SET expires_at = ?, data = ? WHERE id = ?',
+                [(job.expiresAt, job.model_dump_json(), job.id) for job in jobs]
+            )
+        return len(jobs)
+
+
+def _fail(job: Job, error: str, now: float, ttl_seconds: float) -> None:
+    job.status = JobStatus.FAILED
+    job.error = error
+    job.finishedAt = now
+    job.expiresAt = now + ttl_seconds
+
+
+def create_job_store(kind: str, path: str) -> JobStore:
+    """Create the job store selected in settings ('memory' or 'sqlite')."""
+    if kind == 'memory':
+        return InMemoryJobStore()
+    if kind == 'sqlite':
+        return SQLiteJobStore(path)
+    raise ValueError(f"Unknown job store: {kind}")
@@ -0,0 +1,217 @@
+"""Prometheus metrics of solver throughput and latency."""
+import bisect
+import math
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from ..models.optimization_request import OptimizationRequest
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Histogram bounds in seconds, from model building to long searches
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Upper bounds of the instance-size label, in shifts per request
+SIZE_BUCKETS = (100, 500, 2000, 10000)
+
+# Objective label values; anything else is labelled 'other' to bound cardinality
+OBJECTIVES = ('minimize_cost', 'maximize_fairness', 'balance')
+
+# Profile phases that make up model building
+_BUILD_PHASES = ('eligibility', 'variables', 'model_cache', 'hints', 'objective')
+
+
+class _Metric(ABC):
+    """A named metric with one value per combination of label values."""
+
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _labels(self, labelvalues: Tuple[str, ...], extra: str = '') -> str:
+        pairs = [f'{name}="{_escape(value)}"' for name, value in zip(self.labelnames, labelvalues)]
+        if extra:
+            pairs.append(extra)
+        return '{' + ','.join(pairs) + '}' if pairs else ''
+
+    @abstractmethod
+    def samples(self) -> List[str]:
+        """Sample lines of every label combination."""
+
+    def render(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}', *self.samples()]
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0.0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return [f'{self.name}{self._labels(labels)} {_format(value)}' for labels, value in values]
+
+
+class Gauge(Counter):
+    """Value that goes up and down."""
+
+    kind = 'gauge'
+
+    def set(self, value: float, *labelvalues: str) -> None:
+        with self._lock:
+            self._values[labelvalues] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # label values -> (count per bucket plus +Inf, sum of observations)
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(labelvalues, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[position] += 1
+            total[0] += value
+
+    def count(self, *labelvalues: str) -> int:
+        entry = self._values.get(labelvalues)
+        return sum(entry[0]) if entry else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            values = sorted((labels, (list(counts), total[0])) for labels, (counts, total) in self._values.items())
+        lines = []
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                le = 'le="%s"' % _format(bound)
+                lines.append(f'{self.name}_bucket{self._labels(labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{self._labels(labels)} {_format(total)}')
+            lines.append(f'{self.name}_count{self._labels(labels)} {cumulative}')
+        return lines
+
+
+class SolverMetrics:
+    """Solver metrics of this API process, in the Prometheus text format.
+
+    Solves run in pool processes, so they are recorded here from their
+    results: latency from ``totalSolveTime``, time to first solution and
+    model build time from the result's ``profile``. Recording a solve takes
+    a few dict lookups under a lock, cheap enough to stay on for every
+    request.
+    """
+
+    def __init__(self):
+        labels = ('objective', 'size')
+        self.solve_duration = Histogram(
+            'optimizer_solve_duration_seconds', 'Wall time of solves.', labels
+        )
+        self.first_solution = Histogram(
+            'optimizer_first_solution_seconds', 'Time from the start of a solve to its first solution.', labels
+        )
+        self.model_build = Histogram(
+            'optimizer_model_build_seconds', 'Time spent building CP-SAT models for a solve.', labels
+        )
+        self.solves = Counter(
+            'optimizer_solves_total',
+            'Solves by outcome: OPTIMAL, FEASIBLE, INFEASIBLE, timeout, invalid or error.',
+            ('status',)
+        )
+        self.queue_depth = Gauge('optimizer_queue_depth', 'Solves waiting for a free slot.')
+        self.active_solves = Gauge('optimizer_active_solves', 'Solves currently running.')
+        self._metrics = [
+            self.solve_duration, self.first_solution, self.model_build,
+            self.solves, self.queue_depth, self.active_solves,
+        ]
+
+    def observe(self, request: OptimizationRequest, result: Optional[Dict]) -> None:
+        """Record a finished solve; ``result`` is None when it raised."""
+        if result is None:
+            self.solves.inc('error')
+            return
+        objective = request.get_options().objective
+        labels = (objective if objective in OBJECTIVES else 'other', size_bucket(request.num_shifts))
+        profile = result.get('profile') or {}
+        phases = profile.get('phases', {})
+        search = profile.get('search', {})
+
+        self.solves.inc(solve_status(result))
+        self.solve_duration.observe(result.get('totalSolveTime', 0) / 1000, *labels)
+        if search.get('firstSolutionTime') is not None:
+            self.first_solution.observe(search['firstSolutionTime'] / 1000, *labels)
+        if profile.get('model', {}).get('models'):
+            build_ms = sum(
+                ms for phase, ms in phases.items() if phase in _BUILD_PHASES or phase.startswith('constraints.')
+            )
+            self.model_build.observe(build_ms / 1000, *labels)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        return '\n'.join(line for metric in self._metrics for line in metric.render()) + '\n'
+
+
+def solve_status(result: Dict) -> str:
+    """Outcome label of a solver result.
+
+    CP-SAT's UNKNOWN, i.e. no solution within the time limit, is reported as
+    'timeout'; requests rejected by the feasibility pre-check count as
+    INFEASIBLE and requests without shifts in range as 'invalid'.
+    """
+    status = (result.get('profile') or {}).get('search', {}).get('status')
+    if status == 'UNKNOWN':
+        return 'timeout'
+    if status is None:
+        return 'INFEASIBLE' if 'infeasibility' in result else 'invalid'
+    if status == 'MODEL_INVALID':
+        return 'invalid'
+    return status
+
+
+def size_bucket(num_shifts: int) -> str:
+    """Instance-size label of a request with ``num_shifts`` shifts, e.g. '<=500'."""
+    for bound in SIZE_BUCKETS:
+        if num_shifts <= bound:
+            return f'<={bound}'
+    return f'>{SIZE_BUCKETS[-1]}'
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else f'{value:.1f}'
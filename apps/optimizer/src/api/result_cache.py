@@ -0,0 +1,251 @@
+"""Content-addressed cache of optimization results for identical requests."""
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from operator import attrgetter
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.optimization_request import ColumnarRequest, OptimizationRequest
+from ..solvers.problem_instance import date_range_mask, parse_epoch_minutes
+
+
+def request_key(request: OptimizationRequest) -> str:
+    """SHA-256 of the normalized request.
+
+    Items are hashed as validated from the payload, without building
+    models: employees, shifts, constraints and schedules are sorted by id,
+    shifts outside the date range and inactive constraints are dropped,
+    and options are resolved to :class:`OptimizationOptions`. The date
+    range itself is not hashed; it only matters through the shifts it
+    keeps. Columnar requests hash their columns instead of item dicts.
+    """
+    normalized = {
+        'constraints': _sorted_by_id(
+            constraint for constraint in request.constraints if constraint.get('active', True)
+        ),
+        'currentSchedules': _sorted_by_id(request.currentSchedules or []),
+        'options': request.get_options().model_dump(mode='json'),
+    }
+    digest = hashlib.sha256()
+    if isinstance(request, ColumnarRequest):
+        _hash_columns(digest, request)
+    else:
+        start_minutes = _epoch_minutes(request.shifts, 'start_time')
+        end_minutes = _epoch_minutes(request.shifts, 'end_time')
+        keep = date_range_mask(start_minutes, end_minutes, request.startDate, request.endDate)
+        normalized['employees'] = _sorted_by_id(request.employees)
+        normalized['shifts'] = _sorted_by_id(shift for shift, kept in zip(request.shifts, keep) if kept)
+    digest.update(_canonical_json(normalized))
+    return digest.hexdigest()
+
+
+def _hash_columns(digest: Any, request: ColumnarRequest) -> None:
+    """Feed the employee and shift columns of a columnar request to ``digest``.
+
+    Rows are ordered by id and shifts outside the date range dropped, as
+    for JSON requests; shift times are hashed as their minute arrays.
+    """
+    employees = sorted(request.get_employees(), key=attrgetter('id'))
+    digest.update(_canonical_json([
+        (employee.id, employee.name, employee.email, employee.skills,
+         employee.availability_pattern, employee.metadata)
+        for employee in employees
+    ]))
+
+    shifts = request.get_shifts()
+    start_minutes, end_minutes, week_minutes = request.shift_times
+    keep = date_range_mask(start_minutes, end_minutes, request.startDate, request.endDate)
+    order = np.array(sorted(np.flatnonzero(keep).tolist(), key=lambda idx: shifts[idx].id), dtype=np.int64)
+    for minutes in (start_minutes, end_minutes, week_minutes):
+        digest.update(np.ascontiguousarray(minutes[order], dtype=np.int64).tobytes())
+    digest.update(_canonical_json([
+        (shift.id, shift.department_id, shift.required_skills,
+         shift.min_staffing, shift.max_staffing, shift.metadata)
+        for shift in (shifts[idx] for idx in order.tolist())
+    ]))
+
+
+def _canonical_json(value: Any) -> bytes:
+    return json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+
+def _epoch_minutes(shifts: List[Dict], field: str) -> np.ndarray:
+    return np.array([parse_epoch_minutes(shift[field]) for shift in shifts], dtype=np.int64)
+
+
+def _sorted_by_id(items) -> list:
+    return sorted(items, key=lambda item: item['id'])
+
+
+def is_cacheable(result: Dict) -> bool:
+    """Whether a result may be replayed for an identical request.
+
+    Completed solves and proven infeasibility are; other failures (e.g. no
+    solution within the time limit) are retried by the next request.
+    """
+    return (
+        result.get('status') == 'completed'
+        or 'infeasibility' in result
+        or 'conflictingConstraints' in result
+    )
+
+
+class ResultStore(ABC):
+    """Results by request key, bounded in size and expiring after a TTL."""
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+
+    @abstractmethod
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Dict]:
+        """Get an unexpired result, or None."""
+
+    @abstractmethod
+    def put(self, key: str, result: Dict, now: Optional[float] = None) -> None:
+        """Store a result, evicting the least recently used beyond ``max_entries``."""
+
+
+class InMemoryResultStore(ResultStore):
+    """Process-local LRU result store.
+
+    Results are shared, not copied; callers must not mutate them.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int):
+        super().__init__(max_entries, ttl_seconds)
+        # key -> (expires_at, result)
+        self._entries: 'OrderedDict[str, Tuple[float, Dict]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Dict]:
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: str, result: Dict, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock:
+            self._entries[key] = (now + self.ttl_seconds, result)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SQLiteResultStore(ResultStore):
+    """Result store backed by a SQLite file, shared across service restarts."""
+
+    def __init__(self, path: str, max_entries: int, ttl_seconds: int):
+        super().__init__(max_entries, ttl_seconds)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS results ('
+                'key TEXT PRIMARY KEY, expires_at REAL NOT NULL, used_at REAL NOT NULL, data TEXT NOT NULL)'
+            )
+            self._conn.execute(
+                'CREATE INDEX IF NOT EXISTS results_used_at ON results (used_at)'
+            )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+    def get(self, key: str, now: Optional[float] = None) -> Optional[Dict]:
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                'SELECT data FROM results WHERE key = ? AND expires_at > ?', (key, now)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute('UPDATE results SET used_at = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def put(self, key: str, result: Dict, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO results (key, expires_at, used_at, data) VALUES (?, ?, ?, ?)',
+                (key, now + self.ttl_seconds, now, json.dumps(result))
+            )
+            self._conn.execute('DELETE FROM results WHERE expires_at <= ?', (now,))
+            self._conn.execute(
+                'DELETE FROM results WHERE key NOT IN '
+                '(SELECT key FROM results ORDER BY used_at DESC LIMIT ?)',
+                (self.max_entries,)
+            )
+
+
+def create_result_store(kind: str, path: str, max_entries: int, ttl_seconds: int) -> Optional[ResultStore]:
+    """Create the result store selected in settings ('memory' or 'sqlite').
+
+    Returns None, disabling the cache, when ``max_entries`` is 0.
+    """
+    if max_entries == 0:
+        return None
+    if kind == 'memory':
+        return InMemoryResultStore(max_entries, ttl_seconds)
+    if kind == 'sqlite':
+        return SQLiteResultStore(path, max_entries, ttl_seconds)
+    raise ValueError(f"Unknown result store: {kind}")
+
+
+class ResultCache:
+    """Serves identical requests from one solve.
+
+    A request whose key is in ``store`` gets the stored result back. A
+    request identical to one still being solved waits for that solve
+    instead of starting its own. Must be used from a single event loop.
+    """
+
+    def __init__(self, store: Optional[ResultStore]):
+        self.store = store
+        self._in_flight: Dict[str, asyncio.Future] = {}
+
+    async def get_or_solve(
+        self,
+        request: OptimizationRequest,
+        solve: Callable[[], Awaitable[Dict]],
+    ) -> Tuple[Dict, bool]:
+        """Return the request's result and whether it came without a new solve."""
+        # Hashing a large request takes tens of milliseconds; keep the loop free
+        key = await asyncio.get_running_loop().run_in_executor(None, request_key, request)
+        if self.store is not None:
+            cached = self.store.get(key)
+            if cached is not None:
+                return cached, True
+
+        pending = self._in_flight.get(key)
+        shared = pending is not None
+        if pending is None:
+            pending = asyncio.ensure_future(self._solve(key, solve))
+            self._in_flight[key] = pending
+            pending.add_done_callback(lambda _: self._in_flight.pop(key, None))
+        # A waiter going away must not cancel the solve the others share
+        return await asyncio.shield(pending), shared
+
+    async def _solve(self, key: str, solve: Callable[[], Awaitable[Dict]]) -> Dict:
+        """Run a solve and store its result if it may be replayed."""
+        result = await solve()
+        if self.store is not None and is_cacheable(result):
+            self.store.put(key, result)
+        return result
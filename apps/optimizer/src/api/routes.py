@@ -1,18 +1,64 @@
 """REST API routes for optimization service."""
+import asyncio
+import json
 import uuid
-from typing import Dict, List, Optional
+from contextlib import asynccontextmanager
+from queue import Empty
+from typing import AsyncIterator, Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
-from ..models.optimization_request import OptimizationRequest
-from ..solvers.schedule_solver import ScheduleSolver
+from ..config import settings
+from ..models.job_model import Job
+from ..models.optimization_request import OptimizationRequest, RepairRequest
+from .columnar import UnsupportedFormatError, decode_request
+from .executor import SolveExecutor, SolverBusyError
+from .job_manager import JobManager
+from .job_store import create_job_store
+from .metrics import CONTENT_TYPE, SolverMetrics
+from .result_cache import ResultCache, create_result_store
+from .solution_cache import SolutionCache
+
+solver_metrics = SolverMetrics()
+executor = SolveExecutor(
+    max_concurrent=settings.max_concurrent_solves,
+    max_queued=settings.max_queued_solves,
+    cpu_budget=settings.cpu_budget,
+    start_method=settings.process_start_method,
+    model_cache_size=settings.cp_model_cache_size,
+    metrics=solver_metrics,
+    profiling_hooks=settings.profiling_hooks,
+)
+solution_cache = SolutionCache(max_departments=settings.solution_cache_departments)
+result_cache = ResultCache(create_result_store(
+    settings.result_cache,
+    settings.result_cache_path,
+    settings.result_cache_entries,
+    settings.result_cache_ttl_seconds,
+))
+job_manager = JobManager(
+    executor=executor,
+    store=create_job_store(settings.job_store, settings.job_store_path),
+    ttl_seconds=settings.job_result_ttl_seconds,
+    solution_cache=solution_cache,
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Stop solver processes on shutdown."""
+    yield
+    executor.shutdown()
+
 
 app = FastAPI(
     title="Resource Scheduler Optimization Service",
     description="OR-Tools based optimization service for schedule generation",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS middleware
@@ -24,8 +70,6 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-solver = ScheduleSolver()
-
 
 class HealthResponse(BaseModel):
     """Health check response."""
@@ -44,35 +88,139 @@ async def health_check():
     }
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Solver latency, outcome and load metrics in the Prometheus text format."""
+    solver_metrics.queue_depth.set(executor.queued)
+    solver_metrics.active_solves.set(executor.active)
+    return PlainTextResponse(solver_metrics.render(), media_type=CONTENT_TYPE)
+
+
 @app.post("/optimize")
 async def optimize(request: OptimizationRequest) -> Dict:
     """
     Optimize schedule assignments.
     
     Accepts optimization request and returns solution candidates.
+    The solve runs in a worker process; when every slot and queue position
+    is taken the request is rejected with 429 and a Retry-After header.
+    Identical requests are answered from the result cache, or share the
+    solve already running for them; ``cached`` is set in that case.
+    """
+    return await _optimize(request)
+
+
+@app.post("/optimize/columnar")
+async def optimize_columnar(http_request: Request) -> Dict:
+    """
+    Optimize a request sent as MessagePack or an Arrow IPC stream.
+    
+    Employees and shifts arrive as columns, with shift times as epoch
+    seconds, and are decoded straight into arrays instead of being
+    validated dict by dict. Responds like ``/optimize``; unknown content
+    types, or formats whose decoder is not installed, get 415.
+    """
+    try:
+        request = decode_request(await http_request.body(), http_request.headers.get("content-type", ""))
+    except UnsupportedFormatError as e:
+        raise HTTPException(status_code=415, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=f"Invalid columnar request: {str(e)}")
+    return await _optimize(request)
+
+
+@app.post("/optimize/repair")
+async def optimize_repair(request: RepairRequest) -> Dict:
+    """
+    Repair an existing solution after a small roster change.
+    
+    Takes the solution's assignments plus the change (removed employees,
+    added or changed shifts). Only shifts within ``neighbourhoodHours`` of
+    the change are re-solved; every other assignment is kept as is.
     """
     try:
-        # Generate optimization ID
         optimization_id = f"opt_{uuid.uuid4().hex[:8]}"
-        
-        # Solve
-        result = solver.solve(request)
-        
-        # Format response
-        return {
-            "optimizationId": optimization_id,
-            "status": result["status"],
-            "solutions": result.get("solutions", []),
-            "totalSolveTime": result.get("totalSolveTime", 0),
-            "message": result.get("message", ""),
-        }
+        result = await executor.solve(request)
+        solution_cache.remember(request, result)
+        return {**_format_result(optimization_id, result), "repair": result.get("repair", {})}
+    except SolverBusyError as e:
+        raise _busy_error(e)
     except Exception as e:
         raise HTTPException(
             status_code=500,
-            detail=f"Optimization failed: {str(e)}"
+            detail=f"Repair failed: {str(e)}"
         )
 
 
+@app.post("/optimize/stream")
+async def optimize_stream(request: OptimizationRequest) -> StreamingResponse:
+    """
+    Optimize and stream improving solutions as NDJSON.
+    
+    The first line names the job. Each ``solution`` line is an improving
+    incumbent with its objective, bound, gap and assignments, sent as soon
+    as CP-SAT finds it. The last ``result`` line is the final optimization
+    response. ``POST /jobs/{job_id}/accept`` stops the search and keeps the
+    best roster found; disconnecting stops it as well.
+    """
+    try:
+        job = job_manager.submit(request, stream=True)
+    except SolverBusyError as e:
+        raise _busy_error(e)
+    return StreamingResponse(_stream_job(job.id), media_type="application/x-ndjson")
+
+
+@app.post("/jobs", status_code=202)
+async def submit_job(request: OptimizationRequest) -> Dict:
+    """
+    Submit an optimization job.
+    
+    Returns immediately with a job id; poll ``/jobs/{job_id}`` for status
+    and fetch ``/jobs/{job_id}/result`` once it has finished.
+    """
+    try:
+        job = job_manager.submit(request)
+    except SolverBusyError as e:
+        raise _busy_error(e)
+    return _format_job(job)
+
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str) -> Dict:
+    """Get the status of an optimization job."""
+    return _format_job(_get_job_or_404(job_id))
+
+
+@app.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str) -> Dict:
+    """Get the result of a finished optimization job."""
+    job = _get_job_or_404(job_id)
+    if not job.is_finished():
+        raise HTTPException(
+            status_code=409,
+            detail=f"Job {job_id} is still {job.status}"
+        )
+    return _format_job_result(job)
+
+
+@app.post("/jobs/{job_id}/cancel")
+async def cancel_job(job_id: str) -> Dict:
+    """Cancel a queued job or stop the search of a running one."""
+    job = job_manager.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _format_job(job)
+
+
+@app.post("/jobs/{job_id}/accept")
+async def accept_job(job_id: str) -> Dict:
+    """Stop the search of a job and keep the best roster found so far."""
+    job = job_manager.accept(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return _format_job(job)
+
+
 @app.get("/")
 async def root():
     """Root endpoint."""
@@ -81,7 +229,142 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "health": "/health",
-            "optimize": "/optimize (POST)"
+            "metrics": "/metrics",
+            "optimize": "/optimize (POST)",
+            "optimizeColumnar": "/optimize/columnar (POST, MessagePack or Arrow)",
+            "optimizeRepair": "/optimize/repair (POST)",
+            "optimizeStream": "/optimize/stream (POST, NDJSON)",
+            "jobs": "/jobs (POST)",
+            "jobStatus": "/jobs/{job_id} (GET)",
+            "jobResult": "/jobs/{job_id}/result (GET)",
+            "jobCancel": "/jobs/{job_id}/cancel (POST)",
+            "jobAccept": "/jobs/{job_id}/accept (POST)"
         }
     }
 
+
+async def _optimize(request: OptimizationRequest) -> Dict:
+    """Solve a request, or answer it from the result cache."""
+    async def solve() -> Dict:
+        # Solve off the event loop, warm-started from the last accepted rosters
+        result = await executor.solve(request, hints=solution_cache.hints_for(request))
+        solution_cache.remember(request, result)
+        return result
+
+    try:
+        # Generate optimization ID
+        optimization_id = f"opt_{uuid.uuid4().hex[:8]}"
+        
+        result, cached = await result_cache.get_or_solve(request, solve)
+        
+        # Format response
+        return {**_format_result(optimization_id, result), "cached": cached}
+    except SolverBusyError as e:
+        raise _busy_error(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=500,
+            detail=f"Optimization failed: {str(e)}"
+        )
+
+
+def _format_result(optimization_id: str, result: Dict) -> Dict:
+    """Format a solver result as an optimization response."""
+    response = {
+        "optimizationId": optimization_id,
+        "status": result["status"],
+        "solutions": result.get("solutions", []),
+        "totalSolveTime": result.get("totalSolveTime", 0),
+        "message": result.get("message", ""),
+    }
+    if "infeasibility" in result:
+        response["infeasibility"] = result["infeasibility"]
+    if "conflictingConstraints" in result:
+        response["conflictingConstraints"] = result["conflictingConstraints"]
+    if "profile" in result:
+        response["profile"] = result["profile"]
+    return response
+
+
+def _format_job_result(job: Job) -> Dict:
+    """Format a finished job as an optimization response."""
+    if job.result is None:
+        return _format_result(job.id, {
+            "status": job.status,
+            "message": job.error or "Job cancelled before it started",
+        })
+    return _format_result(job.id, job.result)
+
+
+def _format_job(job: Job) -> Dict:
+    """Format a job as a status response."""
+    return {
+        "jobId": job.id,
+        "status": job.status,
+        "createdAt": job.createdAt,
+        "finishedAt": job.finishedAt,
+        "error": job.error,
+    }
+
+
+def _get_job_or_404(job_id: str) -> Job:
+    """Look up a job, raising 404 if it is unknown or expired."""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+
+def _busy_error(error: SolverBusyError) -> HTTPException:
+    """Build the 429 response for a full solve queue."""
+    return HTTPException(
+        status_code=429,
+        detail=str(error),
+        headers={"Retry-After": str(settings.retry_after_seconds)}
+    )
+
+
+async def _stream_job(job_id: str) -> AsyncIterator[str]:
+    """Yield NDJSON lines for a streamed job until its result is ready."""
+    solution_queue = job_manager.solution_queue(job_id)
+    loop = asyncio.get_running_loop()
+    finished = False
+    try:
+        yield _ndjson({"event": "started", "jobId": job_id})
+        while solution_queue is not None:
+            incumbent = await loop.run_in_executor(None, _next_incumbent, solution_queue)
+            if incumbent is None:
+                # End of search
+                break
+            if incumbent is _NO_INCUMBENT:
+                # Jobs cancelled before starting never close their queue
+                job = job_manager.get(job_id)
+                if job is None or job.is_finished():
+                    break
+                continue
+            yield _ndjson({"event": "solution", "jobId": job_id, **incumbent})
+        
+        job = await job_manager.wait(job_id)
+        finished = True
+        if job is not None:
+            yield _ndjson({"event": "result", **_format_job_result(job)})
+    finally:
+        if not finished:
+            # Client went away: stop searching
+            job_manager.accept(job_id)
+
+
+_NO_INCUMBENT = object()
+
+
+def _next_incumbent(solution_queue):
+    """Wait briefly for the next incumbent from a solver process."""
+    try:
+        return solution_queue.get(timeout=0.5)
+    except Empty:
+        return _NO_INCUMBENT
+
+
+def _ndjson(payload: Dict) -> str:
+    """Serialize one NDJSON line."""
+    return json.dumps(payload) + "\n"
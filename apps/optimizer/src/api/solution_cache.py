@@ -0,0 +1,69 @@
+"""Per-department cache of the last accepted solution, used to warm-start solves."""
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Tuple
+
+from ..models.optimization_request import OptimizationRequest
+
+
+class SolutionCache:
+    """Remembers the best roster of each department's last completed solve.
+
+    Departments are evicted least recently used once more than
+    ``max_departments`` are cached. Re-runs over the same shifts get the
+    cached assignments back as CP-SAT solution hints.
+    """
+
+    def __init__(self, max_departments: int):
+        self.max_departments = max_departments
+        # department_id -> {shift_id: [employee_id, ...]}
+        self._departments: 'OrderedDict[str, Dict[str, List[str]]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._departments)
+
+    def hints_for(self, request: OptimizationRequest) -> List[Tuple[str, str]]:
+        """Cached (employee_id, shift_id) assignments for the request's shifts."""
+        shifts_by_department = _shifts_by_department(request)
+        hints = []
+        with self._lock:
+            for department_id, shift_ids in shifts_by_department.items():
+                cached = self._departments.get(department_id)
+                if cached is None:
+                    continue
+                self._departments.move_to_end(department_id)
+                for shift_id in shift_ids:
+                    hints.extend((employee_id, shift_id) for employee_id in cached.get(shift_id, ()))
+        return hints
+
+    def remember(self, request: OptimizationRequest, result: Dict) -> None:
+        """Store the best solution of a completed solve per department."""
+        if result.get('status') != 'completed' or not result.get('solutions'):
+            return
+
+        department_of = request.get_shift_departments()
+        rosters: Dict[str, Dict[str, List[str]]] = {
+            department_id: {} for department_id in set(department_of.values())
+        }
+        for assignment in result['solutions'][0].get('assignments', []):
+            department_id = department_of.get(assignment['shiftId'])
+            if department_id is not None:
+                rosters[department_id].setdefault(assignment['shiftId'], []).append(
+                    assignment['employeeId']
+                )
+
+        with self._lock:
+            for department_id, roster in rosters.items():
+                self._departments[department_id] = roster
+                self._departments.move_to_end(department_id)
+            while len(self._departments) > self.max_departments:
+                self._departments.popitem(last=False)
+
+
+def _shifts_by_department(request: OptimizationRequest) -> Dict[str, List[str]]:
+    """Group the request's shift ids by department."""
+    grouped: Dict[str, List[str]] = {}
+    for shift_id, department_id in request.get_shift_departments().items():
+        grouped.setdefault(department_id, []).append(shift_id)
+    return grouped
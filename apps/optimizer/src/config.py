@@ -0,0 +1,56 @@
+"""Service configuration loaded from environment variables."""
+import os
+from typing import List
+
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """Optimizer service settings.
+
+    Every field can be overridden with an ``OPTIMIZER_``-prefixed
+    environment variable, e.g. ``OPTIMIZER_MAX_CONCURRENT_SOLVES=4``.
+    """
+    model_config = SettingsConfigDict(env_prefix='OPTIMIZER_')
+
+    # Solve executor
+    max_concurrent_solves: int = Field(default=2, ge=1, description="Solves running at once")
+    max_queued_solves: int = Field(default=8, ge=0, description="Solves waiting for a free slot")
+    cpu_budget: int = Field(
+        default_factory=lambda: os.cpu_count() or 1,
+        ge=1,
+        description="Total CP-SAT search workers shared by concurrent solves"
+    )
+    retry_after_seconds: int = Field(default=30, ge=1, description="Retry-After sent with 429")
+    process_start_method: str = Field(default='spawn', description="multiprocessing start method")
+    cp_model_cache_size: int = Field(
+        default=4,
+        ge=0,
+        description="Built CP-SAT models kept per solver process for re-runs with another objective; 0 disables reuse"
+    )
+    profiling_hooks: List[str] = Field(
+        default_factory=list,
+        description="Profiling hooks ('package.module:function') registered in every solver process"
+    )
+
+    # Asynchronous jobs
+    job_store: str = Field(default='memory', description="Job store backend: memory or sqlite")
+    job_store_path: str = Field(default='optimizer_jobs.sqlite3', description="SQLite job store file")
+    job_result_ttl_seconds: int = Field(default=3600, ge=1, description="Retention of finished jobs")
+
+    # Warm starts
+    solution_cache_departments: int = Field(
+        default=128,
+        ge=0,
+        description="Departments whose last accepted solution is kept for solution hints"
+    )
+
+    # Results of identical requests
+    result_cache: str = Field(default='memory', description="Result cache backend: memory or sqlite")
+    result_cache_path: str = Field(default='optimizer_results.sqlite3', description="SQLite result cache file")
+    result_cache_entries: int = Field(default=256, ge=0, description="Cached results; 0 disables the cache")
+    result_cache_ttl_seconds: int = Field(default=600, ge=1, description="Lifetime of a cached result")
+
+
+settings = Settings()
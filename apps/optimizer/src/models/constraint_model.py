@@ -1,5 +1,5 @@
 """Constraint models for optimization."""
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from pydantic import BaseModel, Field
 
@@ -12,6 +12,10 @@ class Constraint(BaseModel):
     priority: int = Field(default=0, ge=0)
     active: bool = True
 
+    def is_soft(self, threshold: int) -> bool:
+        """Whether the constraint may be violated at a penalty (priority below threshold)."""
+        return self.priority < threshold
+
     def get_max_hours(self) -> Optional[float]:
         """Get max hours from rules if type is max_hours."""
         if self.type == 'max_hours':
@@ -24,6 +28,35 @@ class Constraint(BaseModel):
             return self.rules.get('periodInDays', 7)
         return None
 
+    def get_hour_limits(self) -> List[Tuple[int, float]]:
+        """Get (period in days, max hours) limits if type is max_hours.
+
+        ``maxHours`` applies to every ``periodInDays`` consecutive days;
+        ``maxHoursPerWeek`` and ``maxHoursPerDay`` to every 7 and 1 days.
+        """
+        if self.type != 'max_hours':
+            return []
+        limits = []
+        if self.rules.get('maxHours'):
+            limits.append((self.get_period_days() or 7, self.rules['maxHours']))
+        if self.rules.get('maxHoursPerWeek'):
+            limits.append((7, self.rules['maxHoursPerWeek']))
+        if self.rules.get('maxHoursPerDay'):
+            limits.append((1, self.rules['maxHoursPerDay']))
+        return limits
+
+    def get_max_consecutive_days(self) -> Optional[int]:
+        """Get max consecutive working days if type is max_consecutive_days."""
+        if self.type == 'max_consecutive_days':
+            return self.rules.get('maxDays')
+        return None
+
+    def get_min_consecutive_days(self) -> Optional[int]:
+        """Get min consecutive working days if type is min_consecutive_days."""
+        if self.type == 'min_consecutive_days':
+            return self.rules.get('minDays')
+        return None
+
     def get_min_rest_hours(self) -> Optional[float]:
         """Get minimum rest hours if type is min_rest."""
         if self.type == 'min_rest':
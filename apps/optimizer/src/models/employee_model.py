@@ -1,6 +1,6 @@
 """Employee data models for optimization."""
-from typing import Any, Dict, List, Optional
-from pydantic import BaseModel, Field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
 
 
 class Skill(BaseModel):
@@ -25,6 +25,10 @@ class Employee(BaseModel):
     availability_pattern: Optional[Dict[str, Any]] = None
     metadata: Optional[Dict[str, Any]] = None
 
+    # Skill names and the ``skills`` entries they were read from
+    _skill_set: FrozenSet[str] = PrivateAttr(default=frozenset())
+    _skills_read: Optional[Tuple[Any, ...]] = PrivateAttr(default=None)
+
     def get_skill_names(self) -> List[str]:
         """Extract skill names from skills array."""
         if not self.skills:
@@ -32,7 +36,20 @@ class Employee(BaseModel):
         return [skill.get('name', skill) if isinstance(skill, dict) else str(skill) 
                 for skill in self.skills]
 
+    @property
+    def skill_set(self) -> FrozenSet[str]:
+        """Skill names as a set, re-read only when ``skills`` has changed.
+
+        Replacing ``skills`` or adding, removing or replacing an entry is
+        picked up; renaming a skill dict in place is not.
+        """
+        skills = tuple(self.skills or ())
+        if skills != self._skills_read:
+            self._skill_set = frozenset(self.get_skill_names())
+            self._skills_read = skills
+        return self._skill_set
+
     def has_skill(self, skill_name: str) -> bool:
         """Check if employee has a specific skill."""
-        return skill_name in self.get_skill_names()
+        return skill_name in self.skill_set
 
@@ -0,0 +1,32 @@
+"""Asynchronous optimization job models."""
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+
+class JobStatus:
+    """Optimization job states."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    COMPLETED = 'completed'
+    FAILED = 'failed'
+    CANCELLED = 'cancelled'
+
+    FINISHED = (COMPLETED, FAILED, CANCELLED)
+
+
+class Job(BaseModel):
+    """Optimization job submitted through the jobs API."""
+    id: str
+    status: str = JobStatus.QUEUED
+    createdAt: float
+    finishedAt: Optional[float] = None
+    expiresAt: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    # 'host:pid' of the service process running the solve
+    owner: Optional[str] = None
+
+    def is_finished(self) -> bool:
+        """Check if the job has reached a final state."""
+        return self.status in JobStatus.FINISHED
@@ -1,7 +1,8 @@
 """Optimization request models."""
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from pydantic import BaseModel, Field
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr, field_validator
 
 from .constraint_model import Constraint
 from .employee_model import Employee
@@ -17,6 +18,34 @@ class OptimizationOptions(BaseModel):
     allowOvertime: bool = False
     maxOptimizationTime: int = Field(default=30, ge=1, le=300, description="Max time in seconds")
     solutionCount: int = Field(default=3, ge=1, le=10, description="Number of solutions to return")
+    minSolutionDistance: int = Field(
+        default=2,
+        ge=0,
+        description="Minimum number of differing assignments between returned solutions"
+    )
+    symmetryBreaking: bool = Field(
+        default=False,
+        description=(
+            "Order the assignments of interchangeable employees lexicographically. Slower on "
+            "homogeneous-team benchmarks: 3 of 6 runs proved optimal within 40 s instead of 4 of 6, "
+            "and worse incumbents and bounds at 30-60 employees"
+        )
+    )
+    rollingWindowDays: Optional[int] = Field(
+        default=None,
+        ge=1,
+        description="Solve longer date ranges window by window, committing this many days at a time"
+    )
+    rollingOverlapDays: int = Field(
+        default=2,
+        ge=0,
+        description="Days after each rolling window that are solved but only committed by the next one"
+    )
+    softPriorityThreshold: int = Field(
+        default=0,
+        ge=0,
+        description="Constraints with a lower priority are soft: violations are penalized, not forbidden"
+    )
 
 
 class OptimizationRequest(BaseModel):
@@ -29,6 +58,15 @@ class OptimizationRequest(BaseModel):
     endDate: str
     options: Optional[Dict[str, Any]] = None
 
+    @field_validator('constraints')
+    @classmethod
+    def validate_constraints(cls, constraints: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Reject malformed active constraints here rather than in the solver process."""
+        for constraint in constraints:
+            if constraint.get('active', True):
+                Constraint(**constraint)
+        return constraints
+
     def get_employees(self) -> List[Employee]:
         """Convert employee dicts to Employee models."""
         return [Employee(**emp) for emp in self.employees]
@@ -54,3 +92,79 @@ class OptimizationRequest(BaseModel):
             return OptimizationOptions()
         return OptimizationOptions(**self.options)
 
+    @property
+    def num_shifts(self) -> int:
+        return len(self.shifts)
+
+    def get_shift_departments(self) -> Dict[str, Optional[str]]:
+        """Department id of every shift by shift id, without building Shift models."""
+        return {shift['id']: shift.get('department_id') for shift in self.shifts}
+
+
+class ColumnarRequest(OptimizationRequest):
+    """Request decoded from a columnar body (see ``src.api.columnar``).
+
+    Employees and shifts never exist as dicts. They are constructed once,
+    without re-validation, from columns that were validated as arrays, and
+    shift times arrive as epoch minutes instead of ISO strings to parse.
+    ``employees`` and ``shifts`` stay empty; use the accessors.
+    """
+    employees: List[Dict[str, Any]] = Field(default_factory=list)
+    shifts: List[Dict[str, Any]] = Field(default_factory=list)
+
+    _employee_models: List[Employee] = PrivateAttr(default_factory=list)
+    _shift_models: List[Shift] = PrivateAttr(default_factory=list)
+    # Start and end epoch minutes and local minute-of-week, as from parse_shift_times
+    _shift_times: Tuple[np.ndarray, np.ndarray, np.ndarray] = PrivateAttr(default=None)
+
+    @classmethod
+    def from_models(
+        cls,
+        employees: List[Employee],
+        shifts: List[Shift],
+        shift_times: Tuple[np.ndarray, np.ndarray, np.ndarray],
+        **fields: Any,
+    ) -> 'ColumnarRequest':
+        """Wrap decoded employees, shifts and shift times with the remaining request fields."""
+        request = cls(**fields)
+        request._employee_models = employees
+        request._shift_models = shifts
+        request._shift_times = shift_times
+        return request
+
+    def get_employees(self) -> List[Employee]:
+        return list(self._employee_models)
+
+    def get_shifts(self) -> List[Shift]:
+        return list(self._shift_models)
+
+    @property
+    def shift_times(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self._shift_times
+
+    @property
+    def num_shifts(self) -> int:
+        return len(self._shift_models)
+
+    def get_shift_departments(self) -> Dict[str, Optional[str]]:
+        return {shift.id: shift.department_id for shift in self._shift_models}
+
+
+class RepairRequest(OptimizationRequest):
+    """Repair of an existing solution after a small roster change.
+
+    ``employees`` and ``shifts`` describe the roster after the change;
+    ``assignments`` is the solution being repaired.
+    """
+    assignments: List[Dict[str, Any]] = Field(
+        ...,
+        description="Assignments ({employeeId, shiftId}) of the solution to repair"
+    )
+    removedEmployees: List[str] = Field(default_factory=list, description="Ids of employees no longer available")
+    changedShifts: List[str] = Field(default_factory=list, description="Ids of added or changed shifts")
+    neighbourhoodHours: float = Field(
+        default=24.0,
+        ge=0,
+        description="Shifts within this many hours of a change are re-solved; all others stay fixed"
+    )
+
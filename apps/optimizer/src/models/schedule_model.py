@@ -1,6 +1,6 @@
 """Schedule and shift data models."""
 from datetime import datetime
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional, Union
 
 from pydantic import BaseModel, Field
 
@@ -9,7 +9,7 @@ class Shift(BaseModel):
     """Shift model for optimization."""
     id: str
     department_id: str
-    required_skills: Optional[Dict[str, Any]] = None
+    required_skills: Optional[Union[Dict[str, Any], List[Any]]] = None
     min_staffing: int = Field(..., ge=0)
     max_staffing: int = Field(..., ge=1)
     start_time: str  # ISO format datetime string
@@ -46,3 +46,11 @@ class Schedule(BaseModel):
     status: str  # confirmed, tentative, conflict
     metadata: Optional[Dict[str, Any]] = None
 
+    def is_pinned(self) -> bool:
+        """Check if the assignment must be kept by the optimizer."""
+        return bool(self.metadata and self.metadata.get('pinned'))
+
+    def is_blocked(self) -> bool:
+        """Check if the employee must never be assigned to this shift."""
+        return bool(self.metadata and self.metadata.get('blocked'))
+
@@ -0,0 +1,65 @@
+"""Shift conflict graph built with a sweep line."""
+import heapq
+from typing import List
+
+import numpy as np
+
+from ..models.constraint_model import Constraint
+
+
+def min_rest_minutes(constraints: List[Constraint]) -> int:
+    """Minimum rest between two shifts of one employee, in minutes.
+
+    Without a min_rest rule only truly overlapping shifts conflict.
+    """
+    min_rest_hours = max(
+        (c.get_min_rest_hours() or 8.0 for c in constraints if c.type == 'min_rest'),
+        default=0.0
+    )
+    return int(round(min_rest_hours * 60))
+
+
+def build_conflict_cliques(
+    start_minutes: np.ndarray,
+    end_minutes: np.ndarray,
+    min_rest_minutes: int = 0,
+) -> List[List[int]]:
+    """Group conflicting shifts into maximal cliques.
+
+    Two shifts conflict when they overlap or when the gap between them is
+    shorter than ``min_rest_minutes``. Extending every shift's end by the
+    minimum rest turns this into plain interval overlap, so the conflict
+    graph is an interval graph and its maximal cliques can be read off a
+    single sweep over start-sorted shifts. Cliques with fewer than two shifts
+    are dropped.
+    """
+    order = np.argsort(start_minutes, kind='stable').tolist()
+    starts = start_minutes.tolist()
+    ends = (end_minutes + min_rest_minutes).tolist()
+    return sweep_cliques(order, starts, ends)
+
+
+def sweep_cliques(order: List[int], starts: List[int], ends: List[int]) -> List[List[int]]:
+    """Sweep start-sorted half-open intervals and emit maximal cliques.
+
+    Every interval still active when a new one starts contains that start
+    point, so the active set just before the first removal that follows an
+    insertion is a maximal clique.
+    """
+    cliques = []
+    active = []  # min-heap of (end, idx)
+    grown = False
+    for idx in order:
+        start = starts[idx]
+        while active and active[0][0] <= start:
+            if grown:
+                if len(active) > 1:
+                    cliques.append(sorted(i for _, i in active))
+                grown = False
+            heapq.heappop(active)
+        heapq.heappush(active, (ends[idx], idx))
+        grown = True
+
+    if grown and len(active) > 1:
+        cliques.append(sorted(i for _, i in active))
+    return cliques
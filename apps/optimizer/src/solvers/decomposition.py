@@ -0,0 +1,212 @@
+"""Independent sub-problems of a request, solved concurrently and merged."""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..models.constraint_model import Constraint
+from ..models.optimization_request import OptimizationOptions
+from ..models.schedule_model import Schedule
+from .eligibility import Eligibility
+from .optimization_engine import OptimizationEngine, calculate_metrics
+from .problem_instance import ProblemInstance
+from .profiling import SolveProfile
+
+# Objectives that are a sum over assignments, so per-component optima add up
+SEPARABLE_OBJECTIVES = ('minimize_cost', 'balance')
+
+
+class Component(NamedTuple):
+    """Employees and shifts connected through eligible pairs."""
+    employees: np.ndarray
+    shifts: np.ndarray
+
+
+def is_decomposable(options: OptimizationOptions, constraints: List[Constraint]) -> bool:
+    """Check that the objective and constraints only couple connected pairs.
+
+    Fairness objectives and fair_distribution compare every employee with
+    every other one, so those requests are always solved as one model.
+    """
+    return options.objective in SEPARABLE_OBJECTIVES and not any(
+        c.type == 'fair_distribution' for c in constraints
+    )
+
+
+def find_components(eligibility: Eligibility) -> List[Component]:
+    """Connected components of the eligibility graph, largest first.
+
+    Union-find over employees and shifts joined by eligible pairs; departments
+    that share no employees always end up in different components. Employees
+    without any eligible shift are left out.
+    """
+    num_employees = eligibility.num_employees
+    parent = list(range(num_employees + eligibility.num_shifts))
+
+    def find(node: int) -> int:
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    for emp_idx, shift_idx in eligibility.pairs:
+        left, right = find(emp_idx), find(num_employees + shift_idx)
+        if left != right:
+            parent[left] = right
+
+    roots = np.array([find(node) for node in range(len(parent))], dtype=np.int64)
+    components = []
+    for root in np.unique(roots[num_employees:]):
+        employees = np.flatnonzero(roots[:num_employees] == root)
+        shifts = np.flatnonzero(roots[num_employees:] == root)
+        components.append(Component(employees, shifts))
+    components.sort(key=lambda c: len(c.employees) * len(c.shifts), reverse=True)
+    return components
+
+
+def solve_components(
+    instance: ProblemInstance,
+    components: List[Component],
+    constraints: List[Constraint],
+    current_schedules: List[Schedule],
+    options: OptimizationOptions,
+    num_workers: Optional[int] = None,
+    stop_event=None,
+    on_solution: Optional[Callable[[Dict], None]] = None,
+    hints: Optional[List[Tuple[str, str]]] = None,
+    profile: Optional[SolveProfile] = None,
+    eligibility: Optional[Eligibility] = None,
+) -> List[Dict]:
+    """Solve each component concurrently and merge the solutions.
+
+    CP-SAT releases the GIL while it searches, so components run on threads
+    of the current solver process. The ``num_workers`` search workers of the
+    solve are split between the components that run at the same time.
+    Components share one ``maxOptimizationTime`` deadline: each gets the
+    slots' remaining time in proportion to its size among the components
+    not yet started. ``eligibility`` of the whole instance, if given, is
+    split between the components instead of being computed again.
+    Returns no solutions if any component has none.
+    """
+    deadline = time.time() + options.maxOptimizationTime
+    budget = num_workers or os.cpu_count() or 1
+    parallel = min(len(components), budget)
+    workers_per_component = max(1, budget // parallel)
+    sizes = [len(c.employees) * len(c.shifts) for c in components]
+    sizes_from = np.cumsum(sizes[::-1])[::-1].tolist()
+    merger = _IncumbentMerger(instance, len(components), on_solution, constraints) if on_solution else None
+
+    def solve(position: int) -> List[Dict]:
+        component = components[position]
+        sub_instance = instance.subset(component.employees, component.shifts)
+        shift_ids = set(sub_instance.shift_ids)
+        engine = OptimizationEngine(
+            employees=sub_instance.employees,
+            shifts=sub_instance.shifts,
+            constraints=constraints,
+            current_schedules=[s for s in current_schedules if s.shift_id in shift_ids],
+            options=options,
+            instance=sub_instance,
+            num_workers=workers_per_component,
+            stop_event=stop_event,
+            on_solution=(lambda event: merger.publish(position, event)) if merger else None,
+            hints=hints,
+            profile=profile,
+            eligibility=eligibility.subset(component.employees, component.shifts) if eligibility else None
+        )
+        share = min(1.0, parallel * sizes[position] / max(sizes_from[position], 1))
+        engine.solver.parameters.max_time_in_seconds = max((deadline - time.time()) * share, 0.1)
+        return engine.solve()
+
+    with ThreadPoolExecutor(max_workers=parallel) as pool:
+        results = list(pool.map(solve, range(len(components))))
+
+    if not all(results):
+        return []
+    return merge_solutions(instance, results, constraints)
+
+
+def merge_solutions(
+    instance: ProblemInstance,
+    results: List[List[Dict]],
+    constraints: Optional[List[Constraint]] = None,
+) -> List[Dict]:
+    """Combine the k-th best solution of every component into one roster.
+
+    Components with fewer solutions contribute their last (worst kept) one.
+    Scores add up; metrics are recomputed over the whole instance.
+    """
+    merged = []
+    for rank in range(max(len(solutions) for solutions in results)):
+        parts = [solutions[min(rank, len(solutions) - 1)] for solutions in results]
+        merged.append(_merge(instance, f'solution_{rank + 1}', parts, constraints))
+    return merged
+
+
+def _merge(
+    instance: ProblemInstance,
+    solution_id: str,
+    parts: List[Dict],
+    constraints: Optional[List[Constraint]] = None,
+) -> Dict:
+    """Merge per-component solutions into a single solution."""
+    assignments = [assignment for part in parts for assignment in part['assignments']]
+    return {
+        'id': solution_id,
+        'score': sum(part['score'] for part in parts),
+        'assignments': assignments,
+        'metrics': calculate_metrics(instance, _assigned_pairs(instance, assignments), constraints),
+        'solveTime': max(part['solveTime'] for part in parts),
+    }
+
+
+def _assigned_pairs(instance: ProblemInstance, assignments: List[Dict]) -> List[Tuple[int, int]]:
+    """(employee_idx, shift_idx) pairs of assignments in the full instance."""
+    employee_idx_map = {emp_id: idx for idx, emp_id in enumerate(instance.employee_ids)}
+    shift_idx_map = {shift_id: idx for idx, shift_id in enumerate(instance.shift_ids)}
+    return [
+        (employee_idx_map[a['employeeId']], shift_idx_map[a['shiftId']]) for a in assignments
+    ]
+
+
+class _IncumbentMerger:
+    """Publishes whole-roster incumbents while components are searched.
+
+    Once every component has reported an incumbent, each improvement of any
+    component is published as the merge of the latest incumbents, with
+    objectives and bounds summed over components.
+    """
+
+    def __init__(
+        self,
+        instance: ProblemInstance,
+        num_components: int,
+        on_solution: Callable[[Dict], None],
+        constraints: Optional[List[Constraint]] = None,
+    ):
+        self.instance = instance
+        self.on_solution = on_solution
+        self.constraints = constraints
+        self._latest: List[Optional[Dict]] = [None] * num_components
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def publish(self, position: int, event: Dict):
+        with self._lock:
+            self._latest[position] = event
+            if any(latest is None for latest in self._latest):
+                return
+            self._count += 1
+            solution = _merge(self.instance, f'solution_{self._count}', self._latest, self.constraints)
+            objective = solution['score']
+            bound = sum(latest['bound'] for latest in self._latest)
+            self.on_solution({
+                'incumbent': self._count,
+                'objective': objective,
+                'bound': bound,
+                'gap': abs(objective - bound) / max(1.0, abs(objective)),
+                **solution,
+            })
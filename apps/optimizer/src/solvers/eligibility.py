@@ -0,0 +1,165 @@
+"""Employee-shift eligibility for sparse model construction."""
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..models.constraint_model import Constraint
+from ..models.employee_model import AvailabilityWindow
+from ..models.schedule_model import Schedule
+from .problem_instance import MINUTES_PER_DAY, ProblemInstance
+
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+
+
+class Eligibility:
+    """Sparse set of employee-shift pairs that may be assigned.
+
+    Only eligible pairs become decision variables; every constraint builder
+    iterates over ``shifts_by_employee`` or ``employees_by_shift`` instead of
+    the dense employee x shift grid.
+    """
+
+    def __init__(
+        self,
+        num_employees: int,
+        num_shifts: int,
+        pairs: List[Tuple[int, int]],
+        pinned: Set[Tuple[int, int]],
+    ):
+        self.num_employees = num_employees
+        self.num_shifts = num_shifts
+        self.pairs = sorted(pairs)
+        self.pinned = pinned
+        self._pair_set = set(self.pairs)
+        self.shifts_by_employee: Dict[int, List[int]] = {
+            emp_idx: [] for emp_idx in range(num_employees)
+        }
+        self.employees_by_shift: Dict[int, List[int]] = {
+            shift_idx: [] for shift_idx in range(num_shifts)
+        }
+        for emp_idx, shift_idx in self.pairs:
+            self.shifts_by_employee[emp_idx].append(shift_idx)
+            self.employees_by_shift[shift_idx].append(emp_idx)
+
+    def is_eligible(self, emp_idx: int, shift_idx: int) -> bool:
+        """Check if an employee may be assigned to a shift."""
+        return (emp_idx, shift_idx) in self._pair_set
+
+    def subset(self, employee_indices: np.ndarray, shift_indices: np.ndarray) -> 'Eligibility':
+        """Pairs among the given employees and shifts, indexed like :meth:`ProblemInstance.subset`."""
+        employee_pos = {emp_idx: pos for pos, emp_idx in enumerate(np.asarray(employee_indices).tolist())}
+        shift_pos = {shift_idx: pos for pos, shift_idx in enumerate(np.asarray(shift_indices).tolist())}
+
+        def inside(pairs):
+            return [
+                (employee_pos[emp_idx], shift_pos[shift_idx]) for emp_idx, shift_idx in pairs
+                if emp_idx in employee_pos and shift_idx in shift_pos
+            ]
+        return Eligibility(len(employee_pos), len(shift_pos), inside(self.pairs), set(inside(self.pinned)))
+
+    @property
+    def density(self) -> float:
+        """Fraction of the dense grid that is eligible."""
+        total = self.num_employees * self.num_shifts
+        return len(self.pairs) / total if total else 0.0
+
+
+def compute_eligibility(
+    instance: ProblemInstance,
+    current_schedules: Optional[List[Schedule]] = None,
+    frozen_shifts: Optional[np.ndarray] = None,
+    constraints: Optional[List[Constraint]] = None,
+) -> Eligibility:
+    """Work out which employee-shift pairs may become decision variables.
+
+    A pair is eligible when the employee has every required skill and is
+    available for the whole shift, both under their own availability
+    pattern and under every ``availability`` constraint. Pinned schedules
+    are always eligible and blocked schedules never are. Shifts flagged in
+    the boolean ``frozen_shifts`` mask keep only their pinned pairs.
+    """
+    employee_idx_map = {emp_id: idx for idx, emp_id in enumerate(instance.employee_ids)}
+    shift_idx_map = {shift_id: idx for idx, shift_id in enumerate(instance.shift_ids)}
+
+    pinned: Set[Tuple[int, int]] = set()
+    blocked: Set[Tuple[int, int]] = set()
+    for schedule in current_schedules or []:
+        emp_idx = employee_idx_map.get(schedule.employee_id)
+        shift_idx = shift_idx_map.get(schedule.shift_id)
+        if emp_idx is None or shift_idx is None:
+            continue
+        if schedule.is_blocked():
+            blocked.add((emp_idx, shift_idx))
+        elif schedule.is_pinned():
+            pinned.add((emp_idx, shift_idx))
+
+    eligible = instance.skill_eligibility()
+    starts = instance.week_minutes
+    ends = instance.week_minutes + instance.duration_minutes
+
+    # Availability constraints apply to every employee
+    for constraint in constraints or []:
+        if constraint.type == 'availability':
+            windows = constraint.rules.get('availabilityWindows') or []
+            eligible &= _covered(availability_mask(windows), starts, ends)[np.newaxis, :]
+
+    # Employees sharing an availability pattern share one mask
+    pattern_groups: Dict[Tuple, List[int]] = {}
+    for emp_idx, employee in enumerate(instance.employees):
+        pattern = employee.availability_pattern
+        if pattern and pattern.get('windows'):
+            key = tuple(sorted(tuple(sorted(window.items())) for window in pattern['windows']))
+            pattern_groups.setdefault(key, []).append(emp_idx)
+    for emp_indices in pattern_groups.values():
+        windows = instance.employees[emp_indices[0]].availability_pattern['windows']
+        eligible[emp_indices] &= _covered(availability_mask(windows), starts, ends)
+
+    if frozen_shifts is not None:
+        eligible[:, frozen_shifts] = False
+    for emp_idx, shift_idx in pinned:
+        eligible[emp_idx, shift_idx] = True
+    for emp_idx, shift_idx in blocked:
+        eligible[emp_idx, shift_idx] = False
+
+    emp_indices, shift_indices = eligible.nonzero()
+    pairs = list(zip(emp_indices.tolist(), shift_indices.tolist()))
+    return Eligibility(instance.num_employees, instance.num_shifts, pairs, pinned - blocked)
+
+
+def availability_mask(windows: List[Dict]) -> np.ndarray:
+    """Available minutes of the week as a boolean mask (0 = Sunday 00:00).
+
+    Windows whose end is not after their start run overnight, and a window
+    running past Saturday midnight wraps around to Sunday.
+    """
+    mask = np.zeros(MINUTES_PER_WEEK, dtype=bool)
+    for raw in windows:
+        window = AvailabilityWindow(**raw)
+        start = window.dayOfWeek * MINUTES_PER_DAY + _parse_clock(window.startTime)
+        end = window.dayOfWeek * MINUTES_PER_DAY + _parse_clock(window.endTime)
+        if end <= start:
+            # Overnight window, e.g. 22:00-06:00
+            end += MINUTES_PER_DAY
+        mask[np.arange(start, end) % MINUTES_PER_WEEK] = True
+    return mask
+
+
+def _covered(mask: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """Check, for all shifts at once, that every minute of [start, end) is available.
+
+    Starts are minutes of the week and ends may run into the next week;
+    available minutes are counted with prefix sums over two weeks of the mask.
+    """
+    available = np.concatenate([[0], np.cumsum(np.tile(mask, 2), dtype=np.int64)])
+    lengths = ends - starts
+    fits = lengths < MINUTES_PER_WEEK
+    ends = np.where(fits, ends, starts)
+    covered = available[ends] - available[starts] == lengths
+    # Shifts of a week or longer need availability around the clock
+    return np.where(fits, covered, bool(mask.all()))
+
+
+def _parse_clock(value: str) -> int:
+    """Parse an HH:MM string into minutes since midnight."""
+    hours, minutes = value.split(':')[:2]
+    return int(hours) * 60 + int(minutes)
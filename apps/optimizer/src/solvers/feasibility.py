@@ -0,0 +1,199 @@
+"""Polynomial pre-checks that reject obviously infeasible requests before CP-SAT."""
+import math
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from ..models.constraint_model import Constraint
+from .conflict_graph import build_conflict_cliques, min_rest_minutes
+from .eligibility import Eligibility
+from .problem_instance import ProblemInstance
+
+
+def check_feasibility(
+    instance: ProblemInstance,
+    eligibility: Eligibility,
+    constraints: List[Constraint],
+) -> List[Dict]:
+    """Return the violated necessary conditions of a request, if any.
+
+    Three checks, each a necessary condition for a feasible roster:
+
+    - qualified headcount: every shift has at least ``min_staffing``
+      eligible employees, and ``max_staffing`` is not below it;
+    - concurrent demand: within every maximal clique of conflicting shifts
+      (overlapping or closer than the minimum rest) an employee works at most
+      one shift, so the clique's minimum staffing must be coverable by a
+      bipartite b-matching (Hall's condition, checked with max-flow);
+    - hours capacity: the minimum staffed minutes of the shifts needing a
+      skill fit into the max-hours capacity of the employees having it.
+
+    Each issue names the bottleneck shifts and skills.
+    """
+    issues = []
+    min_staffing = np.array([shift.min_staffing for shift in instance.shifts], dtype=np.int64)
+    qualified = np.array(
+        [len(eligibility.employees_by_shift[idx]) for idx in range(instance.num_shifts)], dtype=np.int64
+    )
+    staffable = np.minimum(
+        qualified, np.array([shift.max_staffing for shift in instance.shifts], dtype=np.int64)
+    )
+
+    short = staffable < min_staffing
+    for shift_idx in np.flatnonzero(short).tolist():
+        issues.append(_staffing_issue(
+            instance, 'qualified_headcount', [shift_idx], min_staffing, int(staffable[shift_idx])
+        ))
+
+    # Shifts already reported above would make every clique around them fail too
+    cliques = build_conflict_cliques(
+        instance.start_minutes, instance.end_minutes, min_rest_minutes(constraints)
+    )
+    for clique in cliques:
+        demanded = [idx for idx in clique if min_staffing[idx] > 0 and not short[idx]]
+        if len(demanded) < 2:
+            continue
+        covered = _max_coverage(eligibility, demanded, min_staffing)
+        if covered < min_staffing[demanded].sum():
+            issues.append(_staffing_issue(instance, 'concurrent_demand', demanded, min_staffing, covered))
+
+    issues.extend(_hours_capacity_issues(instance, constraints, min_staffing))
+    return issues
+
+
+def _max_coverage(eligibility: Eligibility, shift_indices: List[int], demand: np.ndarray) -> int:
+    """Maximum staffing of mutually conflicting shifts, one shift per employee.
+
+    Augmenting-path b-matching between employees (capacity 1) and shifts
+    (capacity ``demand``); the matched count is the max-flow value.
+    """
+    assigned_to: Dict[int, int] = {}  # employee -> shift
+    load = {shift_idx: 0 for shift_idx in shift_indices}
+
+    def augment(root: int) -> bool:
+        # Depth-first search with an explicit stack: paths can be longer than
+        # the recursion limit. path[i] leads from stack[i] to stack[i + 1].
+        visited = set()
+        stack = [(root, iter(eligibility.employees_by_shift[root]))]
+        path: List[int] = []
+        while stack:
+            shift_idx, candidates = stack[-1]
+            emp_idx = next((emp for emp in candidates if emp not in visited), None)
+            if emp_idx is None:
+                stack.pop()
+                if path:
+                    path.pop()
+                continue
+            visited.add(emp_idx)
+            path.append(emp_idx)
+            current = assigned_to.get(emp_idx)
+            if current is None:
+                for (path_shift, _), path_emp in zip(stack, path):
+                    assigned_to[path_emp] = path_shift
+                return True
+            stack.append((current, iter(eligibility.employees_by_shift[current])))
+        return False
+
+    for shift_idx in shift_indices:
+        for _ in range(int(demand[shift_idx])):
+            if not augment(shift_idx):
+                break
+            load[shift_idx] += 1
+    return sum(load.values())
+
+
+def _hours_capacity_issues(
+    instance: ProblemInstance,
+    constraints: List[Constraint],
+    min_staffing: np.ndarray,
+) -> List[Dict]:
+    """Compare minimum staffed minutes with max-hours capacity, per skill."""
+    capacity = _max_minutes_per_employee(instance, constraints)
+    if capacity is None:
+        return []
+
+    issues = []
+    demand_minutes = min_staffing * instance.duration_minutes
+    total_required = int(demand_minutes.sum())
+    if total_required > capacity * instance.num_employees:
+        issues.append({
+            'check': 'hours_capacity',
+            'shiftIds': [],
+            'skills': [],
+            'required': total_required / 60.0,
+            'available': capacity * instance.num_employees / 60.0,
+            'message': (
+                f'Shifts need {total_required / 60.0:g} staffed hours but max-hours rules '
+                f'allow {capacity * instance.num_employees / 60.0:g}'
+            ),
+        })
+
+    for skill_idx, skill in enumerate(instance.skill_names):
+        needs = instance.skill_index.column(instance.shift_skills, skill_idx)
+        has = instance.skill_index.column(instance.employee_skills, skill_idx)
+        required = int(demand_minutes[needs].sum())
+        available = capacity * int(has.sum())
+        if required > available:
+            issues.append({
+                'check': 'hours_capacity',
+                'shiftIds': [instance.shift_ids[idx] for idx in np.flatnonzero(needs)],
+                'skills': [skill],
+                'required': required / 60.0,
+                'available': available / 60.0,
+                'message': (
+                    f"Shifts needing '{skill}' need {required / 60.0:g} staffed hours but "
+                    f"max-hours rules allow {available / 60.0:g} for qualified employees"
+                ),
+            })
+    return issues
+
+
+def _max_minutes_per_employee(instance: ProblemInstance, constraints: List[Constraint]) -> Optional[int]:
+    """Upper bound on the minutes one employee may work over the horizon."""
+    bounds = []
+    for constraint in constraints:
+        for period_days, max_hours in constraint.get_hour_limits():
+            periods = math.ceil(instance.num_days / period_days)
+            bounds.append(int(max_hours * 60) * periods)
+    return min(bounds) if bounds else None
+
+
+def _staffing_issue(
+    instance: ProblemInstance,
+    check: str,
+    shift_indices: List[int],
+    min_staffing: np.ndarray,
+    available: int,
+) -> Dict:
+    """Describe a staffing shortfall, naming the shifts and their scarce skills."""
+    shift_ids = [instance.shift_ids[idx] for idx in shift_indices]
+    required = int(min_staffing[shift_indices].sum())
+    skills = _scarce_skills(instance, shift_indices, min_staffing)
+    if len(shift_ids) == 1:
+        where = f'Shift {shift_ids[0]} needs'
+    else:
+        where = f"Conflicting shifts {', '.join(shift_ids)} need"
+    message = f'{where} {required} employee(s) but at most {available} can be staffed'
+    if skills:
+        message += f" (scarce skills: {', '.join(skills)})"
+    return {
+        'check': check,
+        'shiftIds': shift_ids,
+        'skills': skills,
+        'required': required,
+        'available': available,
+        'message': message,
+    }
+
+
+def _scarce_skills(instance: ProblemInstance, shift_indices: List[int], min_staffing: np.ndarray) -> List[str]:
+    """Required skills held by fewer employees than the given shifts need."""
+    scarce = []
+    for skill_idx, skill in enumerate(instance.skill_names):
+        needs = instance.skill_index.column(instance.shift_skills[shift_indices], skill_idx)
+        if not needs.any():
+            continue
+        demand = int(min_staffing[shift_indices][needs].sum())
+        if int(instance.skill_index.column(instance.employee_skills, skill_idx).sum()) < demand:
+            scarce.append(skill)
+    return scarce
@@ -0,0 +1,90 @@
+"""Cache of built CP-SAT models, reused by requests of the same structure."""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+from ortools.sat.python import cp_model
+
+from ..models.constraint_model import Constraint
+from ..models.employee_model import Employee
+from ..models.optimization_request import OptimizationOptions
+from ..models.schedule_model import Schedule, Shift
+from .eligibility import Eligibility
+
+
+class BuiltModel(NamedTuple):
+    """A model with every variable and constraint, but no hints or objective.
+
+    Variables are kept as proto indices so that they can be looked up in a
+    clone of ``model``.
+    """
+    model: cp_model.CpModel
+    eligibility: Eligibility
+    # employee index -> shift index -> assignment variable index
+    assignments: Dict[int, Dict[int, int]]
+    # (violation variable index, weight) of soft constraints
+    penalties: List[Tuple[int, int]]
+    # (variable index, measure, upper bound, allowed) of auxiliary variables
+    aux_hints: List[Tuple[int, Callable, int, int]]
+
+
+class ModelCache:
+    """Keeps the ``max_models`` most recently used built models.
+
+    Models are never modified once cached; every user works on a clone.
+    """
+
+    def __init__(self, max_models: int):
+        self.max_models = max_models
+        self._models: 'OrderedDict[str, BuiltModel]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def get(self, key: str) -> Optional[BuiltModel]:
+        with self._lock:
+            built = self._models.get(key)
+            if built is not None:
+                self._models.move_to_end(key)
+            return built
+
+    def put(self, key: str, built: BuiltModel) -> None:
+        with self._lock:
+            self._models[key] = built
+            self._models.move_to_end(key)
+            while len(self._models) > self.max_models:
+                self._models.popitem(last=False)
+
+
+def structure_key(
+    employees: List[Employee],
+    shifts: List[Shift],
+    constraints: List[Constraint],
+    current_schedules: List[Schedule],
+    options: OptimizationOptions,
+    frozen_shifts: Optional[np.ndarray],
+    hinted_employees: Set[int],
+) -> str:
+    """SHA-256 of everything the model depends on before hints and objective.
+
+    Employees and shifts are hashed in order, since their positions are the
+    variable indices. Of the options only those shaping constraints count;
+    the objective, time limit and solution count do not. Hinted employees
+    only matter with symmetry breaking, which leaves them unordered.
+    """
+    structure = {
+        'employees': [employee.model_dump(mode='json') for employee in employees],
+        'shifts': [shift.model_dump(mode='json') for shift in shifts],
+        'constraints': [constraint.model_dump(mode='json') for constraint in constraints],
+        'currentSchedules': [schedule.model_dump(mode='json') for schedule in current_schedules],
+        'softPriorityThreshold': options.softPriorityThreshold,
+        'symmetryBreaking': options.symmetryBreaking,
+        'frozenShifts': np.flatnonzero(frozen_shifts).tolist() if frozen_shifts is not None else None,
+        'hintedEmployees': sorted(hinted_employees) if options.symmetryBreaking else None,
+    }
+    canonical = json.dumps(structure, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
@@ -1,14 +1,34 @@
 """OR-Tools optimization engine for scheduling."""
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
+import threading
 import time
 
+import numpy as np
 from ortools.sat.python import cp_model
 
 from ..models.employee_model import Employee
 from ..models.schedule_model import Shift, Schedule
 from ..models.constraint_model import Constraint
 from ..models.optimization_request import OptimizationOptions
+from .conflict_graph import build_conflict_cliques, min_rest_minutes
+from .eligibility import Eligibility, compute_eligibility
+from .model_cache import BuiltModel, ModelCache, structure_key
+from .problem_instance import ProblemInstance, compile_instance, window_sums
+from .profiling import SolveProfile
+from .solution_pool import SolutionPool, unpack_values
+from .symmetry import add_lex_greater_equal, employee_classes
+from .violations import count_violations
+
+# Minutes of overtime that one violation counted in shifts or days weighs as
+# (an extra shift in a min-rest gap, an extra or short run of working days,
+# a shift above the fair bound), so such a violation costs as much as an hour
+# of soft max_hours overtime
+VIOLATION_UNIT_MINUTES = 60
+
+# Seconds a search with every soft constraint held gets to find a roster
+# before violations are allowed
+STRICT_SEARCH_SECONDS = 2.0
 
 
 class OptimizationEngine:
@@ -20,10 +40,21 @@ class OptimizationEngine:
         shifts: List[Shift],
         constraints: List[Constraint],
         current_schedules: List[Schedule],
-        options: OptimizationOptions
+        options: OptimizationOptions,
+        instance: Optional[ProblemInstance] = None,
+        num_workers: Optional[int] = None,
+        stop_event=None,
+        on_solution: Optional[Callable[[Dict], None]] = None,
+        hints: Optional[List[Tuple[str, str]]] = None,
+        frozen_shifts: Optional[np.ndarray] = None,
+        model_cache: Optional[ModelCache] = None,
+        profile: Optional[SolveProfile] = None,
+        eligibility: Optional[Eligibility] = None
     ):
         self.employees = employees
         self.shifts = shifts
+        # Compiled arrays; the engine never re-parses shift timestamps
+        self.instance = instance or compile_instance(employees, shifts)
         self.constraints = constraints
         self.current_schedules = current_schedules
         self.options = options
@@ -35,162 +66,715 @@ class OptimizationEngine:
         # Set time limit
         self.solver.parameters.max_time_in_seconds = float(options.maxOptimizationTime)
         
-        # Decision variables: employee_shift[employee_idx][shift_idx] = 1 if assigned
+        # Bound search workers so concurrent solves share the machine's cores
+        if num_workers:
+            self.solver.parameters.num_workers = num_workers
+        
+        # Event-like object (threading or multiprocessing manager Event);
+        # setting it stops the running search and keeps the best solution
+        self.stop_event = stop_event
+        self._search_done = threading.Event()
+        
+        # Called with every improving incumbent while the search runs
+        self.on_solution = on_solution
+        
+        # (employee_id, shift_id) assignments from a previously accepted solution
+        self.hints = hints or []
+        # Minutes per employee under the hinted roster, None when nothing is hinted
+        self.hinted_minutes: Optional[np.ndarray] = None
+        self._hinted_day_minutes: Optional[np.ndarray] = None
+        self.hinted_employees: set = set()
+        self.hinted_pairs: set = set()
+        # (variable, measure of the hinted roster, upper bound, allowed amount) of
+        # auxiliary variables, hinted once the model is built; see _hint_later
+        self._aux_hints: List[Tuple[cp_model.IntVar, Callable[['OptimizationEngine'], int], int, int]] = []
+        
+        # Built models reused across requests of the same structure
+        self.model_cache = model_cache
+        # Phase timings and model statistics, possibly shared with other engines
+        self.profile = profile or SolveProfile()
+        
+        # Boolean mask of shifts whose assignments are fixed to their pinned pairs
+        self.frozen_shifts = frozen_shifts
+        
+        # Decision variables: employee_shift[employee_idx][shift_idx] = 1 if assigned.
+        # Only eligible pairs get a variable, so the inner dicts are sparse.
         self.employee_shift = {}
         self.employee_idx_map = {emp.id: idx for idx, emp in enumerate(employees)}
         self.shift_idx_map = {shift.id: idx for idx, shift in enumerate(shifts)}
+        self.eligibility: Optional[Eligibility] = None
+        # Eligibility the caller already computed for this instance, schedules and constraints
+        self._computed_eligibility = eligibility
+        
+        # Enforcement literal per constraint family / Constraint id; only set
+        # while explaining infeasibility, so regular solves stay unguarded
+        self._guards: Optional[Dict[str, cp_model.IntVar]] = None
+        self.status = cp_model.UNKNOWN
+        
+        # (violation variable, weight per unit) of soft constraints, minimized
+        # before the objective (see _solve_lexicographic)
+        self.penalties: List[Tuple[cp_model.IntVar, int]] = []
+        # Weight factor of each soft priority: its rank among them, so that
+        # weights stay small whatever priority values a request uses
+        soft_priorities = sorted({c.priority for c in constraints if self._is_soft(c)})
+        self._priority_ranks = {priority: rank for rank, priority in enumerate(soft_priorities, start=1)}
+        self._objective: Optional[cp_model.LinearExpr] = None
+        
+        # Per employee, one "works on day d" literal per day (None without eligible shifts)
+        self._works_on_day: Dict[int, List[Optional[cp_model.IntVar]]] = {}
 
     def solve(self) -> List[Dict]:
         """Solve the optimization problem and return solutions."""
         start_time = time.time()
         
-        # Create decision variables
-        self._create_variables()
+        # Current and previously accepted assignments to warm-start from
+        self._resolve_hints()
         
-        # Add constraints
-        self._add_constraints()
+        # Eligibility, decision variables and constraints, unless cached
+        self._build()
+        
+        # Warm-start every variable from the resolved assignments
+        with self.profile.phase('hints'):
+            self._add_hints()
         
         # Set objective
-        self._set_objective()
+        with self.profile.phase('objective'):
+            self._set_objective()
         
         # Solve
         solution_callback = SolutionCollector(
             self.employee_shift,
-            self.employees,
-            self.shifts,
-            self.options.solutionCount
+            self.eligibility,
+            self.instance,
+            self.options.solutionCount,
+            min_distance=self.options.minSolutionDistance,
+            on_solution=self.on_solution,
+            constraints=self.constraints
         )
         
-        status = self.solver.Solve(self.model, solution_callback)
+        if self.stop_event is not None:
+            threading.Thread(target=self._watch_stop_event, daemon=True).start()
+        try:
+            if self.penalties:
+                searched, status = self._solve_lexicographic(solution_callback)
+            else:
+                searched = self.model
+                with self.profile.phase('search'):
+                    status = self.solver.Solve(self.model, solution_callback)
+        finally:
+            self._search_done.set()
+        self.status = status
+        self.profile.record_search(searched, self.solver, status, solution_callback.first_solution_at)
         
         solve_time = (time.time() - start_time) * 1000  # Convert to milliseconds
         
-        if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
-            solutions = solution_callback.get_solutions()
-            if not solutions:
-                # If no solutions collected, create one from current state
-                solutions = [self._create_solution_from_current(solve_time)]
-            return solutions
-        else:
-            # Return partial solution if available
-            return solution_callback.get_solutions()
+        with self.profile.phase('extraction'):
+            if status in [cp_model.OPTIMAL, cp_model.FEASIBLE]:
+                solutions = solution_callback.get_solutions()
+                if not solutions:
+                    # If no solutions collected, create one from current state
+                    solutions = [self._create_solution_from_current(solve_time)]
+                return solutions
+            else:
+                # Return partial solution if available
+                return solution_callback.get_solutions()
 
-    def _create_variables(self):
-        """Create decision variables for employee-shift assignments."""
-        num_employees = len(self.employees)
-        num_shifts = len(self.shifts)
+    def explain_infeasibility(self, time_limit: float) -> Optional[List[str]]:
+        """Find a minimal set of constraints that cannot hold together.
+
+        Every constraint family (``staffing``, ``pinned``, ``no_overlap``) and
+        every max_hours, min_rest and fair_distribution record is enforced by
+        its own literal, and all literals are solved as assumptions. CP-SAT's
+        sufficient assumptions for infeasibility are then shrunk one literal
+        at a time until dropping any of them makes the model feasible.
+
+        Returns the conflicting family names and constraint ids, or None if
+        infeasibility is not proven within ``time_limit`` seconds.
+        """
+        deadline = time.time() + time_limit
+        self._guards = {}
+        self.eligibility = self._compute_eligibility()
+        self._create_variables()
+        self._add_constraints()
         
-        for emp_idx in range(num_employees):
+        core = self._infeasible_core(list(self._guards), deadline)
+        if core is None:
+            return None
+        for key in list(core):
+            if key not in core:
+                continue
+            smaller = self._infeasible_core([k for k in core if k != key], deadline)
+            if smaller is not None:
+                core = smaller
+        return core
+
+    def _infeasible_core(self, keys: List[str], deadline: float) -> Optional[List[str]]:
+        """Assumed guard keys sufficient for infeasibility, None if not proven."""
+        time_left = deadline - time.time()
+        if time_left <= 0:
+            return None
+        self.model.ClearAssumptions()
+        self.model.AddAssumptions([self._guards[key] for key in keys])
+        self.solver.parameters.max_time_in_seconds = time_left
+        if self.solver.Solve(self.model) != cp_model.INFEASIBLE:
+            return None
+        key_by_index = {self._guards[key].Index(): key for key in keys}
+        return [
+            key_by_index[index] for index in self.solver.SufficientAssumptionsForInfeasibility()
+            if index in key_by_index
+        ]
+
+    def _is_soft(self, constraint: Constraint) -> bool:
+        return constraint.is_soft(self.options.softPriorityThreshold)
+
+    def _add_violation(
+        self,
+        upper_bound: int,
+        weight: int,
+        name: str,
+        hint: Optional[Callable[['OptimizationEngine'], int]] = None,
+        allowed: int = 0,
+    ) -> cp_model.IntVar:
+        """Create a penalized violation variable for a soft constraint.
+
+        It is hinted with the part of ``hint`` (a measure of the hinted
+        roster) above ``allowed``.
+        """
+        violation = self.model.NewIntVar(0, max(upper_bound, 0), name)
+        self.penalties.append((violation, weight))
+        if hint is not None:
+            self._hint_later(violation, hint, upper_bound, allowed)
+        return violation
+
+    def _soft_weight(self, constraint: Constraint, per_unit: int = 1) -> int:
+        """Penalty of one violation unit of a soft constraint, scaled by its priority rank."""
+        return self._priority_ranks[constraint.priority] * per_unit
+
+    def _enforce(self, constraint: cp_model.Constraint, key: Optional[str]):
+        """Guard a constraint by the literal of ``key`` while explaining infeasibility."""
+        if self._guards is not None:
+            if key not in self._guards:
+                self._guards[key] = self.model.NewBoolVar(f'guard_{len(self._guards)}')
+            constraint.OnlyEnforceIf(self._guards[key])
+
+    def _solve_lexicographic(self, solution_callback: 'SolutionCollector') -> Tuple[cp_model.CpModel, int]:
+        """Search for the fewest weighted violations first, then for the best objective.
+
+        A roster without violations beats any other, so a clone of the model
+        is first searched with every violation fixed to 0, which presolve
+        reduces to the hard model. That search keeps the whole time limit
+        once it has a roster and otherwise gives up after a short budget
+        whose unused part is carried forward. Only then are violations
+        allowed: the least weighted violation found in half the remaining
+        time is kept as an incumbent and bounds the objective search, which
+        is hinted with its roster. ``self.model`` itself is left as built.
+
+        Returns the model searched last and its status.
+        """
+        time_limit = self.solver.parameters.max_time_in_seconds
+        deadline = time.time() + time_limit
+        strict = self.model.Clone()
+        for violation, _ in self.penalties:
+            strict.Add(strict.GetIntVarFromProtoIndex(violation.Index()) == 0)
+        give_up = threading.Timer(
+            min(time_limit / 2, STRICT_SEARCH_SECONDS), self._stop_without_solution, [solution_callback]
+        )
+        give_up.start()
+        try:
+            with self.profile.phase('search'):
+                status = self.solver.Solve(strict, solution_callback)
+        finally:
+            give_up.cancel()
+        if solution_callback.first_solution_at is not None or status == cp_model.MODEL_INVALID:
+            return strict, status
+        if self.stop_event is not None and self.stop_event.is_set():
+            return strict, status
+
+        relaxed = self.model.Clone()
+        violations = [relaxed.GetIntVarFromProtoIndex(violation.Index()) for violation, _ in self.penalties]
+        penalty = cp_model.LinearExpr.WeightedSum(violations, [weight for _, weight in self.penalties])
+        relaxed.Minimize(penalty)
+        self.solver.parameters.max_time_in_seconds = max((deadline - time.time()) / 2, 0.1)
+        with self.profile.phase('violations'):
+            status = self.solver.Solve(relaxed)
+        if status not in (cp_model.OPTIMAL, cp_model.FEASIBLE):
+            return relaxed, status
+        # Kept in case the objective search finds nothing within the time left
+        solution_callback.record(self.solver.ResponseProto(), self.solver.Value(self._objective))
+        if self.stop_event is not None and self.stop_event.is_set():
+            return relaxed, cp_model.FEASIBLE
+
+        relaxed.Add(penalty <= int(self.solver.ObjectiveValue()))
+        relaxed.ClearHints()
+        for index, value in enumerate(self.solver.ResponseProto().solution):
+            relaxed.AddHint(relaxed.GetIntVarFromProtoIndex(index), value)
+        relaxed.Minimize(self._objective)
+        self.solver.parameters.max_time_in_seconds = max(deadline - time.time(), 0.1)
+        with self.profile.phase('search'):
+            status = self.solver.Solve(relaxed, solution_callback)
+        if status == cp_model.UNKNOWN:
+            # The least-violation roster is still a solution
+            status = cp_model.FEASIBLE
+        return relaxed, status
+
+    def _stop_without_solution(self, solution_callback: 'SolutionCollector'):
+        """Stop the running search if it has not found a solution yet."""
+        if solution_callback.first_solution_at is None:
+            self.solver.StopSearch()
+
+    def _watch_stop_event(self):
+        """Stop the search once the stop event is set."""
+        while not self._search_done.is_set():
+            if self.stop_event.wait(0.1):
+                # Repeat until Solve returns in case the search had not started yet
+                self.solver.StopSearch()
+                self._search_done.wait(0.1)
+
+    def _build(self):
+        """Compute eligibility, create the decision variables and add all constraints.
+
+        With a ``model_cache``, the resulting model (before hints and
+        objective) is stored under the request's structure key, and a later
+        request with the same key, e.g. the same roster with another
+        objective, clones it instead of building it again.
+        """
+        key = None
+        if self.model_cache is not None:
+            with self.profile.phase('model_cache'):
+                key = structure_key(
+                    self.employees, self.shifts, self.constraints, self.current_schedules, self.options,
+                    self.frozen_shifts, self.hinted_employees
+                )
+                built = self.model_cache.get(key)
+                if built is not None:
+                    self._restore(built)
+                    return
+        
+        # Work out eligible employee-shift pairs
+        with self.profile.phase('eligibility'):
+            self.eligibility = self._compute_eligibility()
+        
+        # Create decision variables
+        with self.profile.phase('variables'):
+            self._create_variables()
+        
+        # Add constraints
+        self._add_constraints()
+        
+        if key is not None:
+            with self.profile.phase('model_cache'):
+                self._cache_model(key)
+
+    def _compute_eligibility(self) -> Eligibility:
+        """Eligible pairs, reusing the ones passed in unless shifts are frozen."""
+        if self._computed_eligibility is not None and self.frozen_shifts is None:
+            return self._computed_eligibility
+        return compute_eligibility(self.instance, self.current_schedules, self.frozen_shifts, self.constraints)
+
+    def _cache_model(self, key: str):
+        """Store a clone of the model, before hints and objective, under ``key``."""
+        self.model_cache.put(key, BuiltModel(
+            model=self.model.Clone(),
+            eligibility=self.eligibility,
+            assignments={
+                emp_idx: {shift_idx: var.Index() for shift_idx, var in emp_vars.items()}
+                for emp_idx, emp_vars in self.employee_shift.items()
+            },
+            penalties=[(var.Index(), weight) for var, weight in self.penalties],
+            aux_hints=[(var.Index(), *rule) for var, *rule in self._aux_hints],
+        ))
+
+    def _restore(self, built: BuiltModel):
+        """Continue from a clone of a cached model instead of building one."""
+        self.model = built.model.Clone()
+        self.eligibility = built.eligibility
+        self.employee_shift = {
+            emp_idx: {shift_idx: self.model.GetBoolVarFromProtoIndex(index) for shift_idx, index in indices.items()}
+            for emp_idx, indices in built.assignments.items()
+        }
+        self.penalties = [(self.model.GetIntVarFromProtoIndex(index), weight) for index, weight in built.penalties]
+        self._aux_hints = [(self.model.GetIntVarFromProtoIndex(index), *rule) for index, *rule in built.aux_hints]
+
+    def _create_variables(self):
+        """Create decision variables for eligible employee-shift assignments."""
+        for emp_idx, shift_indices in self.eligibility.shifts_by_employee.items():
             self.employee_shift[emp_idx] = {}
-            for shift_idx in range(num_shifts):
+            for shift_idx in shift_indices:
                 var_name = f'emp_{emp_idx}_shift_{shift_idx}'
                 self.employee_shift[emp_idx][shift_idx] = self.model.NewBoolVar(var_name)
 
+    def _resolve_hints(self):
+        """Collect the (employee, shift) pairs of confirmed/tentative schedules and cached assignments.
+
+        Cached assignments only fill shifts that have no current schedule.
+        """
+        hinted = set()
+        scheduled_shifts = set()
+        for schedule in self.current_schedules:
+            if schedule.status not in ('confirmed', 'tentative'):
+                continue
+            emp_idx = self.employee_idx_map.get(schedule.employee_id)
+            shift_idx = self.shift_idx_map.get(schedule.shift_id)
+            if emp_idx is not None and shift_idx is not None:
+                hinted.add((emp_idx, shift_idx))
+                scheduled_shifts.add(shift_idx)
+        
+        for employee_id, shift_id in self.hints:
+            emp_idx = self.employee_idx_map.get(employee_id)
+            shift_idx = self.shift_idx_map.get(shift_id)
+            if emp_idx is not None and shift_idx is not None and shift_idx not in scheduled_shifts:
+                hinted.add((emp_idx, shift_idx))
+        
+        self.hinted_pairs = hinted
+        self.hinted_employees = {emp_idx for emp_idx, _ in hinted}
+
+    def _add_hints(self):
+        """Hint CP-SAT with the resolved assignments.
+
+        When anything is hinted, every assignment variable gets a hint so that
+        CP-SAT starts from a complete roster. Auxiliary variables are hinted
+        from their rules (see :meth:`_hint_later`), objective helper variables
+        from ``hinted_minutes``.
+        """
+        if not self.hinted_pairs:
+            return
+        durations = self.instance.duration_minutes
+        self._hinted_day_minutes = np.zeros((self.instance.num_employees, self.instance.num_days), dtype=np.int64)
+        for emp_idx, shift_idx in self.eligibility.pairs:
+            is_hinted = (emp_idx, shift_idx) in self.hinted_pairs
+            self.model.AddHint(self.employee_shift[emp_idx][shift_idx], is_hinted)
+            if is_hinted:
+                self._hinted_day_minutes[emp_idx, self.instance.day_index[shift_idx]] += durations[shift_idx]
+        self.hinted_minutes = self._hinted_day_minutes.sum(axis=1)
+        
+        for var, measure, upper_bound, allowed in self._aux_hints:
+            self.model.AddHint(var, min(max(measure(self) - allowed, 0), upper_bound))
+
+    def _hint_later(
+        self,
+        var: cp_model.IntVar,
+        measure: Callable[['OptimizationEngine'], int],
+        upper_bound: int,
+        allowed: int = 0,
+    ):
+        """Hint an auxiliary variable with ``measure`` of the hinted roster, less ``allowed``.
+
+        Measures are functions of the engine rather than values so that a
+        cached model can be hinted from another request's roster.
+        """
+        self._aux_hints.append((var, measure, upper_bound, allowed))
+
+    def _hinted_minutes_in(self, emp_idx: int, first_day: int, end_day: int) -> int:
+        """Minutes the hinted roster has the employee working in days [first_day, end_day)."""
+        return int(self._hinted_day_minutes[emp_idx, first_day:end_day].sum())
+
+    def _hinted_days_in(self, emp_idx: int, first_day: int, end_day: int) -> int:
+        """Days in [first_day, end_day) on which the hinted roster has the employee working."""
+        return int((self._hinted_day_minutes[emp_idx, first_day:end_day] > 0).sum())
+
+    def _hinted_shifts_in(self, emp_idx: int, shift_indices: List[int]) -> int:
+        """Number of the given shifts the hinted roster assigns to the employee."""
+        return sum((emp_idx, shift_idx) in self.hinted_pairs for shift_idx in shift_indices)
+
+    def _hinted_short_run(self, emp_idx: int, day: int, min_days: int) -> int:
+        """1 if the hinted roster starts a run on ``day`` lasting fewer than ``min_days`` days."""
+        works = self._hinted_day_minutes[emp_idx] > 0
+        return int(works[day] and not works[day - 1] and not works[day:day + min_days].all())
+
     def _add_constraints(self):
-        """Add all constraints to the model."""
+        """Add all constraints to the model, timing each family as a ``constraints.*`` phase."""
         # Staffing constraints
-        self._add_staffing_constraints()
+        with self.profile.phase('constraints.staffing'):
+            self._add_staffing_constraints()
         
-        # Skill matching constraints
-        self._add_skill_constraints()
+        # Pinned assignments (skills and blocked pairs are handled by eligibility)
+        with self.profile.phase('constraints.pinned'):
+            self._add_pinned_constraints()
         
         # Max hours constraints
-        self._add_max_hours_constraints()
+        with self.profile.phase('constraints.max_hours'):
+            self._add_max_hours_constraints()
         
-        # Min rest constraints
-        self._add_min_rest_constraints()
+        # Min rest and overlapping shift constraints
+        with self.profile.phase('constraints.min_rest'):
+            self._add_min_rest_constraints()
         
         # Fair distribution constraints
-        self._add_fair_distribution_constraints()
+        with self.profile.phase('constraints.fair_distribution'):
+            self._add_fair_distribution_constraints()
+        
+        # Max/min consecutive working days
+        with self.profile.phase('constraints.consecutive_days'):
+            self._add_consecutive_days_constraints()
+        
+        # Lexicographic order within classes of interchangeable employees
+        if self.options.symmetryBreaking:
+            with self.profile.phase('constraints.symmetry'):
+                self._add_symmetry_breaking()
 
     def _add_staffing_constraints(self):
         """Ensure each shift has required staffing levels."""
         for shift_idx, shift in enumerate(self.shifts):
             assigned = [
                 self.employee_shift[emp_idx][shift_idx]
-                for emp_idx in range(len(self.employees))
+                for emp_idx in self.eligibility.employees_by_shift[shift_idx]
             ]
             total_assigned = sum(assigned)
-            self.model.Add(total_assigned >= shift.min_staffing)
-            self.model.Add(total_assigned <= shift.max_staffing)
+            self._enforce(self.model.Add(total_assigned >= shift.min_staffing), 'staffing')
+            self._enforce(self.model.Add(total_assigned <= shift.max_staffing), 'staffing')
 
-    def _add_skill_constraints(self):
-        """Ensure employees assigned to shifts have required skills."""
-        for shift_idx, shift in enumerate(self.shifts):
-            required_skills = shift.get_required_skills()
-            if not required_skills:
-                continue
-                
-            for emp_idx, employee in enumerate(self.employees):
-                has_all_skills = all(
-                    employee.has_skill(skill) for skill in required_skills
-                )
-                if not has_all_skills:
-                    # Employee cannot be assigned to this shift
-                    self.model.Add(self.employee_shift[emp_idx][shift_idx] == 0)
+    def _add_pinned_constraints(self):
+        """Force pinned employee-shift assignments."""
+        for emp_idx, shift_idx in sorted(self.eligibility.pinned):
+            self._enforce(self.model.Add(self.employee_shift[emp_idx][shift_idx] == 1), 'pinned')
 
     def _add_max_hours_constraints(self):
-        """Add maximum hours per period constraints."""
-        max_hours_constraints = [
-            c for c in self.constraints if c.type == 'max_hours'
+        """Cap worked hours in every rolling period of each max_hours limit.
+
+        Minutes are bucketed by the day a shift starts and accumulated into
+        one prefix-sum variable per employee and working day, so the hours of
+        any ``periodInDays`` run of days are the difference of two prefix
+        sums. Constraints grow linearly with the number of days; periods whose
+        eligible shifts cannot exceed the limit get no constraint at all.
+        """
+        # Convert hours to minutes (integers) for OR-Tools CP-SAT
+        # CP-SAT requires integer coefficients for linear constraints
+        limits = [
+            (constraint, period_days, int(max_hours * 60))
+            for constraint in self.constraints if constraint.type == 'max_hours'
+            for period_days, max_hours in constraint.get_hour_limits()
         ]
+        if not limits:
+            return
         
-        for constraint in max_hours_constraints:
-            max_hours = constraint.get_max_hours()
-            period_days = constraint.get_period_days() or 7
+        num_days = self.instance.num_days
+        for emp_idx, emp_vars in self.employee_shift.items():
+            if not emp_vars:
+                continue
+            shift_indices = np.fromiter(emp_vars, dtype=np.int64, count=len(emp_vars))
+            days = self.instance.day_index[shift_indices]
+            possible = np.bincount(
+                days, weights=self.instance.duration_minutes[shift_indices], minlength=num_days
+            ).astype(np.int64)
             
-            if max_hours:
-                # Convert hours to minutes (integers) for OR-Tools CP-SAT
-                # CP-SAT requires integer coefficients for linear constraints
-                max_minutes = int(max_hours * 60)
-                
-                # Calculate hours per employee for shifts in the period
-                for emp_idx, employee in enumerate(self.employees):
-                    total_minutes = []
-                    for shift_idx, shift in enumerate(self.shifts):
-                        hours = shift.get_duration_hours()
-                        # Convert hours to minutes (integer)
-                        minutes = int(round(hours * 60))
-                        total_minutes.append(
-                            self.employee_shift[emp_idx][shift_idx] * minutes
+            prefix = None
+            for constraint, period_days, max_minutes in limits:
+                period_days = min(period_days, num_days)
+                possible_sums = window_sums(possible, period_days)
+                for first_day in np.flatnonzero(possible_sums > max_minutes).tolist():
+                    if prefix is None:
+                        prefix = self._day_prefix_sums(emp_idx, emp_vars, days, possible)
+                    worked = prefix[first_day + period_days] - prefix[first_day]
+                    if self._is_soft(constraint):
+                        # Overtime minutes in the period are the violation
+                        overtime = self._add_violation(
+                            int(possible_sums[first_day]) - max_minutes, self._soft_weight(constraint),
+                            f'{constraint.id}_emp_{emp_idx}_day_{first_day}_overtime',
+                            partial(
+                                OptimizationEngine._hinted_minutes_in,
+                                emp_idx=emp_idx, first_day=first_day, end_day=first_day + period_days
+                            ),
+                            allowed=max_minutes
                         )
-                    if total_minutes:
-                        self.model.Add(sum(total_minutes) <= max_minutes)
+                        self.model.Add(worked - overtime <= max_minutes)
+                    else:
+                        self._enforce(self.model.Add(worked <= max_minutes), constraint.id)
+
+    def _day_prefix_sums(
+        self,
+        emp_idx: int,
+        emp_vars: Dict[int, cp_model.IntVar],
+        days: np.ndarray,
+        possible: np.ndarray,
+    ) -> List:
+        """Minutes worked before each day, as one variable per working day.
+
+        ``prefix[d]`` covers days ``[0, d)``; days without eligible shifts
+        reuse the previous day's variable.
+        """
+        durations = self.instance.duration_minutes
+        vars_by_day: Dict[int, List[int]] = {}
+        for shift_idx, day in zip(emp_vars, days.tolist()):
+            vars_by_day.setdefault(day, []).append(shift_idx)
+        
+        prefix = [0]
+        bounds = np.cumsum(possible)
+        for day in range(self.instance.num_days):
+            shift_indices = vars_by_day.get(day)
+            if not shift_indices:
+                prefix.append(prefix[-1])
+                continue
+            total = self.model.NewIntVar(0, int(bounds[day]), f'emp_{emp_idx}_minutes_to_day_{day}')
+            self.model.Add(total == prefix[-1] + cp_model.LinearExpr.WeightedSum(
+                [emp_vars[idx] for idx in shift_indices], [int(durations[idx]) for idx in shift_indices]
+            ))
+            self._hint_later(
+                total, partial(OptimizationEngine._hinted_minutes_in, emp_idx=emp_idx, first_day=0, end_day=day + 1),
+                int(bounds[day])
+            )
+            prefix.append(total)
+        return prefix
 
     def _add_min_rest_constraints(self):
-        """Add minimum rest between shifts constraints."""
-        min_rest_constraints = [
-            c for c in self.constraints if c.type == 'min_rest'
-        ]
+        """Forbid overlapping shifts and shifts closer than the minimum rest.
+
+        Conflicting shifts are grouped into maximal cliques once, and each
+        employee gets one AddAtMostOne per clique instead of one pairwise
+        constraint per conflicting pair. While explaining infeasibility, plain
+        overlaps and each hard min_rest record get their own cliques instead.
+        Soft min_rest records allow more than one shift per clique at a
+        penalty per extra shift; overlapping shifts are always forbidden.
+        """
+        rest_rules = [c for c in self.constraints if c.type == 'min_rest']
+        hard = [c for c in rest_rules if not self._is_soft(c)]
+        if self._guards is None:
+            self._add_conflict_cliques(min_rest_minutes(hard), None)
+        else:
+            self._add_conflict_cliques(0, 'no_overlap')
+            for constraint in hard:
+                self._add_conflict_cliques(min_rest_minutes([constraint]), constraint.id)
         
-        if not min_rest_constraints:
-            return
-            
-        min_rest_hours = min_rest_constraints[0].get_min_rest_hours() or 8.0
+        hard_rest = min_rest_minutes(hard)
+        for constraint in rest_rules:
+            if self._is_soft(constraint) and min_rest_minutes([constraint]) > hard_rest:
+                self._add_conflict_cliques(min_rest_minutes([constraint]), None, constraint)
+
+    def _add_conflict_cliques(self, rest_minutes: int, key: Optional[str], soft: Optional[Constraint] = None):
+        """At most one shift per employee in every clique of conflicting shifts.
+
+        For a ``soft`` rule, every extra shift in a clique is a violation.
+        """
+        cliques = build_conflict_cliques(
+            self.instance.start_minutes, self.instance.end_minutes, rest_minutes
+        )
+        for emp_idx, emp_vars in self.employee_shift.items():
+            for clique_idx, clique in enumerate(cliques):
+                clique_shifts = [idx for idx in clique if idx in emp_vars]
+                if len(clique_shifts) < 2:
+                    continue
+                clique_vars = [emp_vars[idx] for idx in clique_shifts]
+                if soft is None:
+                    self._enforce(self.model.AddAtMostOne(clique_vars), key)
+                    continue
+                extra = self._add_violation(
+                    len(clique_vars) - 1, self._soft_weight(soft, per_unit=VIOLATION_UNIT_MINUTES),
+                    f'{soft.id}_emp_{emp_idx}_clique_{clique_idx}',
+                    partial(OptimizationEngine._hinted_shifts_in, emp_idx=emp_idx, shift_indices=clique_shifts),
+                    allowed=1
+                )
+                self.model.Add(sum(clique_vars) <= 1 + extra)
+
+    def _add_symmetry_breaking(self):
+        """Order the assignment rows of interchangeable employees.
+
+        Any roster can be permuted within a class so that rows are in
+        descending lexicographic order, so this removes only symmetric
+        duplicates. Pinned and hinted employees keep their identity. Opt-in:
+        CP-SAT's presolve already detects these classes as orbitopes, and the
+        explicit ordering is only worth it where that detection gives up.
+        """
+        excluded = {emp_idx for emp_idx, _ in self.eligibility.pinned} | self.hinted_employees
+        for group in employee_classes(self.eligibility, excluded):
+            shift_indices = self.eligibility.shifts_by_employee[group[0]]
+            rows = [
+                [self.employee_shift[emp_idx][shift_idx] for shift_idx in shift_indices]
+                for emp_idx in group
+            ]
+            for left, right in zip(rows, rows[1:]):
+                add_lex_greater_equal(self.model, left, right)
+
+    def _add_consecutive_days_constraints(self):
+        """Bound runs of consecutive working days.
+
+        Both rules work on one "works on day d" literal per employee and day
+        instead of on shift combinations. max_consecutive_days caps the
+        worked days in every window of ``maxDays + 1`` days. For
+        min_consecutive_days, a run starting on day ``d`` forces the next
+        ``minDays - 1`` days; runs cut by the horizon are exempt.
+        """
+        for constraint in self.constraints:
+            max_days = constraint.get_max_consecutive_days()
+            min_days = constraint.get_min_consecutive_days()
+            if not max_days and not (min_days and min_days > 1):
+                continue
+            for emp_idx, emp_vars in self.employee_shift.items():
+                if not emp_vars:
+                    continue
+                works = self._worked_days(emp_idx, emp_vars)
+                if max_days:
+                    self._add_max_consecutive_days(emp_idx, works, max_days, constraint)
+                else:
+                    self._add_min_consecutive_days(emp_idx, works, min_days, constraint)
+
+    def _add_max_consecutive_days(
+        self, emp_idx: int, works: List[Optional[cp_model.IntVar]], max_days: int, constraint: Constraint
+    ):
+        """At most ``max_days`` worked days in every window of ``max_days + 1``."""
+        for first_day in range(len(works) - max_days):
+            window = [work for work in works[first_day:first_day + max_days + 1] if work is not None]
+            if len(window) <= max_days:
+                continue
+            if self._is_soft(constraint):
+                excess = self._add_violation(
+                    1, self._soft_weight(constraint, per_unit=VIOLATION_UNIT_MINUTES),
+                    f'{constraint.id}_emp_{emp_idx}_day_{first_day}_excess',
+                    partial(
+                        OptimizationEngine._hinted_days_in,
+                        emp_idx=emp_idx, first_day=first_day, end_day=first_day + max_days + 1
+                    ),
+                    allowed=max_days
+                )
+                self.model.Add(sum(window) <= max_days + excess)
+            else:
+                self._enforce(self.model.Add(sum(window) <= max_days), constraint.id)
+
+    def _add_min_consecutive_days(
+        self, emp_idx: int, works: List[Optional[cp_model.IntVar]], min_days: int, constraint: Constraint
+    ):
+        """A run starting after day 0 lasts ``min_days`` days or reaches the horizon end."""
+        num_days = len(works)
+        for day in range(1, num_days):
+            if works[day] is None:
+                continue
+            # Clause literals: worked the day before, or not working today
+            run_start = [works[day].Not()] + ([works[day - 1]] if works[day - 1] is not None else [])
+            if self._is_soft(constraint):
+                short = self._add_violation(
+                    1, self._soft_weight(constraint, per_unit=VIOLATION_UNIT_MINUTES),
+                    f'{constraint.id}_emp_{emp_idx}_day_{day}_short',
+                    partial(OptimizationEngine._hinted_short_run, emp_idx=emp_idx, day=day, min_days=min_days)
+                )
+                run_start.append(short)
+            for later in range(day + 1, min(day + min_days, num_days)):
+                if works[later] is None:
+                    self._enforce(self.model.AddBoolOr(run_start), constraint.id)
+                    break
+                self._enforce(self.model.AddBoolOr(run_start + [works[later]]), constraint.id)
+
+    def _worked_days(self, emp_idx: int, emp_vars: Dict[int, cp_model.IntVar]) -> List[Optional[cp_model.IntVar]]:
+        """Per-day "works on day d" literals of an employee, by the day shifts start."""
+        if emp_idx in self._works_on_day:
+            return self._works_on_day[emp_idx]
+        vars_by_day: Dict[int, List[cp_model.IntVar]] = {}
+        for shift_idx, var in emp_vars.items():
+            vars_by_day.setdefault(int(self.instance.day_index[shift_idx]), []).append(var)
         
-        # For each employee, ensure minimum rest between consecutive shifts
-        for emp_idx in range(len(self.employees)):
-            for shift1_idx, shift1 in enumerate(self.shifts):
-                for shift2_idx, shift2 in enumerate(self.shifts):
-                    if shift1_idx == shift2_idx:
-                        continue
-                    
-                    # Check if shifts are consecutive
-                    shift1_end = datetime.fromisoformat(
-                        shift1.end_time.replace('Z', '+00:00')
-                    )
-                    shift2_start = datetime.fromisoformat(
-                        shift2.start_time.replace('Z', '+00:00')
-                    )
-                    
-                    rest_hours = (shift2_start - shift1_end).total_seconds() / 3600.0
-                    
-                    if 0 < rest_hours < min_rest_hours:
-                        # Cannot assign both shifts to same employee
-                        self.model.Add(
-                            self.employee_shift[emp_idx][shift1_idx] +
-                            self.employee_shift[emp_idx][shift2_idx] <= 1
-                        )
+        works: List[Optional[cp_model.IntVar]] = []
+        for day in range(self.instance.num_days):
+            day_vars = vars_by_day.get(day)
+            if not day_vars:
+                works.append(None)
+                continue
+            work = self.model.NewBoolVar(f'emp_{emp_idx}_works_day_{day}')
+            for var in day_vars:
+                self.model.AddImplication(var, work)
+            self.model.AddBoolOr(day_vars + [work.Not()])
+            self._hint_later(
+                work, partial(OptimizationEngine._hinted_days_in, emp_idx=emp_idx, first_day=day, end_day=day + 1), 1
+            )
+            works.append(work)
+        self._works_on_day[emp_idx] = works
+        return works
 
     def _add_fair_distribution_constraints(self):
         """Add fair distribution constraints."""
@@ -212,13 +796,35 @@ class OptimizationEngine:
         target_shifts = num_shifts // num_employees
         max_shifts = target_shifts + 1
         
-        for emp_idx in range(num_employees):
-            employee_shifts = [
-                self.employee_shift[emp_idx][shift_idx]
-                for shift_idx in range(num_shifts)
-            ]
-            if employee_shifts:
-                self.model.Add(sum(employee_shifts) <= max_shifts)
+        # The bound is shared; each record only gets its own copy when guarded
+        hard = [c for c in fair_dist_constraints if not self._is_soft(c)]
+        if not hard:
+            self._add_soft_fair_distribution(max(fair_dist_constraints, key=lambda c: c.priority), max_shifts)
+            return
+        keys = [c.id for c in hard] if self._guards is not None else [None]
+        for key in keys:
+            for emp_idx in range(num_employees):
+                employee_shifts = list(self.employee_shift[emp_idx].values())
+                if employee_shifts:
+                    self._enforce(self.model.Add(sum(employee_shifts) <= max_shifts), key)
+
+    def _add_soft_fair_distribution(self, constraint: Constraint, max_shifts: int):
+        """Penalize every shift an employee works above the fair bound."""
+        for emp_idx, emp_vars in self.employee_shift.items():
+            if len(emp_vars) <= max_shifts:
+                continue
+            excess = self._add_violation(
+                len(emp_vars) - max_shifts, self._soft_weight(constraint, per_unit=VIOLATION_UNIT_MINUTES),
+                f'{constraint.id}_emp_{emp_idx}_excess',
+                partial(OptimizationEngine._hinted_shifts_in, emp_idx=emp_idx, shift_indices=list(emp_vars)),
+                allowed=max_shifts
+            )
+            self.model.Add(sum(emp_vars.values()) <= max_shifts + excess)
+
+    def _minimize(self, objective):
+        """Minimize the objective; soft-constraint penalties are minimized before it."""
+        self._objective = objective
+        self.model.Minimize(objective)
 
     def _set_objective(self):
         """Set optimization objective."""
@@ -229,36 +835,41 @@ class OptimizationEngine:
         else:  # balance
             self._balance_objective()
 
+    def _worked_minutes(self, emp_vars: Dict[int, cp_model.IntVar]) -> cp_model.LinearExpr:
+        """Linear expression of minutes worked over the given shift variables."""
+        durations = self.instance.duration_minutes
+        return cp_model.LinearExpr.WeightedSum(
+            list(emp_vars.values()),
+            [int(durations[shift_idx]) for shift_idx in emp_vars]
+        )
+
+    def _total_minutes(self) -> cp_model.LinearExpr:
+        """Linear expression of minutes worked across all assignments."""
+        durations = self.instance.duration_minutes
+        return cp_model.LinearExpr.WeightedSum(
+            [self.employee_shift[emp_idx][shift_idx] for emp_idx, shift_idx in self.eligibility.pairs],
+            [int(durations[shift_idx]) for _, shift_idx in self.eligibility.pairs]
+        )
+
     def _minimize_cost(self):
         """Minimize total cost (e.g., overtime, penalties)."""
-        cost = []
-        for emp_idx in range(len(self.employees)):
-            for shift_idx, shift in enumerate(self.shifts):
-                hours = shift.get_duration_hours()
-                # Convert hours to minutes (integer) for OR-Tools CP-SAT
-                minutes = int(round(hours * 60))
-                # Simple cost model: cost increases with hours
-                cost.append(self.employee_shift[emp_idx][shift_idx] * minutes)
-        self.model.Minimize(sum(cost))
+        # Simple cost model: cost increases with minutes worked
+        self._minimize(self._total_minutes())
 
     def _maximize_fairness(self):
         """Maximize fairness (minimize variance in hours)."""
         # Simplified: minimize difference between max and min hours per employee
         # Use integer variables for hours (in minutes)
+        horizon_minutes = int(self.instance.duration_minutes.sum())
         employee_hours_vars = []
         for emp_idx in range(len(self.employees)):
-            hours_terms = []
-            for shift_idx, shift in enumerate(self.shifts):
-                hours = shift.get_duration_hours()
-                # Convert hours to minutes (integer) for OR-Tools CP-SAT
-                minutes = int(round(hours * 60))
-                hours_terms.append(
-                    self.employee_shift[emp_idx][shift_idx] * minutes
-                )
-            if hours_terms:
+            emp_vars = self.employee_shift[emp_idx]
+            if emp_vars:
                 # Create integer variable for total hours (in minutes)
-                total_minutes = self.model.NewIntVar(0, 10000, f'emp_{emp_idx}_total_minutes')
-                self.model.Add(total_minutes == sum(hours_terms))
+                total_minutes = self.model.NewIntVar(0, horizon_minutes, f'emp_{emp_idx}_total_minutes')
+                self.model.Add(total_minutes == self._worked_minutes(emp_vars))
+                if self.hinted_minutes is not None:
+                    self.model.AddHint(total_minutes, int(self.hinted_minutes[emp_idx]))
                 employee_hours_vars.append(total_minutes)
             else:
                 zero_var = self.model.NewIntVar(0, 0, f'emp_{emp_idx}_total_minutes')
@@ -266,8 +877,11 @@ class OptimizationEngine:
         
         # Minimize variance (simplified: minimize max - min)
         if employee_hours_vars:
-            max_hours_var = self.model.NewIntVar(0, 10000, 'max_hours')
-            min_hours_var = self.model.NewIntVar(0, 10000, 'min_hours')
+            max_hours_var = self.model.NewIntVar(0, horizon_minutes, 'max_hours')
+            min_hours_var = self.model.NewIntVar(0, horizon_minutes, 'min_hours')
+            if self.hinted_minutes is not None:
+                self.model.AddHint(max_hours_var, int(self.hinted_minutes.max()))
+                self.model.AddHint(min_hours_var, int(self.hinted_minutes.min()))
             
             # max_hours_var >= all employee hours
             for hours_var in employee_hours_vars:
@@ -278,21 +892,13 @@ class OptimizationEngine:
                 self.model.Add(min_hours_var <= hours_var)
             
             # Minimize the difference
-            self.model.Minimize(max_hours_var - min_hours_var)
+            self._minimize(max_hours_var - min_hours_var)
 
     def _balance_objective(self):
         """Balance cost and fairness."""
         # Combined objective: minimize cost with fairness consideration
-        cost = []
-        for emp_idx in range(len(self.employees)):
-            for shift_idx, shift in enumerate(self.shifts):
-                hours = shift.get_duration_hours()
-                # Convert hours to minutes (integer) for OR-Tools CP-SAT
-                minutes = int(round(hours * 60))
-                cost.append(self.employee_shift[emp_idx][shift_idx] * minutes)
-        
-        if cost:
-            self.model.Minimize(sum(cost))
+        if self.eligibility.pairs:
+            self._minimize(self._total_minutes())
 
     def _create_solution_from_current(self, solve_time: float) -> Dict:
         """Create a solution from current schedules if optimization fails."""
@@ -321,77 +927,139 @@ class OptimizationEngine:
 
 
 class SolutionCollector(cp_model.CpSolverSolutionCallback):
-    """Collects multiple solutions during optimization."""
+    """Keeps the best, mutually diverse solutions found during optimization.
+
+    Every incumbent is offered to a :class:`SolutionPool` as a bitset over the
+    eligible pairs; assignment dicts are only built for the pooled solutions
+    once the search is over (or per incumbent when streaming).
+    """
     
-    def __init__(self, employee_shift, employees, shifts, max_solutions):
+    def __init__(
+        self, employee_shift, eligibility, instance, max_solutions, min_distance=1, on_solution=None, constraints=None
+    ):
         cp_model.CpSolverSolutionCallback.__init__(self)
         self.employee_shift = employee_shift
-        self.employees = employees
-        self.shifts = shifts
+        self.eligibility = eligibility
+        self.instance = instance
+        self.employees = instance.employees
+        self.shifts = instance.shifts
         self.max_solutions = max_solutions
-        self.solutions = []
-        self.solution_count = 0
+        self.on_solution = on_solution
+        self.constraints = constraints or []
+        self.pool = SolutionPool(max_solutions, min_distance)
+        self.incumbent_count = 0
+        # time.perf_counter() of the first incumbent
+        self.first_solution_at: Optional[float] = None
+        self._pairs = np.array(eligibility.pairs, dtype=np.int64).reshape(-1, 2)
+        self._var_indices = np.array(
+            [employee_shift[emp_idx][shift_idx].Index() for emp_idx, shift_idx in eligibility.pairs],
+            dtype=np.int64
+        )
     
     def on_solution_callback(self):
         """Called when a new solution is found."""
-        if self.solution_count >= self.max_solutions:
-            return
+        self._offer(
+            self.Response().solution, self.ObjectiveValue(), self.BestObjectiveBound(), self.WallTime() * 1000
+        )
+
+    def record(self, response, objective: float):
+        """Offer the solution of a search run without this callback.
+
+        Its objective bound is unknown, so incumbents report the trivial 0.
+        """
+        self._offer(response.solution, objective, 0.0, response.wall_time * 1000)
+
+    def _offer(self, solution, objective: float, bound: float, wall_time_ms: float):
+        if self.first_solution_at is None:
+            self.first_solution_at = time.perf_counter()
+        self.incumbent_count += 1
+        values = np.fromiter(solution, dtype=np.int64, count=len(solution))[self._var_indices]
+        self.pool.offer(objective, values, wall_time_ms)
         
+        if self.on_solution is not None:
+            solution = self._build_solution(
+                f'solution_{self.incumbent_count}', objective, values.astype(bool), wall_time_ms
+            )
+            self.on_solution(self._incumbent_event(solution, bound))
+    
+    def _build_solution(self, solution_id: str, objective: float, selected: np.ndarray, wall_time_ms: float) -> Dict:
+        """Materialize a solution from a boolean mask over the eligible pairs."""
+        assigned = [tuple(pair) for pair in self._pairs[selected].tolist()]
         assignments = []
-        for emp_idx, employee in enumerate(self.employees):
-            for shift_idx, shift in enumerate(self.shifts):
-                if self.Value(self.employee_shift[emp_idx][shift_idx]):
-                    assignments.append({
-                        'employeeId': employee.id,
-                        'shiftId': shift.id,
-                        'startTime': shift.start_time,
-                        'endTime': shift.end_time,
-                    })
-        
-        # Calculate metrics
-        metrics = self._calculate_metrics(assignments)
-        
-        solution = {
-            'id': f'solution_{self.solution_count + 1}',
-            'score': self.ObjectiveValue() if hasattr(self, 'ObjectiveValue') else 0.0,
+        for emp_idx, shift_idx in assigned:
+            shift = self.shifts[shift_idx]
+            assignments.append({
+                'employeeId': self.employees[emp_idx].id,
+                'shiftId': shift.id,
+                'startTime': shift.start_time,
+                'endTime': shift.end_time,
+            })
+        
+        return {
+            'id': solution_id,
+            'score': objective,
             'assignments': assignments,
-            'metrics': metrics,
-            'solveTime': self.WallTime() * 1000,  # Convert to milliseconds
+            'metrics': calculate_metrics(self.instance, assigned, self.constraints),
+            'solveTime': wall_time_ms,
         }
-        
-        self.solutions.append(solution)
-        self.solution_count += 1
     
-    def _calculate_metrics(self, assignments) -> Dict:
-        """Calculate solution metrics."""
-        total_hours = sum(
-            (datetime.fromisoformat(a['endTime'].replace('Z', '+00:00')) -
-             datetime.fromisoformat(a['startTime'].replace('Z', '+00:00'))).total_seconds() / 3600
-            for a in assignments
-        )
-        
-        employee_hours = {}
-        for assignment in assignments:
-            emp_id = assignment['employeeId']
-            hours = (datetime.fromisoformat(assignment['endTime'].replace('Z', '+00:00')) -
-                    datetime.fromisoformat(assignment['startTime'].replace('Z', '+00:00'))).total_seconds() / 3600
-            employee_hours[emp_id] = employee_hours.get(emp_id, 0) + hours
-        
-        fairness_score = 1.0
-        if employee_hours:
-            hours_list = list(employee_hours.values())
-            if len(hours_list) > 1:
-                variance = sum((h - sum(hours_list) / len(hours_list))**2 for h in hours_list) / len(hours_list)
-                fairness_score = 1.0 / (1.0 + variance)  # Higher is better
-        
+    def _incumbent_event(self, solution: Dict, bound: float) -> Dict:
+        """Describe an improving incumbent with its bound and relative gap."""
+        objective = solution['score']
         return {
-            'totalCost': total_hours * 10,  # Simplified cost model
-            'fairnessScore': fairness_score,
-            'constraintViolations': 0,  # Would need to check constraints
-            'coverage': len(set(a['shiftId'] for a in assignments)) / len(self.shifts) if self.shifts else 0,
+            'incumbent': self.incumbent_count,
+            'objective': objective,
+            'bound': bound,
+            'gap': abs(objective - bound) / max(1.0, abs(objective)),
+            **solution,
         }
     
     def get_solutions(self) -> List[Dict]:
-        """Get collected solutions."""
-        return self.solutions
+        """Get the pooled solutions, best first."""
+        num_pairs = len(self._var_indices)
+        return [
+            self._build_solution(
+                f'solution_{rank}', entry.objective, unpack_values(entry.bits, num_pairs), entry.wall_time_ms
+            )
+            for rank, entry in enumerate(self.pool.best(), start=1)
+        ]
+
+
+def calculate_metrics(
+    instance: ProblemInstance,
+    assigned: List[Tuple[int, int]],
+    constraints: Optional[List[Constraint]] = None,
+) -> Dict:
+    """Calculate solution metrics from assigned (employee, shift) index pairs.
+
+    ``constraintViolations`` counts the violated soft constraints of ``constraints``.
+    """
+    num_shifts = instance.num_shifts
+    if not assigned:
+        return {
+            'totalCost': 0.0,
+            'fairnessScore': 1.0,
+            'constraintViolations': 0,
+            'coverage': 0,
+        }
+
+    emp_indices, shift_indices = (np.array(idx) for idx in zip(*assigned))
+    hours = instance.duration_minutes[shift_indices] / 60.0
+    total_hours = float(hours.sum())
+
+    # Hours per employee, over employees with at least one assignment
+    employee_hours = np.bincount(
+        emp_indices, weights=hours, minlength=instance.num_employees
+    )
+    employee_hours = employee_hours[np.bincount(emp_indices, minlength=instance.num_employees) > 0]
+
+    fairness_score = 1.0
+    if len(employee_hours) > 1:
+        fairness_score = 1.0 / (1.0 + float(employee_hours.var()))  # Higher is better
 
+    return {
+        'totalCost': total_hours * 10,  # Simplified cost model
+        'fairnessScore': fairness_score,
+        'constraintViolations': count_violations(instance, assigned, constraints or []),
+        'coverage': len(np.unique(shift_indices)) / num_shifts if num_shifts else 0,
+    }
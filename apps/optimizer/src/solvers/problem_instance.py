@@ -0,0 +1,212 @@
+"""Compiled, array-backed problem instance for the optimization engine."""
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from ..models.employee_model import Employee
+from ..models.optimization_request import ColumnarRequest, OptimizationRequest
+from ..models.schedule_model import Shift
+from .profiling import SolveProfile
+from .skill_index import SkillIndex, covers
+
+MINUTES_PER_DAY = 24 * 60
+
+
+class ProblemInstance:
+    """Employees and shifts compiled into NumPy arrays.
+
+    Every ISO timestamp is parsed exactly once, when the instance is
+    compiled. The engine, its constraint builders and the metrics code read
+    times, durations, days, departments and skills from these arrays only.
+
+    Attributes:
+        start_minutes / end_minutes: Shift bounds in UTC epoch minutes.
+        duration_minutes: Shift lengths in minutes.
+        week_minutes: Local minute-of-week of each shift start (0 = Sunday 00:00).
+        day_index: Local day of each shift start, counted from ``origin_minutes``
+            (a local midnight, in epoch minutes shifted by the UTC offset).
+        department_index: Index into ``departments`` for each shift.
+        skill_index: Interned skill names (``skill_names``).
+        employee_skills / shift_skills: Skill bitmasks of ``skill_index``, one
+            uint64 word per 64 skills.
+    """
+
+    def __init__(
+        self,
+        employees: List[Employee],
+        shifts: List[Shift],
+        start_minutes: np.ndarray,
+        end_minutes: np.ndarray,
+        week_minutes: np.ndarray,
+    ):
+        self.employees = employees
+        self.shifts = shifts
+        self.employee_ids = [emp.id for emp in employees]
+        self.shift_ids = [shift.id for shift in shifts]
+
+        self.start_minutes = start_minutes.astype(np.int64)
+        self.end_minutes = end_minutes.astype(np.int64)
+        self.duration_minutes = self.end_minutes - self.start_minutes
+        self.week_minutes = week_minutes.astype(np.int64)
+
+        # Days are local, like week_minutes, so a shift belongs to the day it starts on the clock
+        offsets = utc_offset_minutes(self.start_minutes, self.week_minutes)
+        local_start = self.start_minutes + offsets
+        if len(shifts):
+            first_day = int(local_start.min()) // MINUTES_PER_DAY
+            last_day = int((self.end_minutes + offsets).max() - 1) // MINUTES_PER_DAY
+        else:
+            first_day = last_day = 0
+        self.origin_minutes = first_day * MINUTES_PER_DAY
+        self.day_index = (local_start - self.origin_minutes) // MINUTES_PER_DAY
+        self.num_days = max(last_day - first_day + 1, 1)
+
+        self.departments = sorted({shift.department_id for shift in shifts})
+        department_ids = {dept: idx for idx, dept in enumerate(self.departments)}
+        self.department_index = np.array(
+            [department_ids[shift.department_id] for shift in shifts], dtype=np.int32
+        )
+
+        employee_skill_sets = [emp.skill_set for emp in employees]
+        shift_skill_sets = [set(shift.get_required_skills()) for shift in shifts]
+        self.skill_index = SkillIndex(set().union(*employee_skill_sets, *shift_skill_sets))
+        self.employee_skills = self.skill_index.pack(employee_skill_sets)
+        self.shift_skills = self.skill_index.pack(shift_skill_sets)
+
+    @property
+    def skill_names(self) -> List[str]:
+        return self.skill_index.names
+
+    @property
+    def num_employees(self) -> int:
+        return len(self.employees)
+
+    @property
+    def num_shifts(self) -> int:
+        return len(self.shifts)
+
+    def subset(self, employee_indices: np.ndarray, shift_indices: np.ndarray) -> 'ProblemInstance':
+        """Instance restricted to the given employees and shifts, without re-parsing times."""
+        return ProblemInstance(
+            [self.employees[idx] for idx in employee_indices],
+            [self.shifts[idx] for idx in shift_indices],
+            self.start_minutes[shift_indices],
+            self.end_minutes[shift_indices],
+            self.week_minutes[shift_indices],
+        )
+
+    def skill_eligibility(self) -> np.ndarray:
+        """Boolean (employees x shifts) matrix of skill-qualified pairs."""
+        return covers(self.employee_skills, self.shift_skills)
+
+
+def window_sums(day_totals: np.ndarray, period_days: int) -> np.ndarray:
+    """Totals of every run of ``period_days`` consecutive days, from prefix sums.
+
+    Window ``w`` covers days ``[w, w + period_days)`` along the last axis; a
+    period longer than the horizon gives a single window over all days.
+    """
+    num_days = day_totals.shape[-1]
+    prefix = np.concatenate(
+        [np.zeros(day_totals.shape[:-1] + (1,), dtype=day_totals.dtype), np.cumsum(day_totals, axis=-1)],
+        axis=-1
+    )
+    period_days = min(period_days, num_days)
+    return prefix[..., period_days:] - prefix[..., :num_days - period_days + 1]
+
+
+def compile_instance(employees: List[Employee], shifts: List[Shift]) -> ProblemInstance:
+    """Compile employee and shift models into a problem instance."""
+    start_minutes, end_minutes, week_minutes = parse_shift_times(shifts)
+    return ProblemInstance(employees, shifts, start_minutes, end_minutes, week_minutes)
+
+
+def compile_request(request: OptimizationRequest, profile: Optional[SolveProfile] = None) -> ProblemInstance:
+    """Compile a request, keeping only shifts that overlap its date range.
+
+    With a ``profile``, parsing the request, filtering its shifts by date and
+    compiling the instance are timed as the 'parse', 'date_filter' and
+    'compile' phases.
+    """
+    profile = profile or SolveProfile()
+    with profile.phase('parse'):
+        employees = request.get_employees()
+        shifts, start_minutes, end_minutes, week_minutes = request_shift_times(request)
+
+    with profile.phase('date_filter'):
+        keep = date_range_mask(start_minutes, end_minutes, request.startDate, request.endDate)
+        kept_shifts = [shift for shift, kept in zip(shifts, keep) if kept]
+    with profile.phase('compile'):
+        return ProblemInstance(
+            employees,
+            kept_shifts,
+            start_minutes[keep],
+            end_minutes[keep],
+            week_minutes[keep],
+        )
+
+
+def request_shift_times(request: OptimizationRequest) -> Tuple[List[Shift], np.ndarray, np.ndarray, np.ndarray]:
+    """A request's shifts with their times; columnar requests carry them already parsed."""
+    shifts = request.get_shifts()
+    if isinstance(request, ColumnarRequest):
+        return (shifts, *request.shift_times)
+    return (shifts, *parse_shift_times(shifts))
+
+
+def parse_shift_times(shifts: List[Shift]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Parse shift bounds into epoch-minute and local minute-of-week arrays."""
+    start_minutes = np.empty(len(shifts), dtype=np.int64)
+    end_minutes = np.empty(len(shifts), dtype=np.int64)
+    week_minutes = np.empty(len(shifts), dtype=np.int64)
+    for idx, shift in enumerate(shifts):
+        start = parse_datetime(shift.start_time)
+        start_minutes[idx] = int(start.timestamp()) // 60
+        end_minutes[idx] = int(parse_datetime(shift.end_time).timestamp()) // 60
+        day_of_week = (start.weekday() + 1) % 7  # 0 = Sunday
+        week_minutes[idx] = day_of_week * MINUTES_PER_DAY + start.hour * 60 + start.minute
+    return start_minutes, end_minutes, week_minutes
+
+
+def local_week_minutes(start_minutes: np.ndarray, utc_offset_minutes: np.ndarray) -> np.ndarray:
+    """Local minute-of-week (0 = Sunday 00:00) of UTC epoch minutes, as parse_shift_times computes it."""
+    local_minutes = start_minutes + utc_offset_minutes
+    day_of_week = (local_minutes // MINUTES_PER_DAY + 4) % 7  # 1970-01-01 was a Thursday
+    return day_of_week * MINUTES_PER_DAY + local_minutes % MINUTES_PER_DAY
+
+
+def utc_offset_minutes(start_minutes: np.ndarray, week_minutes: np.ndarray) -> np.ndarray:
+    """UTC offset of each shift start, recovered from its local minute-of-week.
+
+    Offsets stay within a day of UTC, well inside half a week, so the
+    difference between the local and the UTC minute-of-week identifies them.
+    """
+    minutes_per_week = 7 * MINUTES_PER_DAY
+    utc_week_minutes = local_week_minutes(start_minutes, np.zeros_like(start_minutes))
+    return (week_minutes - utc_week_minutes + minutes_per_week // 2) % minutes_per_week - minutes_per_week // 2
+
+
+def date_range_mask(
+    start_minutes: np.ndarray,
+    end_minutes: np.ndarray,
+    start_date: str,
+    end_date: str,
+) -> np.ndarray:
+    """Boolean mask of shifts that overlap the [start_date, end_date) range."""
+    range_start = parse_epoch_minutes(start_date)
+    range_end = parse_epoch_minutes(end_date)
+    return (start_minutes < range_end) & (end_minutes > range_start)
+
+
+def parse_datetime(value: str) -> datetime:
+    """Parse an ISO datetime string, treating naive values as UTC."""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def parse_epoch_minutes(value: str) -> int:
+    """Parse an ISO datetime string into UTC epoch minutes."""
+    return int(parse_datetime(value).timestamp()) // 60
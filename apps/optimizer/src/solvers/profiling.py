@@ -0,0 +1,134 @@
+"""Per-phase timings, model size and search statistics of a solve."""
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ortools.sat.python import cp_model
+
+# Called with (phase, milliseconds) whenever a phase of any solve in this process ends
+_hooks: List[Callable[[str, float], None]] = []
+
+# Search outcomes from best to worst; a solve made of several models reports its worst
+_STATUS_ORDER = ['OPTIMAL', 'FEASIBLE', 'UNKNOWN', 'INFEASIBLE', 'MODEL_INVALID']
+
+
+def add_profiling_hook(hook: Callable[[str, float], None]) -> None:
+    """Call ``hook(phase, milliseconds)`` for every phase of every solve in this process."""
+    _hooks.append(hook)
+
+
+def remove_profiling_hook(hook: Callable[[str, float], None]) -> None:
+    """Stop calling a hook added with :func:`add_profiling_hook`."""
+    _hooks.remove(hook)
+
+
+class SolveProfile:
+    """Collects where the time of one solve goes.
+
+    Phases are timed with :meth:`phase`; a phase entered several times, e.g.
+    once per component or rolling window, accumulates its wall time, so
+    phases of concurrently solved components add up to more than the
+    elapsed time. Model sizes and CP-SAT statistics are summed over every
+    model searched.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.models = 0
+        self.variables = 0
+        self.constraints = 0
+        # Sizes of the presolved models and counters of their searches
+        self.presolve = {'booleans': 0, 'integers': 0, 'fixedBooleans': 0}
+        self.search = {
+            'branches': 0, 'conflicts': 0, 'restarts': 0, 'lpIterations': 0,
+            'deterministicTime': 0.0, 'userTime': 0.0,
+        }
+        self.statuses: List[str] = []
+        self.bound: Optional[float] = 0.0
+        # Milliseconds from the start of the profile until every model searched had a solution
+        self.first_solution: Optional[float] = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Time a block of work as phase ``name`` and report it to the hooks."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            with self._lock:
+                self.phases[name] = self.phases.get(name, 0.0) + elapsed_ms
+            for hook in list(_hooks):
+                hook(name, elapsed_ms)
+
+    def record_search(
+        self,
+        model: cp_model.CpModel,
+        solver: cp_model.CpSolver,
+        status: int,
+        first_solution_at: Optional[float] = None,
+    ) -> None:
+        """Add a searched model's size, presolve and search statistics.
+
+        ``first_solution_at`` is the ``time.perf_counter()`` of the model's
+        first incumbent, if any.
+        """
+        proto = model.Proto()
+        response = solver.ResponseProto()
+        with self._lock:
+            self.models += 1
+            self.variables += len(proto.variables)
+            self.constraints += len(proto.constraints)
+            self.presolve['booleans'] += response.num_booleans
+            self.presolve['integers'] += response.num_integers
+            self.presolve['fixedBooleans'] += response.num_fixed_booleans
+            self.search['branches'] += response.num_branches
+            self.search['conflicts'] += response.num_conflicts
+            self.search['restarts'] += response.num_restarts
+            self.search['lpIterations'] += response.num_lp_iterations
+            self.search['deterministicTime'] += response.deterministic_time
+            self.search['userTime'] += response.user_time
+            self.statuses.append(solver.StatusName(status))
+            if status in (cp_model.OPTIMAL, cp_model.FEASIBLE) and self.bound is not None:
+                # Component objectives add up, and so do their bounds
+                self.bound += solver.BestObjectiveBound()
+            else:
+                self.bound = None
+            if first_solution_at is not None and self.first_solution is not None:
+                self.first_solution = max(self.first_solution, (first_solution_at - self.started) * 1000)
+            else:
+                self.first_solution = None
+
+    def as_dict(self, objective: Optional[float] = None, bound_is_valid: bool = True) -> Dict:
+        """Summary for a response, with the bound and gap of ``objective`` if given.
+
+        ``bound_is_valid`` is False when the reported objective is not the
+        sum of the searched models' objectives (rolling horizon).
+        """
+        status = max(self.statuses, key=_STATUS_ORDER.index, default=None)
+        bound = self.bound if bound_is_valid and self.models and objective is not None else None
+        first_solution = self.first_solution if self.models else None
+        return {
+            'phases': {name: round(ms, 3) for name, ms in self.phases.items()},
+            'model': {'models': self.models, 'variables': self.variables, 'constraints': self.constraints},
+            'presolve': dict(self.presolve),
+            'search': {
+                'status': status,
+                'objective': objective,
+                'bound': bound,
+                'gap': abs(objective - bound) / max(1.0, abs(objective)) if bound is not None else None,
+                'firstSolutionTime': round(first_solution, 3) if first_solution is not None else None,
+                **self.search,
+            },
+        }
+
+
+def finish_result(result: Dict, started: float, profile: SolveProfile, bound_is_valid: bool = True) -> Dict:
+    """Add the wall time since ``started`` (``time.time()``) and the profile to a solver result."""
+    best = result['solutions'][0]['score'] if result['solutions'] else None
+    result['totalSolveTime'] = (time.time() - started) * 1000
+    result['profile'] = profile.as_dict(best, bound_is_valid)
+    return result
@@ -0,0 +1,174 @@
+"""Incremental repair of an existing solution after a small roster change."""
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..models.optimization_request import RepairRequest
+from ..models.schedule_model import Schedule
+from .optimization_engine import OptimizationEngine
+from .problem_instance import ProblemInstance, compile_request
+from .profiling import SolveProfile, finish_result
+
+
+class RepairSolver:
+    """Re-solves only the neighbourhood of a roster change.
+
+    Shifts touched by the change are the changed or added shifts, shifts
+    whose assigned employee was removed, and shifts whose existing staffing
+    no longer fits their bounds. Every shift within ``neighbourhoodHours`` of
+    one of them is re-solved; all other shifts keep their assignments as
+    pinned pairs, so the regular engine constraints still see them.
+    """
+
+    def __init__(self, num_workers: Optional[int] = None):
+        # CP-SAT search workers per solve; None lets CP-SAT use every core
+        self.num_workers = num_workers
+
+    def solve(
+        self,
+        request: RepairRequest,
+        stop_event=None,
+        on_solution: Optional[Callable[[Dict], None]] = None,
+        hints: Optional[List[Tuple[str, str]]] = None
+    ) -> Dict:
+        """Repair the request's solution; same result shape as ScheduleSolver."""
+        started = time.time()
+        profile = SolveProfile()
+        removed = set(request.removedEmployees)
+        instance = compile_request(request.model_copy(update={
+            'employees': [emp for emp in request.employees if emp['id'] not in removed]
+        }), profile)
+
+        if not instance.shifts:
+            return finish_result({
+                'status': 'failed',
+                'message': 'No shifts found in the specified date range',
+                'solutions': [],
+            }, started, profile)
+
+        with profile.phase('neighbourhood'):
+            assigned = _existing_pairs(instance, request.assignments)
+            affected = affected_shifts(instance, request, assigned)
+            free = neighbourhood_mask(
+                instance.start_minutes,
+                instance.end_minutes,
+                affected,
+                int(round(request.neighbourhoodHours * 60))
+            )
+
+        engine = OptimizationEngine(
+            employees=instance.employees,
+            shifts=instance.shifts,
+            constraints=request.get_constraints(),
+            current_schedules=request.get_current_schedules() + _repair_schedules(instance, assigned, free),
+            options=request.get_options(),
+            instance=instance,
+            num_workers=self.num_workers,
+            stop_event=stop_event,
+            on_solution=on_solution,
+            hints=hints,
+            frozen_shifts=~free,
+            profile=profile
+        )
+        solutions = engine.solve()
+
+        repair = {
+            'affectedShifts': [instance.shift_ids[idx] for idx in np.flatnonzero(affected)],
+            'freeShifts': int(free.sum()),
+            'frozenShifts': int((~free).sum()),
+        }
+        if not solutions:
+            return finish_result({
+                'status': 'failed',
+                'message': 'No feasible repair found',
+                'solutions': [],
+                'repair': repair,
+            }, started, profile)
+        return finish_result({
+            'status': 'completed',
+            'message': f'Repaired {repair["freeShifts"]} of {instance.num_shifts} shift(s)',
+            'solutions': solutions,
+            'repair': repair,
+        }, started, profile)
+
+
+def affected_shifts(
+    instance: ProblemInstance,
+    request: RepairRequest,
+    assigned: List[Tuple[int, int]],
+) -> np.ndarray:
+    """Boolean mask of the shifts a repair request touches directly."""
+    shift_idx_map = {shift_id: idx for idx, shift_id in enumerate(instance.shift_ids)}
+    affected = np.zeros(instance.num_shifts, dtype=bool)
+    for shift_id in request.changedShifts:
+        if shift_id in shift_idx_map:
+            affected[shift_idx_map[shift_id]] = True
+
+    # Shifts that lost an employee, plus any whose staffing is now out of bounds
+    employee_ids = set(instance.employee_ids)
+    for assignment in request.assignments:
+        shift_idx = shift_idx_map.get(assignment['shiftId'])
+        if shift_idx is not None and assignment['employeeId'] not in employee_ids:
+            affected[shift_idx] = True
+
+    staffed = np.bincount(
+        np.array([shift_idx for _, shift_idx in assigned], dtype=np.int64),
+        minlength=instance.num_shifts
+    )
+    min_staffing = np.array([shift.min_staffing for shift in instance.shifts])
+    max_staffing = np.array([shift.max_staffing for shift in instance.shifts])
+    affected |= (staffed < min_staffing) | (staffed > max_staffing)
+    return affected
+
+
+def neighbourhood_mask(
+    start_minutes: np.ndarray,
+    end_minutes: np.ndarray,
+    affected: np.ndarray,
+    radius_minutes: int,
+) -> np.ndarray:
+    """Shifts that overlap an affected shift widened by ``radius_minutes``."""
+    free = affected.copy()
+    for shift_idx in np.flatnonzero(affected):
+        window_start = start_minutes[shift_idx] - radius_minutes
+        window_end = end_minutes[shift_idx] + radius_minutes
+        free |= (start_minutes < window_end) & (end_minutes > window_start)
+    return free
+
+
+def _existing_pairs(instance: ProblemInstance, assignments: List[Dict]) -> List[Tuple[int, int]]:
+    """(employee_idx, shift_idx) pairs of the existing solution still in the instance."""
+    employee_idx_map = {emp_id: idx for idx, emp_id in enumerate(instance.employee_ids)}
+    shift_idx_map = {shift_id: idx for idx, shift_id in enumerate(instance.shift_ids)}
+    pairs = []
+    for assignment in assignments:
+        emp_idx = employee_idx_map.get(assignment['employeeId'])
+        shift_idx = shift_idx_map.get(assignment['shiftId'])
+        if emp_idx is not None and shift_idx is not None:
+            pairs.append((emp_idx, shift_idx))
+    return pairs
+
+
+def _repair_schedules(
+    instance: ProblemInstance,
+    assigned: List[Tuple[int, int]],
+    free: np.ndarray,
+) -> List[Schedule]:
+    """Existing assignments as schedules, pinned outside the neighbourhood.
+
+    Assignments inside it stay tentative, so they are only hinted.
+    """
+    schedules = []
+    for emp_idx, shift_idx in assigned:
+        shift = instance.shifts[shift_idx]
+        schedules.append(Schedule(
+            id=f'repair_{emp_idx}_{shift_idx}',
+            employee_id=instance.employee_ids[emp_idx],
+            shift_id=shift.id,
+            start_time=shift.start_time,
+            end_time=shift.end_time,
+            status='tentative',
+            metadata=None if free[shift_idx] else {'pinned': True},
+        ))
+    return schedules
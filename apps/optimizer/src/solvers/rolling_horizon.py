@@ -0,0 +1,226 @@
+"""Rolling-horizon solving of long date ranges, one window at a time."""
+import math
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ..models.constraint_model import Constraint
+from ..models.optimization_request import OptimizationOptions
+from ..models.schedule_model import Schedule
+from .optimization_engine import OptimizationEngine, calculate_metrics
+from .problem_instance import ProblemInstance
+from .profiling import SolveProfile
+
+
+def carry_over_days(constraints: List[Constraint]) -> int:
+    """Days before a window whose assignments still constrain it.
+
+    Committed assignments of these days are kept in every window as pinned
+    pairs, so min-rest and max-hours see them across the window boundary.
+    """
+    days = 1  # overlapping and overnight shifts reach into the previous day
+    for constraint in constraints:
+        if constraint.type == 'min_rest':
+            days = max(days, math.ceil((constraint.get_min_rest_hours() or 8.0) / 24) + 1)
+        elif constraint.type == 'max_hours':
+            days = max([days] + [period_days for period_days, _ in constraint.get_hour_limits()])
+        elif constraint.type in ('max_consecutive_days', 'min_consecutive_days'):
+            run_days = constraint.get_max_consecutive_days() or constraint.get_min_consecutive_days() or 0
+            days = max(days, run_days)
+    return days
+
+
+class RollingHorizonSolver:
+    """Solves a long horizon as a sequence of overlapping windows.
+
+    Window ``k`` commits the shifts starting in days ``[k * W, (k + 1) * W)``
+    and also solves the next ``overlap`` days, whose assignments are only
+    used to hint the following window. Assignments committed in the last
+    ``carry_over_days`` days before a window are frozen into it. The time
+    budget of the request is shared by the remaining windows.
+
+    When ``stop_event`` cuts the solve short, or a window finds no solution
+    after earlier windows were committed, the roster so far (plus the best
+    incumbent of the window being solved) is returned marked ``partial``.
+
+    ``fair_distribution`` bounds each employee's shifts within a window by
+    that window's own shifts, carried-over context included; it does not
+    balance totals across the whole horizon.
+    """
+
+    def __init__(
+        self,
+        instance: ProblemInstance,
+        constraints: List[Constraint],
+        current_schedules: List[Schedule],
+        options: OptimizationOptions,
+        num_workers: Optional[int] = None,
+        stop_event=None,
+        on_solution: Optional[Callable[[Dict], None]] = None,
+        hints: Optional[List[Tuple[str, str]]] = None,
+        profile: Optional[SolveProfile] = None,
+    ):
+        self.instance = instance
+        self.constraints = constraints
+        self.current_schedules = current_schedules
+        self.options = options
+        self.num_workers = num_workers
+        self.stop_event = stop_event
+        self.on_solution = on_solution
+        self.hints = hints or []
+        self.profile = profile
+        self.window_days = options.rollingWindowDays
+        self.overlap_days = options.rollingOverlapDays
+        self.lookback_days = carry_over_days(constraints)
+
+    @property
+    def num_windows(self) -> int:
+        return math.ceil(self.instance.num_days / self.window_days)
+
+    def solve(self) -> List[Dict]:
+        """Solve every window in order and return the committed roster, or [] if none was."""
+        started = time.time()
+        deadline = started + self.options.maxOptimizationTime
+        day_index = self.instance.day_index
+        committed: Set[Tuple[int, int]] = set()
+        lookahead: List[Tuple[str, str]] = []
+
+        for window in range(self.num_windows):
+            first_day = window * self.window_days
+            commit_end = first_day + self.window_days
+            free = (day_index >= first_day) & (day_index < commit_end + self.overlap_days)
+            context = (day_index >= first_day - self.lookback_days) & (day_index < first_day)
+            shift_indices = np.flatnonzero(free | context)
+
+            budget = max(deadline - time.time(), 0.0) / (self.num_windows - window)
+            solution = self._solve_window(
+                window, shift_indices, free[shift_indices], committed, lookahead, budget
+            )
+            if solution is None:
+                return self._partial(committed, window, started)
+            stopped = self.stop_event is not None and self.stop_event.is_set()
+
+            shift_idx_map = {self.instance.shift_ids[idx]: idx for idx in shift_indices}
+            employee_idx_map = {emp_id: idx for idx, emp_id in enumerate(self.instance.employee_ids)}
+            lookahead = []
+            for assignment in solution['assignments']:
+                shift_idx = shift_idx_map[assignment['shiftId']]
+                pair = (employee_idx_map[assignment['employeeId']], shift_idx)
+                # A stopped window keeps its whole incumbent, overlap days included
+                if day_index[shift_idx] < commit_end or stopped:
+                    committed.add(pair)
+                else:
+                    lookahead.append((assignment['employeeId'], assignment['shiftId']))
+            if stopped and window + 1 < self.num_windows:
+                return self._partial(committed, window + 1, started)
+
+        return [self._roster(sorted(committed), (time.time() - started) * 1000)]
+
+    def _partial(self, committed: Set[Tuple[int, int]], windows_solved: int, started: float) -> List[Dict]:
+        """The roster of the first ``windows_solved`` windows, marked partial."""
+        if not committed:
+            return []
+        return [{
+            **self._roster(sorted(committed), (time.time() - started) * 1000),
+            'partial': True,
+            'windowsSolved': windows_solved,
+            'windows': self.num_windows,
+        }]
+
+    def _solve_window(
+        self,
+        window: int,
+        shift_indices: np.ndarray,
+        free: np.ndarray,
+        committed: Set[Tuple[int, int]],
+        lookahead: List[Tuple[str, str]],
+        budget: float,
+    ) -> Optional[Dict]:
+        """Solve one window with its carried-over context frozen."""
+        instance = self.instance.subset(np.arange(self.instance.num_employees), shift_indices)
+        in_window = set(shift_indices.tolist())
+        shift_ids = set(instance.shift_ids)
+        pinned = [
+            self._pinned_schedule(emp_idx, shift_idx)
+            for emp_idx, shift_idx in sorted(committed) if shift_idx in in_window
+        ]
+        engine = OptimizationEngine(
+            employees=instance.employees,
+            shifts=instance.shifts,
+            constraints=self.constraints,
+            current_schedules=[s for s in self.current_schedules if s.shift_id in shift_ids] + pinned,
+            options=self.options.model_copy(update={'solutionCount': 1}),
+            instance=instance,
+            num_workers=self.num_workers,
+            stop_event=self.stop_event,
+            on_solution=self._window_publisher(window, committed, in_window),
+            hints=lookahead + self.hints,
+            frozen_shifts=~free,
+            profile=self.profile
+        )
+        engine.solver.parameters.max_time_in_seconds = max(budget, 0.1)
+        solutions = engine.solve()
+        return solutions[0] if solutions else None
+
+    def _pinned_schedule(self, emp_idx: int, shift_idx: int) -> Schedule:
+        """A committed assignment as a pinned schedule."""
+        shift = self.instance.shifts[shift_idx]
+        return Schedule(
+            id=f'rolling_{emp_idx}_{shift_idx}',
+            employee_id=self.instance.employee_ids[emp_idx],
+            shift_id=shift.id,
+            start_time=shift.start_time,
+            end_time=shift.end_time,
+            status='confirmed',
+            metadata={'pinned': True},
+        )
+
+    def _window_publisher(
+        self,
+        window: int,
+        committed: Set[Tuple[int, int]],
+        in_window: Set[int],
+    ) -> Optional[Callable[[Dict], None]]:
+        """Publish window incumbents together with the roster committed before it."""
+        if self.on_solution is None:
+            return None
+        before = [
+            self._assignment(emp_idx, shift_idx)
+            for emp_idx, shift_idx in sorted(committed) if shift_idx not in in_window
+        ]
+
+        def publish(event: Dict):
+            self.on_solution({
+                **event,
+                'window': window,
+                'windows': self.num_windows,
+                'assignments': before + event['assignments'],
+            })
+        return publish
+
+    def _assignment(self, emp_idx: int, shift_idx: int) -> Dict:
+        shift = self.instance.shifts[shift_idx]
+        return {
+            'employeeId': self.instance.employee_ids[emp_idx],
+            'shiftId': shift.id,
+            'startTime': shift.start_time,
+            'endTime': shift.end_time,
+        }
+
+    def _roster(self, assigned: List[Tuple[int, int]], solve_time: float) -> Dict:
+        """The committed roster as a solution, scored on the engine's objective."""
+        minutes = np.zeros(self.instance.num_employees, dtype=np.int64)
+        for emp_idx, shift_idx in assigned:
+            minutes[emp_idx] += self.instance.duration_minutes[shift_idx]
+        if self.options.objective == 'maximize_fairness':
+            score = float(minutes.max() - minutes.min()) if len(minutes) else 0.0
+        else:
+            score = float(minutes.sum())
+        return {
+            'id': 'solution_1',
+            'score': score,
+            'assignments': [self._assignment(emp_idx, shift_idx) for emp_idx, shift_idx in assigned],
+            'metrics': calculate_metrics(self.instance, assigned, self.constraints),
+            'solveTime': solve_time,
+        }
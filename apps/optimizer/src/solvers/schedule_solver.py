@@ -1,79 +1,189 @@
 """Main scheduling solver."""
-from typing import Dict, List
+import time
+from typing import Callable, Dict, List, Optional, Tuple
 
 from ..models.constraint_model import Constraint
 from ..models.employee_model import Employee
 from ..models.optimization_request import (OptimizationOptions,
                                            OptimizationRequest)
-from ..models.schedule_model import Schedule, Shift
+from ..models.schedule_model import Schedule
+from .decomposition import find_components, is_decomposable, solve_components
+from .eligibility import compute_eligibility
+from .feasibility import check_feasibility
+from .model_cache import ModelCache
 from .optimization_engine import OptimizationEngine
+from .problem_instance import compile_request
+from .profiling import SolveProfile, finish_result
+from .rolling_horizon import RollingHorizonSolver
 
 
 class ScheduleSolver:
     """Main solver for schedule optimization."""
     
-    def solve(self, request: OptimizationRequest) -> Dict:
-        """Solve the scheduling optimization problem."""
-        employees = request.get_employees()
-        shifts = request.get_shifts()
-        constraints = request.get_constraints()
-        current_schedules = request.get_current_schedules()
-        options = request.get_options()
+    def __init__(self, num_workers: Optional[int] = None, model_cache: Optional[ModelCache] = None):
+        # CP-SAT search workers per solve; None lets CP-SAT use every core
+        self.num_workers = num_workers
+        # Built models shared with later solves of the same roster
+        self.model_cache = model_cache
+    
+    def solve(
+        self,
+        request: OptimizationRequest,
+        stop_event=None,
+        on_solution: Optional[Callable[[Dict], None]] = None,
+        hints: Optional[List[Tuple[str, str]]] = None
+    ) -> Dict:
+        """Solve the scheduling optimization problem.
         
-        # Filter shifts by date range
-        filtered_shifts = self._filter_shifts_by_date_range(shifts, request.startDate, request.endDate)
+        Setting ``stop_event`` stops the CP-SAT search early; the best
+        solutions found so far are still returned. ``on_solution`` receives
+        every improving incumbent as soon as CP-SAT finds it. ``hints`` are
+        (employee_id, shift_id) assignments of a previously accepted solution
+        used to warm-start the search.
         
-        if not filtered_shifts:
-            return {
+        Requests whose eligibility graph splits into independent components
+        (e.g. departments sharing no employees) are solved per component,
+        concurrently, when the objective allows it. With
+        ``options.rollingWindowDays`` set, longer date ranges are solved
+        window by window instead.
+        
+        Single-model solves reuse the built model of an earlier request with
+        the same structure from ``model_cache``, e.g. the same roster solved
+        with another objective.
+        
+        When no solution is found and time is left, the request is solved
+        again with every constraint guarded by an assumption literal to name
+        the conflicting constraints (``conflictingConstraints``).
+        
+        Every result carries its wall time (``totalSolveTime``) and a
+        ``profile`` of phase timings, model size and search statistics.
+        """
+        started = time.time()
+        profile = SolveProfile()
+        with profile.phase('parse'):
+            constraints = request.get_constraints()
+            current_schedules = request.get_current_schedules()
+            options = request.get_options()
+        
+        # Compile employees and shifts, keeping shifts in the date range
+        instance = compile_request(request, profile)
+        
+        if not instance.shifts:
+            return finish_result({
                 'status': 'failed',
                 'message': 'No shifts found in the specified date range',
                 'solutions': [],
-                'totalSolveTime': 0,
-            }
+            }, started, profile)
         
-        # Create optimization engine
-        engine = OptimizationEngine(
-            employees=employees,
-            shifts=filtered_shifts,
-            constraints=constraints,
-            current_schedules=current_schedules,
-            options=options
-        )
+        # Reject obviously infeasible requests before building any model
+        with profile.phase('eligibility'):
+            eligibility = compute_eligibility(instance, current_schedules, constraints=constraints)
+        with profile.phase('feasibility'):
+            hard_constraints = [c for c in constraints if not c.is_soft(options.softPriorityThreshold)]
+            issues = check_feasibility(instance, eligibility, hard_constraints)
+        if issues:
+            more = f' (and {len(issues) - 1} more issue(s))' if len(issues) > 1 else ''
+            return finish_result({
+                'status': 'failed',
+                'message': f"Infeasible: {issues[0]['message']}{more}",
+                'solutions': [],
+                'infeasibility': issues,
+            }, started, profile)
         
-        # Solve
-        solutions = engine.solve()
+        rolling = bool(options.rollingWindowDays) and instance.num_days > options.rollingWindowDays
+        components = []
+        if not rolling and is_decomposable(options, constraints):
+            components = find_components(eligibility)
         
+        if rolling:
+            solutions = RollingHorizonSolver(
+                instance,
+                constraints,
+                current_schedules,
+                options,
+                num_workers=self.num_workers,
+                stop_event=stop_event,
+                on_solution=on_solution,
+                hints=hints,
+                profile=profile
+            ).solve()
+        elif len(components) > 1:
+            solutions = solve_components(
+                instance,
+                components,
+                constraints,
+                current_schedules,
+                options,
+                num_workers=self.num_workers,
+                stop_event=stop_event,
+                on_solution=on_solution,
+                hints=hints,
+                profile=profile,
+                eligibility=eligibility
+            )
+        else:
+            # Create optimization engine
+            engine = OptimizationEngine(
+                employees=instance.employees,
+                shifts=instance.shifts,
+                constraints=constraints,
+                current_schedules=current_schedules,
+                options=options,
+                instance=instance,
+                num_workers=self.num_workers,
+                stop_event=stop_event,
+                on_solution=on_solution,
+                hints=hints,
+                model_cache=self.model_cache,
+                profile=profile,
+                eligibility=eligibility
+            )
+            
+            # Solve
+            solutions = engine.solve()
+        
+        result = self._result(solutions)
+        time_left = options.maxOptimizationTime - (time.time() - started)
+        stopped = stop_event is not None and stop_event.is_set()
+        # Only a solve without any roster is diagnosed; a partial one keeps its message
+        if not result['solutions'] and time_left > 0 and not stopped:
+            with profile.phase('diagnosis'):
+                conflicting = OptimizationEngine(
+                    employees=instance.employees,
+                    shifts=instance.shifts,
+                    constraints=constraints,
+                    current_schedules=current_schedules,
+                    options=options,
+                    instance=instance,
+                    num_workers=self.num_workers,
+                    eligibility=eligibility
+                ).explain_infeasibility(time_left)
+            if conflicting:
+                result['message'] = f"Infeasible: conflicting constraints {', '.join(conflicting)}"
+                result['conflictingConstraints'] = conflicting
+        # Windows are solved with earlier windows frozen; their bounds do not add up
+        return finish_result(result, started, profile, bound_is_valid=not rolling)
+    
+    def _result(self, solutions: List[Dict]) -> Dict:
+        """Wrap solutions in a solver result."""
+        if solutions and solutions[0].get('partial'):
+            return {
+                'status': 'partial',
+                'message': (
+                    f"Stopped after {solutions[0]['windowsSolved']} of {solutions[0]['windows']} "
+                    "rolling windows; later shifts are unassigned"
+                ),
+                'solutions': solutions,
+            }
         if solutions:
-            total_solve_time = sum(s.get('solveTime', 0) for s in solutions)
             return {
                 'status': 'completed',
                 'message': f'Generated {len(solutions)} solution(s)',
                 'solutions': solutions,
-                'totalSolveTime': total_solve_time,
             }
         else:
             return {
                 'status': 'failed',
                 'message': 'No feasible solution found',
                 'solutions': [],
-                'totalSolveTime': 0,
             }
-    
-    def _filter_shifts_by_date_range(self, shifts: List[Shift], start_date: str, end_date: str) -> List[Shift]:
-        """Filter shifts that overlap with the date range."""
-        from datetime import datetime
-        
-        start = datetime.fromisoformat(start_date.replace('Z', '+00:00'))
-        end = datetime.fromisoformat(end_date.replace('Z', '+00:00'))
-        
-        filtered = []
-        for shift in shifts:
-            shift_start = datetime.fromisoformat(shift.start_time.replace('Z', '+00:00'))
-            shift_end = datetime.fromisoformat(shift.end_time.replace('Z', '+00:00'))
-            
-            # Include if shift overlaps with date range
-            if shift_start < end and shift_end > start:
-                filtered.append(shift)
-        
-        return filtered
-
@@ -0,0 +1,58 @@
+"""Skill names interned to integer ids and packed into bitsets."""
+from typing import Iterable, List
+
+import numpy as np
+
+
+class SkillIndex:
+    """Interns skill names and packs skill sets into uint64 bitsets.
+
+    Skill ``i`` is bit ``i % 64`` of word ``i // 64``, so a set of skills is
+    one row of ``num_words`` words and "has every required skill" is a
+    bitwise test over whole rows.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.names = sorted(set(names))
+        self.ids = {name: idx for idx, name in enumerate(self.names)}
+        self.num_words = max((len(self.names) + 63) // 64, 1)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def pack(self, skill_sets: List[Iterable[str]]) -> np.ndarray:
+        """Pack skill name sets into an (n, num_words) uint64 bitmask array."""
+        rows, skill_ids = [], []
+        for row, skills in enumerate(skill_sets):
+            for name in skills:
+                rows.append(row)
+                skill_ids.append(self.ids[name])
+        masks = np.zeros((len(skill_sets), self.num_words), dtype=np.uint64)
+        words, bits = np.divmod(np.array(skill_ids, dtype=np.int64), 64)
+        np.bitwise_or.at(
+            masks, (np.array(rows, dtype=np.int64), words), np.left_shift(np.uint64(1), bits.astype(np.uint64))
+        )
+        return masks
+
+    def column(self, masks: np.ndarray, skill_idx: int) -> np.ndarray:
+        """Boolean column of one skill over rows of bitmasks."""
+        word, bit = divmod(skill_idx, 64)
+        return (masks[:, word] & (np.uint64(1) << np.uint64(bit))) != 0
+
+    def names_of(self, mask: np.ndarray) -> List[str]:
+        """Skill names set in a single bitmask row."""
+        return [name for idx, name in enumerate(self.names) if (int(mask[idx // 64]) >> (idx % 64)) & 1]
+
+
+def covers(held: np.ndarray, required: np.ndarray) -> np.ndarray:
+    """Boolean (held rows x required rows) matrix of "holds every required skill".
+
+    Rows are deduplicated first; rosters typically have far fewer distinct
+    skill sets than employees or shifts, so the bitwise test runs on the
+    distinct sets only and is expanded with two index lookups.
+    """
+    held_sets, held_rows = np.unique(held, axis=0, return_inverse=True)
+    required_sets, required_rows = np.unique(required, axis=0, return_inverse=True)
+    missing = required_sets[np.newaxis, :, :] & ~held_sets[:, np.newaxis, :]
+    distinct = ~missing.any(axis=2)
+    return distinct[held_rows.reshape(-1)][:, required_rows.reshape(-1)]
@@ -0,0 +1,68 @@
+"""Bounded pool of the best, mutually diverse solutions."""
+from typing import List, NamedTuple
+
+import numpy as np
+
+# Number of set bits in every byte value
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint16)
+
+
+class PooledSolution(NamedTuple):
+    """A solution kept as a packed bitset over the eligible pairs."""
+    objective: float
+    bits: np.ndarray
+    wall_time_ms: float
+
+
+class SolutionPool:
+    """Keeps the top ``capacity`` solutions by objective (lower is better).
+
+    Solutions closer than ``min_distance`` assignment changes to a pooled
+    solution are near-duplicates: the better of the two is kept. Assignments
+    are stored as packed bitsets so that offering a solution costs a few
+    vectorized XOR/popcount passes regardless of how many the solver reports.
+    """
+
+    def __init__(self, capacity: int, min_distance: int = 1):
+        self.capacity = capacity
+        self.min_distance = min_distance
+        self._entries: List[PooledSolution] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def offer(self, objective: float, values: np.ndarray, wall_time_ms: float = 0.0) -> bool:
+        """Offer a solution given as a 0/1 array; return True if it was kept."""
+        bits = np.packbits(values.astype(bool))
+        candidate = PooledSolution(objective, bits, wall_time_ms)
+
+        near = {
+            idx for idx, entry in enumerate(self._entries)
+            if hamming_distance(entry.bits, bits) < self.min_distance
+        }
+        if any(self._entries[idx].objective <= objective for idx in near):
+            return False
+
+        entries = [entry for idx, entry in enumerate(self._entries) if idx not in near]
+        if len(entries) >= self.capacity:
+            if objective >= entries[-1].objective:
+                return False
+            entries.pop()
+        entries.append(candidate)
+        entries.sort(key=lambda entry: entry.objective)
+        self._entries = entries
+        return True
+
+    def best(self) -> List[PooledSolution]:
+        """Pooled solutions, best first."""
+        return list(self._entries)
+
+
+def hamming_distance(left: np.ndarray, right: np.ndarray) -> int:
+    """Number of differing bits between two packed bitsets."""
+    return int(_POPCOUNT[np.bitwise_xor(left, right)].sum())
+
+
+def unpack_values(bits: np.ndarray, size: int) -> np.ndarray:
+    """Unpack a bitset back into a boolean array of ``size`` values."""
+    return np.unpackbits(bits, count=size).astype(bool)
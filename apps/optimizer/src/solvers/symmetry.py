@@ -0,0 +1,49 @@
+"""Employee equivalence classes and lexicographic symmetry breaking."""
+from typing import Dict, List, Sequence, Set, Tuple
+
+from ortools.sat.python import cp_model
+
+from .eligibility import Eligibility
+
+
+def employee_classes(eligibility: Eligibility, excluded: Set[int]) -> List[List[int]]:
+    """Groups of two or more interchangeable employees.
+
+    Eligibility already folds in skills, availability and blocked pairs, so
+    employees with identical eligible shifts are interchangeable for every
+    constraint and objective. Employees in ``excluded`` (pinned or hinted
+    ones) are never grouped.
+    """
+    groups: Dict[Tuple[int, ...], List[int]] = {}
+    for emp_idx, shift_indices in eligibility.shifts_by_employee.items():
+        if shift_indices and emp_idx not in excluded:
+            groups.setdefault(tuple(shift_indices), []).append(emp_idx)
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def add_lex_greater_equal(
+    model: cp_model.CpModel,
+    left: Sequence[cp_model.IntVar],
+    right: Sequence[cp_model.IntVar],
+) -> None:
+    """Require the boolean row ``left`` to be lexicographically >= ``right``.
+
+    ``equal[i]`` holds exactly when both rows agree on their first ``i + 1``
+    positions; wherever the prefix before a position is equal, ``left`` may
+    not be 0 where ``right`` is 1. Everything is posted as clauses.
+    """
+    prefix_equal = None
+    for position, (lhs, rhs) in enumerate(zip(left, right)):
+        guard = [prefix_equal.Not()] if prefix_equal is not None else []
+        model.AddBoolOr(guard + [lhs, rhs.Not()])
+        if position == len(left) - 1:
+            break
+
+        equal = model.NewBoolVar(f'lex_{lhs.Index()}_{rhs.Index()}')
+        if prefix_equal is not None:
+            model.AddImplication(equal, prefix_equal)
+        model.AddBoolOr([equal.Not(), lhs.Not(), rhs])
+        model.AddBoolOr([equal.Not(), lhs, rhs.Not()])
+        model.AddBoolOr(guard + [lhs, rhs, equal])
+        model.AddBoolOr(guard + [lhs.Not(), rhs.Not(), equal])
+        prefix_equal = equal
@@ -0,0 +1,82 @@
+"""Constraint violations of a roster, counted after solving."""
+from typing import List, Tuple
+
+import numpy as np
+
+from ..models.constraint_model import Constraint
+from .conflict_graph import min_rest_minutes
+from .problem_instance import ProblemInstance, window_sums
+
+
+def count_violations(
+    instance: ProblemInstance,
+    assigned: List[Tuple[int, int]],
+    constraints: List[Constraint],
+) -> int:
+    """Number of violated constraint instances in a roster.
+
+    Counts employees over a max_hours limit in any of its rolling periods
+    (shifts count on the day they start), consecutive shifts of one
+    employee closer than a min_rest rule, runs of working days longer than
+    max_consecutive_days or shorter than min_consecutive_days (runs cut by
+    the horizon are exempt from the minimum), employees above the
+    fair_distribution bound, and assignments to an employee lacking a
+    required skill (read from the instance's skill bitsets). Hard
+    constraints always hold in solver output, so in practice only soft
+    constraints and pinned assignments contribute.
+    """
+    if not assigned:
+        return 0
+
+    emp_indices, shift_indices = (np.array(idx, dtype=np.int64) for idx in zip(*assigned))
+    violations = 0
+
+    # Eligibility excludes these pairs unless they are pinned
+    missing_skills = instance.shift_skills[shift_indices] & ~instance.employee_skills[emp_indices]
+    violations += int(missing_skills.any(axis=1).sum())
+
+    day_minutes = np.zeros((instance.num_employees, instance.num_days), dtype=np.int64)
+    np.add.at(
+        day_minutes, (emp_indices, instance.day_index[shift_indices]), instance.duration_minutes[shift_indices]
+    )
+    for constraint in constraints:
+        for period_days, max_hours in constraint.get_hour_limits():
+            over = window_sums(day_minutes, period_days) > int(max_hours * 60)
+            violations += int(over.any(axis=1).sum())
+
+    runs = _working_runs(day_minutes > 0)
+    for constraint in constraints:
+        max_days = constraint.get_max_consecutive_days()
+        min_days = constraint.get_min_consecutive_days()
+        if max_days:
+            violations += sum(length > max_days for _, _, length in runs)
+        elif min_days:
+            violations += sum(
+                length < min_days and start > 0 and start + length < instance.num_days
+                for _, start, length in runs
+            )
+
+    # Consecutive assignments per employee, ordered by start
+    order = np.lexsort((instance.start_minutes[shift_indices], emp_indices))
+    emp_sorted, shift_sorted = emp_indices[order], shift_indices[order]
+    same_employee = emp_sorted[1:] == emp_sorted[:-1]
+    gaps = instance.start_minutes[shift_sorted[1:]] - instance.end_minutes[shift_sorted[:-1]]
+    for constraint in constraints:
+        if constraint.type == 'min_rest':
+            violations += int((same_employee & (gaps < min_rest_minutes([constraint]))).sum())
+
+    if any(c.type == 'fair_distribution' for c in constraints) and instance.num_employees:
+        max_shifts = instance.num_shifts // instance.num_employees + 1
+        shift_counts = np.bincount(emp_indices, minlength=instance.num_employees)
+        violations += int((shift_counts > max_shifts).sum())
+
+    return violations
+
+
+def _working_runs(works: np.ndarray) -> List[Tuple[int, int, int]]:
+    """(employee, first day, length) of every run of consecutive working days."""
+    padded = np.zeros((works.shape[0], works.shape[1] + 2), dtype=np.int8)
+    padded[:, 1:-1] = works
+    emp_starts, starts = np.nonzero(np.diff(padded, axis=1) == 1)
+    _, ends = np.nonzero(np.diff(padded, axis=1) == -1)
+    return list(zip(emp_starts.tolist(), starts.tolist(), (ends - starts).tolist()))
@@ -1,7 +1,19 @@
 """Tests for API endpoints."""
+import asyncio
+import json
+import time
+
 import pytest
 from fastapi.testclient import TestClient
-from src.api.routes import app
+from src.api.columnar import build_request
+from src.api.executor import SolveExecutor, resolve_hook
+from src.api.metrics import SolverMetrics, size_bucket
+from src.api.result_cache import InMemoryResultStore, ResultCache, SQLiteResultStore, request_key
+from src.api.solution_cache import SolutionCache
+from src.solvers.problem_instance import compile_request
+from src.solvers.profiling import add_profiling_hook
+from src.api.routes import app, executor
+from src.models.optimization_request import OptimizationRequest
 
 client = TestClient(app)
 
@@ -62,6 +74,24 @@ class TestOptimizeEndpoint:
         assert "status" in data
         assert "solutions" in data
     
+    def test_optimize_rejects_when_solver_at_capacity(self):
+        """Test that a full solve queue returns 429 with Retry-After."""
+        request_data = {
+            "employees": [],
+            "shifts": [],
+            "constraints": [],
+            "startDate": "2024-01-01T00:00:00Z",
+            "endDate": "2024-01-31T23:59:59Z"
+        }
+        executor._pending = executor.max_concurrent + executor.max_queued
+        try:
+            response = client.post("/optimize", json=request_data)
+        finally:
+            executor._pending = 0
+
+        assert response.status_code == 429
+        assert "Retry-After" in response.headers
+    
     def test_optimize_with_invalid_request(self):
         """Test optimization with invalid request."""
         request_data = {
@@ -75,6 +105,43 @@ class TestOptimizeEndpoint:
         
         # Should return validation error
         assert response.status_code == 422
+
+    def test_optimize_rejects_malformed_constraint(self):
+        """Test that a malformed constraint is rejected before it reaches a solver process."""
+        request_data = {
+            "employees": [],
+            "shifts": [],
+            "constraints": [{"id": "x"}],
+            "startDate": "2024-01-01T00:00:00Z",
+            "endDate": "2024-01-31T23:59:59Z"
+        }
+
+        response = client.post("/optimize", json=request_data)
+
+        assert response.status_code == 422
+
+    def test_solver_error_keeps_pool_usable(self):
+        """Test that an error raised in a solver process fails only its own request."""
+        request_data = {
+            "employees": [{"id": "emp-1"}],
+            "shifts": [
+                {"id": "shift-1", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                 "start_time": "2024-03-01T09:00:00Z", "end_time": "2024-03-01T17:00:00Z"}
+            ],
+            "constraints": [],
+            "startDate": "2024-03-01T00:00:00Z",
+            "endDate": "2024-03-31T23:59:59Z",
+            "options": {"maxOptimizationTime": 5, "solutionCount": 1}
+        }
+
+        failed = client.post("/optimize", json=request_data)
+        request_data["employees"] = [{"id": "emp-1", "name": "A", "email": "a@example.com"}]
+        solved = client.post("/optimize", json=request_data)
+
+        assert failed.status_code == 500
+        assert "terminated" not in failed.json()["detail"]
+        assert solved.status_code == 200
+        assert solved.json()["status"] == "completed"
     
     def test_optimize_with_no_shifts(self):
         """Test optimization with no shifts."""
@@ -100,6 +167,482 @@ class TestOptimizeEndpoint:
         assert "No shifts found" in data["message"]
 
 
+class TestRepairEndpoint:
+    """Tests for the repair endpoint."""
+
+    def test_repair_changed_shift(self):
+        """Test repairing a solution after one shift was added."""
+        request_data = {
+            "employees": [
+                {"id": "emp-1", "name": "John Doe", "email": "john@example.com"},
+                {"id": "emp-2", "name": "Jane Doe", "email": "jane@example.com"}
+            ],
+            "shifts": [
+                {
+                    "id": "shift-1", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                    "start_time": "2024-01-01T09:00:00Z", "end_time": "2024-01-01T17:00:00Z"
+                },
+                {
+                    "id": "shift-2", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                    "start_time": "2024-01-01T13:00:00Z", "end_time": "2024-01-01T21:00:00Z"
+                }
+            ],
+            "constraints": [],
+            "startDate": "2024-01-01T00:00:00Z",
+            "endDate": "2024-01-31T23:59:59Z",
+            "options": {"maxOptimizationTime": 5, "solutionCount": 1},
+            "assignments": [{"employeeId": "emp-1", "shiftId": "shift-1"}],
+            "changedShifts": ["shift-2"]
+        }
+
+        response = client.post("/optimize/repair", json=request_data)
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] == "completed"
+        assert data["repair"]["affectedShifts"] == ["shift-2"]
+        assert len(data["solutions"][0]["assignments"]) == 2
+
+
+class TestSolveExecutor:
+    """Tests for the bounded solve executor."""
+
+    def test_search_workers_split_cpu_budget(self):
+        """Test that concurrent solves share the CPU budget."""
+        executor = SolveExecutor(max_concurrent=4, max_queued=2, cpu_budget=8)
+
+        assert executor.workers_per_solve == 2
+
+    def test_concurrency_capped_at_cpu_budget(self):
+        """Test that concurrent solves never outnumber the cores."""
+        executor = SolveExecutor(max_concurrent=16, max_queued=0, cpu_budget=4)
+
+        assert executor.max_concurrent == 4
+        assert executor.workers_per_solve == 1
+
+    def test_profiling_hooks_resolved_by_path(self):
+        """Test that profiling hooks are imported from their paths and bad paths fail early."""
+        executor = SolveExecutor(
+            max_concurrent=1, max_queued=0, cpu_budget=1,
+            profiling_hooks=['src.solvers.profiling:remove_profiling_hook']
+        )
+
+        assert executor.profiling_hooks == ('src.solvers.profiling:remove_profiling_hook',)
+        assert resolve_hook('src.solvers.profiling:add_profiling_hook') is add_profiling_hook
+        with pytest.raises(ValueError):
+            SolveExecutor(max_concurrent=1, max_queued=0, cpu_budget=1, profiling_hooks=['src.solvers.profiling'])
+
+
+    def test_pool_is_replaced_after_a_worker_dies(self):
+        """Test that a killed solver process does not take down later solves."""
+        pool_executor = SolveExecutor(max_concurrent=1, max_queued=1, cpu_budget=1)
+        request = OptimizationRequest(
+            employees=[{"id": "emp-1", "name": "A", "email": "a@example.com"}],
+            shifts=[{"id": "shift-1", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                     "start_time": "2024-01-01T09:00:00Z", "end_time": "2024-01-01T17:00:00Z"}],
+            constraints=[],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"maxOptimizationTime": 5, "solutionCount": 1}
+        )
+        try:
+            assert asyncio.run(pool_executor.solve(request))["status"] == "completed"
+            for process in list(pool_executor._pool._processes.values()):
+                process.kill()
+                process.join()
+            # Let the pool notice its dead worker
+            time.sleep(0.5)
+
+            assert asyncio.run(pool_executor.solve(request))["status"] == "completed"
+        finally:
+            pool_executor.shutdown()
+
+
+class TestSolutionCache:
+    """Tests for the per-department warm-start cache."""
+
+    @staticmethod
+    def _request(*departments):
+        return OptimizationRequest(
+            employees=[],
+            shifts=[
+                {"id": f"shift-{dept}", "department_id": dept, "min_staffing": 1, "max_staffing": 1,
+                 "start_time": "2024-01-01T09:00:00Z", "end_time": "2024-01-01T17:00:00Z"}
+                for dept in departments
+            ],
+            constraints=[],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z"
+        )
+
+    @staticmethod
+    def _result(*departments):
+        return {
+            "status": "completed",
+            "solutions": [{
+                "assignments": [
+                    {"employeeId": f"emp-{dept}", "shiftId": f"shift-{dept}"} for dept in departments
+                ]
+            }]
+        }
+
+    def test_hints_come_from_last_accepted_solution(self):
+        """Test that a completed solve hints later runs over the same shifts."""
+        cache = SolutionCache(max_departments=4)
+        cache.remember(self._request("a", "b"), self._result("a", "b"))
+        cache.remember(self._request("a"), {"status": "failed", "solutions": []})
+
+        assert cache.hints_for(self._request("a", "c")) == [("emp-a", "shift-a")]
+
+    def test_evicts_least_recently_used_department(self):
+        """Test LRU eviction once the cache is full."""
+        cache = SolutionCache(max_departments=2)
+        cache.remember(self._request("a"), self._result("a"))
+        cache.remember(self._request("b"), self._result("b"))
+        cache.hints_for(self._request("a"))
+        cache.remember(self._request("c"), self._result("c"))
+
+        assert len(cache) == 2
+        assert cache.hints_for(self._request("b")) == []
+        assert cache.hints_for(self._request("a")) == [("emp-a", "shift-a")]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def result_store(request, tmp_path):
+    """Each result store implementation, holding two results for 60 seconds."""
+    if request.param == "memory":
+        return InMemoryResultStore(max_entries=2, ttl_seconds=60)
+    return SQLiteResultStore(str(tmp_path / "results.sqlite3"), max_entries=2, ttl_seconds=60)
+
+
+class TestResultCache:
+    """Tests for the content-addressed result cache."""
+
+    @staticmethod
+    def _request(**changes):
+        data = {
+            "employees": [
+                {"id": "emp-1", "name": "A", "email": "a@example.com"},
+                {"id": "emp-2", "name": "B", "email": "b@example.com"},
+            ],
+            "shifts": [
+                {"id": "shift-1", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                 "start_time": "2024-01-01T09:00:00Z", "end_time": "2024-01-01T17:00:00Z"},
+            ],
+            "constraints": [{"id": "rest", "type": "min_rest", "rules": {"minRestHours": 11}}],
+            "startDate": "2024-01-01T00:00:00Z",
+            "endDate": "2024-01-07T00:00:00Z",
+        }
+        data.update(changes)
+        return OptimizationRequest(**data)
+
+    def test_key_ignores_what_the_solver_ignores(self):
+        """Test that order, defaults, out-of-range shifts and inactive constraints don't change the key."""
+        request = self._request()
+        base = request_key(request)
+        outside = {"id": "shift-9", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                   "start_time": "2024-02-01T09:00:00Z", "end_time": "2024-02-01T17:00:00Z"}
+
+        assert request_key(self._request(employees=request.employees[::-1])) == base
+        assert request_key(self._request(options={"objective": "balance"})) == base
+        assert request_key(self._request(shifts=request.shifts + [outside])) == base
+        assert request_key(self._request(constraints=request.constraints + [
+            {"id": "off", "type": "max_hours", "rules": {"maxHours": 1}, "active": False}
+        ])) == base
+
+        assert request_key(self._request(options={"objective": "minimize_cost"})) != base
+        assert request_key(self._request(employees=request.employees[:1])) != base
+
+    def test_store_expires_and_evicts(self, result_store):
+        """Test TTL expiry and least-recently-used eviction."""
+        result_store.put("a", {"status": "completed"}, now=0.0)
+        result_store.put("b", {"status": "completed"}, now=1.0)
+        assert result_store.get("a", now=2.0) == {"status": "completed"}
+        result_store.put("c", {"status": "completed"}, now=3.0)
+
+        assert result_store.get("b", now=4.0) is None
+        assert result_store.get("a", now=4.0) is not None
+        assert result_store.get("a", now=60.0) is None
+        assert result_store.get("c", now=62.0) is not None
+
+    def test_identical_requests_share_one_solve(self):
+        """Test that concurrent identical requests coalesce and later ones hit the cache."""
+        cache = ResultCache(InMemoryResultStore(max_entries=4, ttl_seconds=60))
+        calls = []
+
+        async def solve():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return {"status": "completed", "solutions": []}
+
+        async def run():
+            first = await asyncio.gather(*(cache.get_or_solve(self._request(), solve) for _ in range(3)))
+            second = await cache.get_or_solve(self._request(), solve)
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert len(calls) == 1
+        # Keys are computed in worker threads, so any of them may start the solve
+        assert sorted(cached for _, cached in first) == [False, True, True]
+        assert second == ({"status": "completed", "solutions": []}, True)
+
+    def test_unproven_failures_are_not_cached(self):
+        """Test that a failure without proof of infeasibility is solved again."""
+        cache = ResultCache(InMemoryResultStore(max_entries=4, ttl_seconds=60))
+        calls = []
+
+        async def solve():
+            calls.append(1)
+            return {"status": "failed", "message": "No feasible solution found"}
+
+        asyncio.run(cache.get_or_solve(self._request(), solve))
+        asyncio.run(cache.get_or_solve(self._request(), solve))
+
+        assert len(calls) == 2
+
+    def test_repeated_optimize_is_served_from_cache(self):
+        """Test that resubmitting a request returns the cached result."""
+        request_data = self._request(options={"maxOptimizationTime": 5, "solutionCount": 1}).model_dump()
+
+        first = client.post("/optimize", json=request_data).json()
+        second = client.post("/optimize", json=request_data).json()
+
+        assert first["status"] == "completed"
+        assert first["cached"] is False
+        assert second["cached"] is True
+        assert second["solutions"] == first["solutions"]
+        assert second["optimizationId"] != first["optimizationId"]
+
+
+class TestMetrics:
+    """Tests for the Prometheus metrics."""
+
+    @staticmethod
+    def _result(status, first_solution_time=None):
+        return {
+            "status": "completed" if status in ("OPTIMAL", "FEASIBLE") else "failed",
+            "totalSolveTime": 1500.0,
+            "profile": {
+                "phases": {"parse": 1.0, "variables": 20.0, "constraints.staffing": 30.0, "search": 1400.0},
+                "model": {"models": 1},
+                "search": {"status": status, "firstSolutionTime": first_solution_time},
+            },
+        }
+
+    def test_results_feed_histograms_and_status_counters(self):
+        """Test how finished solves are recorded and rendered."""
+        metrics = SolverMetrics()
+        request = OptimizationRequest(
+            employees=[], shifts=[], constraints=[],
+            startDate="2024-01-01T00:00:00Z", endDate="2024-01-31T23:59:59Z",
+            options={"objective": "minimize_cost"}
+        )
+
+        metrics.observe(request, self._result("OPTIMAL", first_solution_time=80.0))
+        metrics.observe(request, self._result("UNKNOWN"))
+        metrics.observe(request, {"status": "failed", "infeasibility": [{}], "totalSolveTime": 2.0})
+        metrics.observe(request, None)
+
+        labels = ("minimize_cost", "<=100")
+        assert [metrics.solves.value(s) for s in ("OPTIMAL", "timeout", "INFEASIBLE", "error")] == [1, 1, 1, 1]
+        assert metrics.solve_duration.count(*labels) == 3
+        assert metrics.first_solution.count(*labels) == 1
+        assert metrics.model_build.count(*labels) == 2
+        text = metrics.render()
+        assert 'optimizer_model_build_seconds_bucket{objective="minimize_cost",size="<=100",le="0.025"} 0' in text
+        assert 'optimizer_model_build_seconds_bucket{objective="minimize_cost",size="<=100",le="0.05"} 2' in text
+        assert 'optimizer_first_solution_seconds_sum{objective="minimize_cost",size="<=100"} 0.08' in text
+        assert "# TYPE optimizer_solves_total counter" in text
+        assert size_bucket(100) == "<=100" and size_bucket(20000) == ">10000"
+
+    def test_metrics_endpoint_reports_solves_and_load(self):
+        """Test that a solve through the API shows up on /metrics."""
+        request_data = TestResultCache._request(
+            options={"objective": "minimize_cost", "maxOptimizationTime": 5, "solutionCount": 2}
+        ).model_dump()
+
+        client.post("/optimize", json=request_data)
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert 'optimizer_solves_total{status="OPTIMAL"}' in response.text
+        assert 'optimizer_solve_duration_seconds_count{objective="minimize_cost",size="<=100"}' in response.text
+        assert "optimizer_queue_depth 0.0" in response.text
+        assert "optimizer_active_solves 0.0" in response.text
+
+
+class TestColumnarRequest:
+    """Tests for MessagePack and Arrow request bodies."""
+
+    @staticmethod
+    def _payload():
+        return {
+            "employees": {
+                "id": ["emp-1", "emp-2"],
+                "name": ["A", "B"],
+                "email": ["a@example.com", "b@example.com"],
+                "skills": [["nursing"], []],
+            },
+            "shifts": {
+                "id": ["shift-1", "shift-2"],
+                "department_id": ["dept-1", "dept-1"],
+                "required_skills": [["nursing"], []],
+                "min_staffing": [1, 1],
+                "max_staffing": [1, 2],
+                "start": [1704099600, 1704186000],  # 2024-01-01T09:00Z, 2024-01-02T09:00Z
+                "end": [1704128400, 1704214800],
+                "utc_offset_minutes": [0, 120],
+            },
+            "constraints": [],
+            "startDate": "2024-01-01T00:00:00Z",
+            "endDate": "2024-01-07T00:00:00Z",
+            "options": {"maxOptimizationTime": 5, "solutionCount": 1},
+        }
+
+    def test_columns_compile_like_the_json_request(self):
+        """Test that a columnar request compiles to the same instance and cache key."""
+        columnar = build_request(self._payload())
+        json_request = OptimizationRequest(
+            employees=[
+                {"id": "emp-1", "name": "A", "email": "a@example.com", "skills": [{"name": "nursing"}]},
+                {"id": "emp-2", "name": "B", "email": "b@example.com", "skills": []},
+            ],
+            shifts=[
+                {"id": "shift-1", "department_id": "dept-1", "required_skills": ["nursing"],
+                 "min_staffing": 1, "max_staffing": 1,
+                 "start_time": "2024-01-01T09:00:00Z", "end_time": "2024-01-01T17:00:00Z"},
+                {"id": "shift-2", "department_id": "dept-1", "required_skills": [],
+                 "min_staffing": 1, "max_staffing": 2,
+                 "start_time": "2024-01-02T11:00:00+02:00", "end_time": "2024-01-02T19:00:00+02:00"},
+            ],
+            constraints=[],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-07T00:00:00Z",
+            options={"maxOptimizationTime": 5, "solutionCount": 1},
+        )
+
+        expected, instance = compile_request(json_request), compile_request(columnar)
+
+        assert instance.shift_ids == expected.shift_ids
+        for attribute in ("start_minutes", "end_minutes", "week_minutes", "employee_skills", "shift_skills"):
+            assert (getattr(instance, attribute) == getattr(expected, attribute)).all()
+        assert request_key(columnar) == request_key(build_request(self._payload()))
+        assert columnar.num_shifts == 2
+        assert columnar.get_shift_departments() == {"shift-1": "dept-1", "shift-2": "dept-1"}
+
+    def test_key_hashes_columns(self):
+        """Test that columnar keys ignore row order and out-of-range shifts but not shift times."""
+        base = request_key(build_request(self._payload()))
+
+        payload = self._payload()
+        payload["employees"] = {name: values[::-1] for name, values in payload["employees"].items()}
+        payload["shifts"] = {name: values[::-1] for name, values in payload["shifts"].items()}
+        assert request_key(build_request(payload)) == base
+
+        payload = self._payload()
+        outside = {"id": "shift-9", "department_id": "dept-1", "required_skills": [], "min_staffing": 1,
+                   "max_staffing": 1, "start": 1706778000, "end": 1706806800, "utc_offset_minutes": 0}
+        for name, value in outside.items():
+            payload["shifts"][name].append(value)
+        assert request_key(build_request(payload)) == base
+
+        payload = self._payload()
+        payload["shifts"]["utc_offset_minutes"] = [0, 60]
+        assert request_key(build_request(payload)) != base
+        payload = self._payload()
+        payload["shifts"]["end"] = [1704128400, 1704218400]
+        assert request_key(build_request(payload)) != base
+
+    def test_malformed_columns_are_rejected(self):
+        """Test column validation."""
+        payload = self._payload()
+        payload["shifts"]["end"] = payload["shifts"]["end"][:1]
+        with pytest.raises(ValueError, match="differ in length"):
+            build_request(payload)
+
+        payload = self._payload()
+        payload["shifts"]["min_staffing"] = [-1, 1]
+        with pytest.raises(ValueError, match="min_staffing"):
+            build_request(payload)
+
+        payload = self._payload()
+        del payload["shifts"]["start"]
+        with pytest.raises(ValueError, match="lacks column"):
+            build_request(payload)
+
+    @pytest.mark.parametrize("table, column, values", [
+        ("shifts", "required_skills", [[5], []]),
+        ("shifts", "required_skills", ["nursing", []]),
+        ("employees", "skills", ["nursing", []]),
+        ("employees", "name", ["A", 7]),
+        ("shifts", "start", [1704099600.5, 1704186000]),
+        ("shifts", "max_staffing", ["1", "2"]),
+        ("shifts", "end", [1704099600, 1704186000]),
+        ("shifts", "metadata", ["note", None]),
+        ("employees", "availability_pattern", [{"windows": [{"dayOfWeek": 1}]}, None]),
+        ("employees", "availability_pattern", [{"windows": "always"}, None]),
+        ("shifts", "id", "shift-1"),
+    ])
+    def test_malformed_column_values_are_rejected(self, table, column, values):
+        """Test that each malformed column shape raises ValueError (a 422) rather than a TypeError."""
+        payload = self._payload()
+        payload[table][column] = values
+
+        with pytest.raises(ValueError):
+            build_request(payload)
+
+    def test_malformed_constraint_is_rejected(self):
+        """Test that constraints are validated when the body is decoded."""
+        payload = self._payload()
+        payload["constraints"] = [{"id": "c1", "type": "max_hours"}]
+
+        with pytest.raises(ValueError):
+            build_request(payload)
+
+    def test_unsupported_content_type_is_415(self):
+        """Test that JSON is not accepted on the columnar endpoint."""
+        response = client.post(
+            "/optimize/columnar", content=json.dumps(self._payload()), headers={"content-type": "application/json"}
+        )
+
+        assert response.status_code == 415
+
+    def test_msgpack_body_is_solved(self):
+        """Test the endpoint with a MessagePack body."""
+        msgpack = pytest.importorskip("msgpack")
+
+        response = client.post(
+            "/optimize/columnar",
+            content=msgpack.packb(self._payload()),
+            headers={"content-type": "application/msgpack"}
+        )
+
+        data = response.json()
+        assert response.status_code == 200
+        assert data["status"] == "completed"
+        assert {a["shiftId"] for a in data["solutions"][0]["assignments"]} == {"shift-1", "shift-2"}
+
+    def test_arrow_body_is_solved(self):
+        """Test the endpoint with an Arrow IPC stream of the shifts."""
+        pa = pytest.importorskip("pyarrow")
+        payload = self._payload()
+        table = pa.table(payload.pop("shifts")).replace_schema_metadata({"request": json.dumps(payload)})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+
+        response = client.post(
+            "/optimize/columnar",
+            content=sink.getvalue().to_pybytes(),
+            headers={"content-type": "application/vnd.apache.arrow.stream"}
+        )
+
+        assert response.status_code == 200
+        assert response.json()["status"] == "completed"
+
+
 class TestRootEndpoint:
     """Tests for root endpoint."""
     
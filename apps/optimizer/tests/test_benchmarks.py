@@ -0,0 +1,65 @@
+"""Tests for the benchmark generator and runner."""
+from benchmarks.generator import SIZES, InstanceConfig, generate_request
+from benchmarks.runner import compare_reports, run_benchmarks
+from src.solvers.schedule_solver import ScheduleSolver
+
+
+class TestGenerator:
+    """Tests for the synthetic roster generator."""
+
+    def test_same_seed_same_request(self):
+        """Test that a config and seed always produce the same request."""
+        config = SIZES['small']
+        assert generate_request(config) == generate_request(config)
+        other = generate_request(config.model_copy(update={'seed': 1}))
+        assert other != generate_request(config)
+
+    def test_sizes_match_config(self):
+        """Test that the generated request has the configured dimensions."""
+        config = InstanceConfig(num_employees=7, num_days=4, shifts_per_day=2, num_departments=2)
+        request = generate_request(config)
+        assert len(request.employees) == 7
+        assert len(request.shifts) == 4 * 2 * 2
+        assert {c['type'] for c in request.constraints} == set(config.constraint_types)
+
+    def test_required_skills_are_held(self):
+        """Test that shifts only require skills some employee holds."""
+        request = generate_request(InstanceConfig(num_employees=3, num_skills=20, skill_density=1.0))
+        held = {skill['name'] for employee in request.employees for skill in employee['skills']}
+        assert all(set(shift['required_skills']) <= held for shift in request.shifts)
+
+    def test_tiny_preset_is_solvable(self):
+        """Test that the smallest preset passes the pre-check and solves."""
+        result = ScheduleSolver().solve(generate_request(SIZES['tiny']))
+        assert result['status'] == 'completed'
+
+
+class TestRunner:
+    """Tests for the benchmark runner and report comparison."""
+
+    def test_report_records_metrics(self):
+        """Test that a run reports timings, model size and solution quality."""
+        report = run_benchmarks([SIZES['tiny']], time_limit=5.0, num_workers=1, isolate=False)
+        case, = report['cases']
+        assert case['name'] == 'tiny'
+        assert case['status'] == 'OPTIMAL'
+        assert case['objective'] is not None
+        assert case['objective'] >= case['bound']
+        assert case['variables'] > 0 and case['constraints'] > 0
+        assert case['firstSolutionMs'] is not None
+        assert report['environment']['ortools']
+
+    def test_compare_reports_flags_regressions(self):
+        """Test that only changes beyond tolerance and noise are regressions."""
+        def report(solve_ms, objective):
+            return {'cases': [{
+                'name': 'small', 'seed': 0, 'solveTimeMs': solve_ms, 'buildTimeMs': 10.0,
+                'firstSolutionMs': 5.0, 'peakRssMb': 100.0, 'objective': objective,
+            }]}
+
+        baseline = report(1000.0, 500)
+        assert compare_reports(baseline, report(1100.0, 500)) == []
+        regressions = compare_reports(baseline, report(2000.0, 700))
+        assert {r['metric'] for r in regressions} == {'solveTimeMs', 'objective'}
+        unsolved = compare_reports(baseline, report(1000.0, None))
+        assert unsolved == [{'name': 'small', 'seed': 0, 'metric': 'objective', 'baseline': 500, 'current': None}]
@@ -0,0 +1,257 @@
+"""Tests for asynchronous optimization jobs."""
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+from fastapi.testclient import TestClient
+from src.api.job_manager import JobManager
+from src.api.job_store import InMemoryJobStore, SQLiteJobStore
+from src.api.solution_cache import SolutionCache
+from src.api.routes import app
+from src.models.job_model import Job, JobStatus
+from src.models.optimization_request import OptimizationRequest
+
+client = TestClient(app)
+
+REQUEST_DATA = {
+    "employees": [
+        {
+            "id": "emp-1",
+            "name": "John Doe",
+            "email": "john@example.com",
+            "skills": [{"name": "nursing"}]
+        }
+    ],
+    "shifts": [
+        {
+            "id": "shift-1",
+            "department_id": "dept-1",
+            "min_staffing": 1,
+            "max_staffing": 1,
+            "start_time": "2024-01-01T09:00:00Z",
+            "end_time": "2024-01-01T17:00:00Z"
+        }
+    ],
+    "constraints": [],
+    "startDate": "2024-01-01T00:00:00Z",
+    "endDate": "2024-01-31T23:59:59Z",
+    "options": {"maxOptimizationTime": 5, "solutionCount": 1}
+}
+
+
+class FakeExecutor:
+    """Executor stand-in whose futures are completed by the test."""
+
+    def __init__(self):
+        self.futures = []
+        self.stop_events = []
+        self.start_events = []
+
+    def create_stop_event(self):
+        event = threading.Event()
+        self.stop_events.append(event)
+        return event
+
+    def create_start_event(self):
+        event = threading.Event()
+        self.start_events.append(event)
+        return event
+
+    def create_solution_queue(self):
+        return None
+
+    def submit(self, request, stop_event=None, solution_queue=None, hints=None, start_event=None):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        self.futures.append(future)
+        return future
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def job_store(request, tmp_path):
+    """Each job store implementation."""
+    if request.param == "memory":
+        return InMemoryJobStore()
+    return SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+class TestJobStore:
+    """Tests for job stores."""
+
+    def test_save_and_get(self, job_store):
+        """Test round-tripping a job."""
+        job_store.save(Job(id="job-1", createdAt=1.0, result={"status": "completed"}))
+
+        job = job_store.get("job-1")
+
+        assert job.id == "job-1"
+        assert job.result == {"status": "completed"}
+        assert job_store.get("missing") is None
+
+    def test_evicts_expired_jobs(self, job_store):
+        """Test that finished jobs are evicted after their TTL."""
+        job_store.save(Job(id="old", createdAt=1.0, expiresAt=10.0))
+        job_store.save(Job(id="new", createdAt=1.0, expiresAt=100.0))
+        job_store.save(Job(id="running", createdAt=1.0))
+
+        assert job_store.evict_expired(now=50.0) == 1
+        assert job_store.get("old") is None
+        assert job_store.get("new") is not None
+        assert job_store.get("running") is not None
+
+    def test_fail_unfinished_jobs(self, job_store):
+        """Test that jobs left queued or running are failed with an expiry."""
+        job_store.save(Job(id="queued", createdAt=1.0))
+        job_store.save(Job(id="done", status=JobStatus.COMPLETED, createdAt=1.0, finishedAt=2.0, expiresAt=100.0))
+
+        assert job_store.fail_unfinished("restarted", ttl_seconds=60, now=10.0) == 1
+
+        job = job_store.get("queued")
+        assert job.status == JobStatus.FAILED
+        assert job.error == "restarted"
+        assert job.expiresAt == 70.0
+        assert job_store.get("done").status == JobStatus.COMPLETED
+        assert job_store.evict_expired(now=80.0) == 1
+        assert job_store.get("queued") is None
+
+
+class TestJobManager:
+    """Tests for the job manager."""
+
+    def _manager(self):
+        executor = FakeExecutor()
+        return executor, JobManager(executor, InMemoryJobStore(), ttl_seconds=60)
+
+    def test_completed_job_keeps_result(self):
+        """Test that a finished solve is stored with an expiry."""
+        executor, manager = self._manager()
+        job = manager.submit(OptimizationRequest(**REQUEST_DATA))
+
+        assert manager.get(job.id).status == JobStatus.QUEUED
+        executor.start_events[0].set()
+        assert manager.get(job.id).status == JobStatus.RUNNING
+
+        executor.futures[0].set_result({"status": "completed", "solutions": []})
+        job = manager.get(job.id)
+
+        assert job.status == JobStatus.COMPLETED
+        assert job.result["status"] == "completed"
+        assert job.expiresAt == pytest.approx(job.finishedAt + 60)
+
+    def test_cancel_running_job_sets_stop_event(self):
+        """Test that cancelling a running job stops its search."""
+        executor, manager = self._manager()
+        job = manager.submit(OptimizationRequest(**REQUEST_DATA))
+
+        manager.cancel(job.id)
+        assert executor.stop_events[0].is_set()
+
+        executor.futures[0].set_result({"status": "completed", "solutions": []})
+        job = manager.get(job.id)
+
+        assert job.status == JobStatus.CANCELLED
+        assert job.result is not None
+
+    def test_jobs_of_previous_process_fail_on_start(self, tmp_path):
+        """Test that a restarted service fails jobs it can no longer run."""
+        path = str(tmp_path / "jobs.sqlite3")
+        job = JobManager(FakeExecutor(), SQLiteJobStore(path), ttl_seconds=60).submit(
+            OptimizationRequest(**REQUEST_DATA)
+        )
+
+        job = JobManager(FakeExecutor(), SQLiteJobStore(path), ttl_seconds=60).get(job.id)
+
+        assert job.status == JobStatus.FAILED
+        assert job.expiresAt is not None
+
+    def test_only_jobs_of_exited_processes_fail_on_start(self, tmp_path):
+        """Test that a starting service leaves jobs of live processes and other hosts alone."""
+        host = socket.gethostname()
+        exited = subprocess.Popen([sys.executable, "-c", "pass"])
+        exited.wait()
+        store = SQLiteJobStore(str(tmp_path / "jobs.sqlite3"))
+        owners = {
+            "live": f"{host}:{os.getppid()}",
+            "exited": f"{host}:{exited.pid}",
+            "remote": "another-host:1",
+            "legacy": None,
+        }
+        for job_id, owner in owners.items():
+            store.save(Job(id=job_id, createdAt=1.0, owner=owner))
+
+        JobManager(FakeExecutor(), store, ttl_seconds=60)
+
+        assert {job_id: store.get(job_id).status for job_id in owners} == {
+            "live": JobStatus.QUEUED,
+            "exited": JobStatus.FAILED,
+            "remote": JobStatus.QUEUED,
+            "legacy": JobStatus.FAILED,
+        }
+
+    def test_only_completed_jobs_warm_start_later_solves(self):
+        """Test that completed, not cancelled, results feed the solution cache."""
+        executor = FakeExecutor()
+        cache = SolutionCache(max_departments=4)
+        manager = JobManager(executor, InMemoryJobStore(), ttl_seconds=60, solution_cache=cache)
+        request = OptimizationRequest(**REQUEST_DATA)
+        result = {
+            "status": "completed",
+            "solutions": [{"assignments": [{"employeeId": "emp-1", "shiftId": "shift-1"}]}]
+        }
+
+        cancelled = manager.submit(request)
+        manager.cancel(cancelled.id)
+        executor.futures[0].set_result(result)
+        assert cache.hints_for(request) == []
+
+        manager.submit(request)
+        executor.futures[1].set_result(result)
+        assert cache.hints_for(request) == [("emp-1", "shift-1")]
+
+
+class TestJobEndpoints:
+    """Tests for the jobs API."""
+
+    def test_submit_poll_and_fetch_result(self):
+        """Test the full job lifecycle."""
+        response = client.post("/jobs", json=REQUEST_DATA)
+        assert response.status_code == 202
+        job_id = response.json()["jobId"]
+
+        deadline = time.time() + 60
+        status = response.json()["status"]
+        while status not in JobStatus.FINISHED and time.time() < deadline:
+            time.sleep(0.1)
+            status = client.get(f"/jobs/{job_id}").json()["status"]
+
+        assert status == JobStatus.COMPLETED
+        result = client.get(f"/jobs/{job_id}/result").json()
+        assert result["optimizationId"] == job_id
+        assert result["status"] == "completed"
+        assert len(result["solutions"]) == 1
+
+    def test_unknown_job_returns_404(self):
+        """Test that unknown or expired jobs return 404."""
+        assert client.get("/jobs/job_missing").status_code == 404
+        assert client.get("/jobs/job_missing/result").status_code == 404
+        assert client.post("/jobs/job_missing/cancel").status_code == 404
+
+    def test_stream_sends_incumbents_then_result(self):
+        """Test that the stream reports incumbents before the final result."""
+        with client.stream("POST", "/optimize/stream", json=REQUEST_DATA) as response:
+            assert response.status_code == 200
+            events = [json.loads(line) for line in response.iter_lines() if line]
+
+        assert events[0]["event"] == "started"
+        assert events[-1]["event"] == "result"
+        assert events[-1]["status"] == "completed"
+        incumbents = [e for e in events if e["event"] == "solution"]
+        assert incumbents
+        assert {"objective", "bound", "gap", "assignments"} <= incumbents[0].keys()
+        assert incumbents[0]["jobId"] == events[0]["jobId"]
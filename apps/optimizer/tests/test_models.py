@@ -47,6 +47,12 @@ class TestEmployee:
         
         assert employee.has_skill("nursing") is True
         assert employee.has_skill("cpr") is False
+        assert employee.model_copy(update={"skills": [{"name": "cpr"}]}).has_skill("cpr") is True
+        employee.skills.append({"name": "triage"})
+        assert employee.has_skill("triage") is True
+        employee.skills = [{"name": "cpr"}]
+        assert employee.skill_set == {"cpr"}
+        assert employee.has_skill("nursing") is False
 
 
 class TestShift:
@@ -115,6 +121,16 @@ class TestConstraint:
         assert constraint.get_max_hours() == 40
         assert constraint.get_period_days() == 7
     
+    def test_max_hours_limits(self):
+        """Test per-period, weekly and daily hour limits."""
+        constraint = Constraint(
+            id="constraint-1",
+            type="max_hours",
+            rules={"maxHours": 80, "periodInDays": 14, "maxHoursPerWeek": 48, "maxHoursPerDay": 12}
+        )
+        
+        assert constraint.get_hour_limits() == [(14, 80), (7, 48), (1, 12)]
+    
     def test_min_rest_constraint(self):
         """Test min rest constraint."""
         constraint = Constraint(
@@ -1,9 +1,14 @@
 """Tests for optimization engine."""
+import threading
+import time
+from datetime import datetime, timedelta
+
 import pytest
 from src.models.constraint_model import Constraint
 from src.models.employee_model import Employee
 from src.models.optimization_request import OptimizationOptions
-from src.models.schedule_model import Shift
+from src.models.schedule_model import Schedule, Shift
+from src.solvers.model_cache import ModelCache
 from src.solvers.optimization_engine import OptimizationEngine
 
 
@@ -92,3 +97,288 @@ class TestOptimizationEngine:
         # Should return at least empty array or solutions
         assert isinstance(solutions, list)
 
+
+    def test_only_eligible_pairs_become_variables(self):
+        """Test that ineligible employee-shift pairs get no decision variable."""
+        employees = [
+            Employee(id="emp-1", name="A", email="a@example.com", skills=[{"name": "nursing"}]),
+            Employee(id="emp-2", name="B", email="b@example.com", skills=[{"name": "cpr"}]),
+        ]
+        shifts = [
+            Shift(
+                id="shift-1",
+                department_id="dept-1",
+                required_skills=["nursing"],
+                min_staffing=1,
+                max_staffing=2,
+                start_time="2024-01-01T09:00:00Z",
+                end_time="2024-01-01T17:00:00Z"
+            )
+        ]
+        engine = OptimizationEngine(
+            employees=employees,
+            shifts=shifts,
+            constraints=[],
+            current_schedules=[],
+            options=OptimizationOptions(maxOptimizationTime=5, solutionCount=1)
+        )
+
+        solutions = engine.solve()
+
+        assert engine.employee_shift[1] == {}
+        assert len(engine.model.Proto().variables) == 1
+        assert [a["employeeId"] for a in solutions[0]["assignments"]] == ["emp-1"]
+
+    def test_overlapping_shifts_not_assigned_to_same_employee(self):
+        """Test that overlapping shifts are never given to one employee."""
+        employees = [
+            Employee(id="emp-1", name="A", email="a@example.com"),
+            Employee(id="emp-2", name="B", email="b@example.com"),
+        ]
+        shifts = [
+            Shift(
+                id=f"shift-{i}",
+                department_id="dept-1",
+                min_staffing=1,
+                max_staffing=1,
+                start_time=start,
+                end_time=end
+            )
+            for i, (start, end) in enumerate([
+                ("2024-01-01T08:00:00Z", "2024-01-01T16:00:00Z"),
+                ("2024-01-01T12:00:00Z", "2024-01-01T20:00:00Z"),
+            ])
+        ]
+        engine = OptimizationEngine(
+            employees=employees,
+            shifts=shifts,
+            constraints=[],
+            current_schedules=[],
+            options=OptimizationOptions(maxOptimizationTime=5, solutionCount=1)
+        )
+
+        solutions = engine.solve()
+
+        employee_ids = [a["employeeId"] for a in solutions[0]["assignments"]]
+        assert sorted(employee_ids) == ["emp-1", "emp-2"]
+
+    @pytest.mark.slow
+    def test_stop_event_stops_search_early(self):
+        """Test that setting the stop event ends the search with its best solution."""
+        employees = [
+            Employee(id=f"emp-{i}", name=f"Employee {i}", email=f"emp{i}@example.com")
+            for i in range(13)
+        ]
+        base = datetime(2024, 2, 1)
+        shifts = []
+        for day in range(28):
+            for slot, (hour, length) in enumerate([(6, 7), (13, 9), (22, 8)]):
+                start = base + timedelta(days=day, hours=hour)
+                shifts.append(Shift(
+                    id=f"shift-{day}-{slot}",
+                    department_id="dept-1",
+                    min_staffing=2,
+                    max_staffing=2,
+                    start_time=start.isoformat() + "Z",
+                    end_time=(start + timedelta(hours=length)).isoformat() + "Z"
+                ))
+        stop_event = threading.Event()
+        engine = OptimizationEngine(
+            employees=employees,
+            shifts=shifts,
+            constraints=[Constraint(id="rest", type="min_rest", rules={"minRestHours": 11})],
+            current_schedules=[],
+            options=OptimizationOptions(objective="maximize_fairness", maxOptimizationTime=60),
+            stop_event=stop_event
+        )
+
+        threading.Timer(1.0, stop_event.set).start()
+        started = time.time()
+        solutions = engine.solve()
+
+        assert time.time() - started < 30
+        assert solutions
+
+    def test_on_solution_receives_incumbents(self):
+        """Test that every incumbent is published with its bound and gap."""
+        incumbents = []
+        engine = OptimizationEngine(
+            employees=[Employee(id="emp-1", name="A", email="a@example.com")],
+            shifts=[
+                Shift(
+                    id="shift-1",
+                    department_id="dept-1",
+                    min_staffing=1,
+                    max_staffing=1,
+                    start_time="2024-01-01T09:00:00Z",
+                    end_time="2024-01-01T17:00:00Z"
+                )
+            ],
+            constraints=[],
+            current_schedules=[],
+            options=OptimizationOptions(maxOptimizationTime=5, solutionCount=1),
+            on_solution=incumbents.append
+        )
+
+        engine.solve()
+
+        assert incumbents
+        assert incumbents[-1]["objective"] == 480
+        assert incumbents[-1]["gap"] == 0
+        assert incumbents[-1]["assignments"][0]["shiftId"] == "shift-1"
+
+    def test_current_schedules_and_cached_assignments_become_hints(self):
+        """Test that confirmed/tentative schedules and cached rosters warm-start CP-SAT."""
+        employees = [
+            Employee(id=f"emp-{i}", name=f"Employee {i}", email=f"emp{i}@example.com")
+            for i in range(3)
+        ]
+        shifts = [
+            Shift(
+                id=f"shift-{day}",
+                department_id="dept-1",
+                min_staffing=1,
+                max_staffing=1,
+                start_time=f"2024-01-0{day + 1}T09:00:00Z",
+                end_time=f"2024-01-0{day + 1}T17:00:00Z"
+            )
+            for day in range(2)
+        ]
+        engine = OptimizationEngine(
+            employees=employees,
+            shifts=shifts,
+            constraints=[],
+            current_schedules=[
+                Schedule(
+                    id="sched-1", employee_id="emp-2", shift_id="shift-0", status="tentative",
+                    start_time=shifts[0].start_time, end_time=shifts[0].end_time
+                )
+            ],
+            options=OptimizationOptions(objective="maximize_fairness", maxOptimizationTime=5, solutionCount=1),
+            hints=[("emp-0", "shift-0"), ("emp-1", "shift-1")]
+        )
+
+        solutions = engine.solve()
+
+        hint = engine.model.Proto().solution_hint
+        hinted = dict(zip(hint.vars, hint.values))
+        assert hinted[engine.employee_shift[2][0].Index()] == 1
+        assert hinted[engine.employee_shift[0][0].Index()] == 0
+        assert hinted[engine.employee_shift[1][1].Index()] == 1
+        assert engine.hinted_minutes.tolist() == [0, 480, 480]
+        assert solutions[0]["score"] == 480
+
+    def test_symmetry_breaking_orders_interchangeable_employees(self):
+        """Test that identical employees get lexicographically ordered rosters."""
+        engine = OptimizationEngine(
+            employees=[
+                Employee(id=f"emp-{i}", name=f"Employee {i}", email=f"emp{i}@example.com")
+                for i in range(3)
+            ],
+            shifts=[
+                Shift(
+                    id=f"shift-{day}",
+                    department_id="dept-1",
+                    min_staffing=1,
+                    max_staffing=1,
+                    start_time=f"2024-01-0{day + 1}T09:00:00Z",
+                    end_time=f"2024-01-0{day + 1}T17:00:00Z"
+                )
+                for day in range(3)
+            ],
+            constraints=[],
+            current_schedules=[],
+            options=OptimizationOptions(
+                objective="maximize_fairness", maxOptimizationTime=5, solutionCount=1, symmetryBreaking=True
+            )
+        )
+
+        solutions = engine.solve()
+
+        assigned = {a["shiftId"]: a["employeeId"] for a in solutions[0]["assignments"]}
+        assert solutions[0]["score"] == 0
+        assert assigned == {"shift-0": "emp-0", "shift-1": "emp-1", "shift-2": "emp-2"}
+
+
+class TestModelCache:
+    """Tests for reusing built models across objectives."""
+
+    @staticmethod
+    def _engine(objective, cache, hints=None, max_hours=16):
+        employees = [
+            Employee(id=f"emp-{i}", name=f"Employee {i}", email=f"emp{i}@example.com")
+            for i in range(3)
+        ]
+        shifts = [
+            Shift(
+                id=f"shift-{day}",
+                department_id="dept-1",
+                min_staffing=1,
+                max_staffing=2,
+                start_time=f"2024-01-0{day + 1}T09:00:00Z",
+                end_time=f"2024-01-0{day + 1}T17:00:00Z"
+            )
+            for day in range(4)
+        ]
+        return OptimizationEngine(
+            employees=employees,
+            shifts=shifts,
+            constraints=[
+                Constraint(id="hours", type="max_hours", rules={"maxHours": max_hours, "periodInDays": 7}),
+                Constraint(id="days", type="max_consecutive_days", rules={"maxDays": 2}),
+            ],
+            current_schedules=[],
+            options=OptimizationOptions(
+                objective=objective, maxOptimizationTime=5, solutionCount=1, softPriorityThreshold=1
+            ),
+            hints=hints,
+            model_cache=cache
+        )
+
+    @staticmethod
+    def _hints_by_name(engine):
+        proto = engine.model.Proto()
+        return {
+            proto.variables[index].name: value
+            for index, value in zip(proto.solution_hint.vars, proto.solution_hint.values)
+        }
+
+    def test_objective_change_reuses_model(self):
+        """Test that another objective clones the cached model and solves the same."""
+        cache = ModelCache(max_models=2)
+        self._engine("minimize_cost", cache).solve()
+        cached_engine = self._engine("maximize_fairness", cache)
+        cached = cached_engine.solve()
+        built = self._engine("maximize_fairness", None).solve()
+
+        assert len(cache) == 1
+        assert cached[0]["score"] == built[0]["score"]
+        cached_model = next(iter(cache._models.values())).model.Proto()
+        assert not cached_model.objective.vars
+        assert not cached_model.solution_hint.vars
+
+    def test_cached_model_is_hinted_from_new_roster(self):
+        """Test that a cache hit hints auxiliary variables exactly like a fresh build."""
+        cache = ModelCache(max_models=2)
+        self._engine("minimize_cost", cache).solve()
+        hints = [("emp-0", f"shift-{day}") for day in range(4)] + [("emp-1", "shift-0")]
+
+        cached_engine = self._engine("balance", cache, hints=hints)
+        cached_engine.solve()
+        built_engine = self._engine("balance", None, hints=hints)
+        built_engine.solve()
+
+        hinted = self._hints_by_name(cached_engine)
+        assert hinted == self._hints_by_name(built_engine)
+        assert hinted["emp_0_minutes_to_day_3"] == 1920
+        assert hinted["hours_emp_0_day_0_overtime"] == 960
+        assert hinted["days_emp_0_day_0_excess"] == 1
+        assert hinted["days_emp_1_day_0_excess"] == 0
+
+    def test_structure_change_misses(self):
+        """Test that changed constraints build a new model."""
+        cache = ModelCache(max_models=2)
+        self._engine("minimize_cost", cache).solve()
+        self._engine("minimize_cost", cache, max_hours=24).solve()
+
+        assert len(cache) == 2
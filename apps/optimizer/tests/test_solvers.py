@@ -1,10 +1,29 @@
 """Tests for optimization solvers."""
+import itertools
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
 import pytest
+from ortools.sat.python import cp_model
 from src.models.employee_model import Employee
-from src.models.schedule_model import Shift
+from src.models.schedule_model import Schedule, Shift
 from src.models.constraint_model import Constraint
-from src.models.optimization_request import OptimizationRequest, OptimizationOptions
+from src.models.optimization_request import OptimizationRequest, OptimizationOptions, RepairRequest
+from src.solvers.conflict_graph import build_conflict_cliques
+from src.solvers.decomposition import find_components, is_decomposable
+from src.solvers.eligibility import Eligibility, availability_mask, compute_eligibility
+from src.solvers.feasibility import check_feasibility
+from src.solvers.optimization_engine import OptimizationEngine, calculate_metrics
+from src.solvers.problem_instance import compile_instance, compile_request
+from src.solvers.profiling import SolveProfile, add_profiling_hook, remove_profiling_hook
+from src.solvers.repair_solver import RepairSolver, neighbourhood_mask
+from src.solvers.rolling_horizon import carry_over_days
+from src.solvers.skill_index import SkillIndex, covers
 from src.solvers.schedule_solver import ScheduleSolver
+from src.solvers.solution_pool import SolutionPool, hamming_distance, unpack_values
+from src.solvers.symmetry import add_lex_greater_equal, employee_classes
 
 
 class TestScheduleSolver:
@@ -61,35 +80,980 @@ class TestScheduleSolver:
         assert result["status"] == "failed"
         assert "No shifts found" in result["message"]
     
-    def test_filter_shifts_by_date_range(self):
-        """Test filtering shifts by date range."""
-        solver = ScheduleSolver()
+    def test_compile_request_filters_shifts_by_date_range(self):
+        """Test that only shifts overlapping the date range are compiled."""
+        shift = {"department_id": "dept-1", "min_staffing": 1, "max_staffing": 1}
+        request = OptimizationRequest(
+            employees=[],
+            shifts=[
+                {**shift, "id": "shift-1", "start_time": "2024-01-15T09:00:00Z", "end_time": "2024-01-15T17:00:00Z"},
+                {**shift, "id": "shift-2", "start_time": "2024-02-15T09:00:00Z", "end_time": "2024-02-15T17:00:00Z"},
+            ],
+            constraints=[],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z"
+        )
+        
+        instance = compile_request(request)
         
+        assert instance.shift_ids == ["shift-1"]
+
+
+class TestEligibility:
+    """Tests for employee-shift eligibility."""
+
+    def _shift(self, shift_id="shift-1", skills=None):
+        return Shift(
+            id=shift_id,
+            department_id="dept-1",
+            required_skills=skills,
+            min_staffing=1,
+            max_staffing=1,
+            start_time="2024-01-01T09:00:00Z",  # Monday
+            end_time="2024-01-01T17:00:00Z"
+        )
+
+    def test_skill_mismatch_is_not_eligible(self):
+        """Test that employees without required skills get no variable."""
+        employees = [
+            Employee(id="emp-1", name="A", email="a@example.com", skills=[{"name": "nursing"}]),
+            Employee(id="emp-2", name="B", email="b@example.com", skills=[{"name": "cpr"}]),
+        ]
+
+        eligibility = compute_eligibility(compile_instance(employees, [self._shift(skills=["nursing"])]))
+
+        assert eligibility.pairs == [(0, 0)]
+        assert eligibility.employees_by_shift[0] == [0]
+        assert eligibility.density == 0.5
+
+    def test_availability_window_filters_pairs(self):
+        """Test that shifts outside availability windows are not eligible."""
+        employees = [
+            Employee(
+                id="emp-1", name="A", email="a@example.com",
+                availability_pattern={"windows": [{"dayOfWeek": 1, "startTime": "08:00", "endTime": "18:00"}]}
+            ),
+            Employee(
+                id="emp-2", name="B", email="b@example.com",
+                availability_pattern={"windows": [{"dayOfWeek": 2, "startTime": "08:00", "endTime": "18:00"}]}
+            ),
+        ]
+
+        eligibility = compute_eligibility(compile_instance(employees, [self._shift()]))
+
+        assert eligibility.is_eligible(0, 0)
+        assert not eligibility.is_eligible(1, 0)
+
+    def test_availability_constraint_applies_to_every_employee(self):
+        """Test that availability constraints intersect with personal patterns."""
+        employees = [
+            Employee(id="emp-1", name="A", email="a@example.com"),
+            Employee(
+                id="emp-2", name="B", email="b@example.com",
+                availability_pattern={"windows": [{"dayOfWeek": 1, "startTime": "12:00", "endTime": "20:00"}]}
+            ),
+        ]
+        shifts = [
+            self._shift(),
+            Shift(id="shift-2", department_id="dept-1", min_staffing=1, max_staffing=1,
+                  start_time="2024-01-01T13:00:00Z", end_time="2024-01-01T19:00:00Z"),
+        ]
+        constraint = Constraint(id="avail", type="availability", rules={"availabilityWindows": [
+            {"dayOfWeek": 1, "startTime": "08:00", "endTime": "13:00"},
+            {"dayOfWeek": 1, "startTime": "13:00", "endTime": "19:00"},
+        ]})
+
+        eligibility = compute_eligibility(compile_instance(employees, shifts), constraints=[constraint])
+
+        assert eligibility.pairs == [(0, 0), (0, 1), (1, 1)]
+
+    def test_overnight_window_wraps_into_sunday(self):
+        """Test that a Saturday night window covers early Sunday minutes."""
+        mask = availability_mask([{"dayOfWeek": 6, "startTime": "22:00", "endTime": "06:00"}])
+        employees = [
+            Employee(id="emp-1", name="A", email="a@example.com",
+                     availability_pattern={"windows": [{"dayOfWeek": 6, "startTime": "22:00", "endTime": "06:00"}]}),
+        ]
         shifts = [
-            Shift(
-                id="shift-1",
-                department_id="dept-1",
-                min_staffing=1,
-                max_staffing=1,
-                start_time="2024-01-15T09:00:00Z",
-                end_time="2024-01-15T17:00:00Z"
+            Shift(id="sunday-early", department_id="dept-1", min_staffing=1, max_staffing=1,
+                  start_time="2024-01-07T01:00:00Z", end_time="2024-01-07T05:00:00Z"),
+            Shift(id="saturday-night", department_id="dept-1", min_staffing=1, max_staffing=1,
+                  start_time="2024-01-06T23:00:00Z", end_time="2024-01-07T06:00:00Z"),
+            Shift(id="sunday-day", department_id="dept-1", min_staffing=1, max_staffing=1,
+                  start_time="2024-01-07T05:00:00Z", end_time="2024-01-07T07:00:00Z"),
+        ]
+
+        eligibility = compute_eligibility(compile_instance(employees, shifts))
+
+        assert mask.sum() == 8 * 60 and mask[0] and mask[-1]
+        assert eligibility.pairs == [(0, 0), (0, 1)]
+
+    def test_pinned_and_blocked_schedules(self):
+        """Test that pins override skills and blocks remove pairs."""
+        employees = [
+            Employee(id="emp-1", name="A", email="a@example.com"),
+            Employee(id="emp-2", name="B", email="b@example.com", skills=[{"name": "nursing"}]),
+        ]
+        schedules = [
+            Schedule(
+                id="s-1", employee_id="emp-1", shift_id="shift-1", status="confirmed",
+                start_time="2024-01-01T09:00:00Z", end_time="2024-01-01T17:00:00Z",
+                metadata={"pinned": True}
             ),
-            Shift(
-                id="shift-2",
-                department_id="dept-1",
-                min_staffing=1,
-                max_staffing=1,
-                start_time="2024-02-15T09:00:00Z",
-                end_time="2024-02-15T17:00:00Z"
+            Schedule(
+                id="s-2", employee_id="emp-2", shift_id="shift-1", status="tentative",
+                start_time="2024-01-01T09:00:00Z", end_time="2024-01-01T17:00:00Z",
+                metadata={"blocked": True}
             ),
         ]
-        
-        filtered = solver._filter_shifts_by_date_range(
-            shifts,
-            "2024-01-01T00:00:00Z",
-            "2024-01-31T23:59:59Z"
+
+        instance = compile_instance(employees, [self._shift(skills=["nursing"])])
+        eligibility = compute_eligibility(instance, schedules)
+
+        assert eligibility.pairs == [(0, 0)]
+        assert eligibility.pinned == {(0, 0)}
+        # The pinned pair lacks the required skill
+        assert calculate_metrics(instance, [(0, 0)])["constraintViolations"] == 1
+        assert calculate_metrics(instance, [(1, 0)])["constraintViolations"] == 0
+
+
+class TestConflictGraph:
+    """Tests for the shift conflict graph."""
+
+    def _shift(self, shift_id, start, end):
+        return Shift(
+            id=shift_id,
+            department_id="dept-1",
+            min_staffing=0,
+            max_staffing=1,
+            start_time=start,
+            end_time=end
         )
-        
-        assert len(filtered) == 1
-        assert filtered[0].id == "shift-1"
 
+    def test_overlapping_shifts_conflict(self):
+        """Test that overlapping shifts share a clique without any rest rule."""
+        shifts = [
+            self._shift("a", "2024-01-01T08:00:00Z", "2024-01-01T16:00:00Z"),
+            self._shift("b", "2024-01-01T12:00:00Z", "2024-01-01T20:00:00Z"),
+            self._shift("c", "2024-01-01T20:00:00Z", "2024-01-02T04:00:00Z"),
+        ]
+
+        instance = compile_instance([], shifts)
+
+        assert build_conflict_cliques(instance.start_minutes, instance.end_minutes) == [[0, 1]]
+
+    def test_min_rest_groups_shifts_into_maximal_cliques(self):
+        """Test that short rest gaps are grouped into maximal cliques."""
+        shifts = [
+            self._shift("late", "2024-01-01T16:00:00Z", "2024-01-02T00:00:00Z"),
+            self._shift("early", "2024-01-02T06:00:00Z", "2024-01-02T14:00:00Z"),
+            self._shift("mid", "2024-01-02T10:00:00Z", "2024-01-02T18:00:00Z"),
+            self._shift("next", "2024-01-03T12:00:00Z", "2024-01-03T20:00:00Z"),
+        ]
+
+        instance = compile_instance([], shifts)
+
+        cliques = build_conflict_cliques(
+            instance.start_minutes, instance.end_minutes, min_rest_minutes=8 * 60
+        )
+
+        assert cliques == [[0, 1], [1, 2]]
+
+
+class TestProblemInstance:
+    """Tests for the compiled problem instance."""
+
+    def test_compile_request_filters_and_compiles_shifts(self):
+        """Test that compiling a request builds time, day and skill arrays."""
+        request = OptimizationRequest(
+            employees=[
+                {"id": "emp-1", "name": "A", "email": "a@example.com", "skills": [{"name": "nursing"}]},
+            ],
+            shifts=[
+                {
+                    "id": "shift-1", "department_id": "dept-2", "required_skills": ["nursing"],
+                    "min_staffing": 1, "max_staffing": 1,
+                    "start_time": "2024-01-01T22:00:00Z", "end_time": "2024-01-02T06:00:00Z"
+                },
+                {
+                    "id": "shift-2", "department_id": "dept-1", "required_skills": ["cpr"],
+                    "min_staffing": 1, "max_staffing": 1,
+                    "start_time": "2024-01-03T09:00:00Z", "end_time": "2024-01-03T13:30:00Z"
+                },
+                {
+                    "id": "shift-3", "department_id": "dept-1",
+                    "min_staffing": 1, "max_staffing": 1,
+                    "start_time": "2024-03-01T09:00:00Z", "end_time": "2024-03-01T17:00:00Z"
+                },
+            ],
+            constraints=[],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z"
+        )
+
+        instance = compile_request(request)
+
+        assert instance.shift_ids == ["shift-1", "shift-2"]
+        assert instance.duration_minutes.tolist() == [480, 270]
+        assert instance.day_index.tolist() == [0, 2]
+        assert instance.num_days == 3
+        assert [instance.departments[i] for i in instance.department_index] == ["dept-2", "dept-1"]
+        assert instance.skill_eligibility().tolist() == [[True, False]]
+
+    def test_days_are_counted_in_local_time(self):
+        """Test that an evening shift west of UTC stays on its local day."""
+        request = OptimizationRequest(
+            employees=[{"id": "emp-1", "name": "A", "email": "a@example.com"}],
+            shifts=[
+                {"id": "mon-evening", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                 "start_time": "2024-01-01T19:00:00-05:00", "end_time": "2024-01-01T23:00:00-05:00"},
+                {"id": "tue-day", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                 "start_time": "2024-01-02T09:00:00-05:00", "end_time": "2024-01-02T17:00:00-05:00"},
+            ],
+            constraints=[{"id": "daily", "type": "max_hours", "rules": {"maxHoursPerDay": 10}}],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"maxOptimizationTime": 5, "solutionCount": 1}
+        )
+
+        instance = compile_request(request)
+        result = ScheduleSolver().solve(request)
+
+        # Monday 19:00 at -05:00 is Tuesday 00:00 UTC
+        assert instance.day_index.tolist() == [0, 1]
+        assert instance.num_days == 2
+        assert result["status"] == "completed"
+
+
+class TestSkillIndex:
+    """Tests for interned skill bitsets."""
+
+    def test_pack_and_cover_across_words(self):
+        """Test bitsets spanning several words and the deduplicated cover test."""
+        index = SkillIndex(["icu", "er"] + [f"skill-{i}" for i in range(70)])
+        held = index.pack([["icu", "skill-69"], [], ["icu", "skill-69"]])
+        required = index.pack([["skill-69"], [], ["icu", "er"]])
+
+        assert index.num_words == 2
+        assert index.names_of(held[0]) == ["icu", "skill-69"]
+        assert index.column(held, index.ids["skill-69"]).tolist() == [True, False, True]
+        assert covers(held, required).tolist() == [
+            [True, True, False], [False, True, False], [True, True, False]
+        ]
+
+
+class TestSolutionPool:
+    """Tests for the diverse solution pool."""
+
+    def test_keeps_best_solutions_best_first(self):
+        """Only the best ``capacity`` solutions survive, ordered by objective."""
+        pool = SolutionPool(capacity=2)
+
+        assert pool.offer(30.0, np.array([1, 0, 0, 0, 0]))
+        assert pool.offer(20.0, np.array([0, 1, 0, 0, 0]))
+        assert pool.offer(10.0, np.array([0, 0, 1, 0, 0]))
+        assert not pool.offer(40.0, np.array([0, 0, 0, 1, 0]))
+
+        best = pool.best()
+        assert [entry.objective for entry in best] == [10.0, 20.0]
+        assert unpack_values(best[0].bits, 5).tolist() == [False, False, True, False, False]
+
+    def test_near_duplicates_keep_the_better_solution(self):
+        """A solution within ``min_distance`` of a pooled one replaces it only if better."""
+        pool = SolutionPool(capacity=3, min_distance=2)
+
+        assert pool.offer(20.0, np.array([1, 1, 0, 0]))
+        assert not pool.offer(25.0, np.array([1, 0, 0, 0]))
+        assert pool.offer(15.0, np.array([1, 1, 1, 0]))
+
+        best = pool.best()
+        assert len(best) == 1
+        assert best[0].objective == 15.0
+        assert hamming_distance(best[0].bits, np.packbits([1, 1, 0, 0])) == 1
+
+
+class TestRepairSolver:
+    """Tests for incremental repair."""
+
+    def test_neighbourhood_covers_shifts_near_the_change(self):
+        """Test that only shifts within the radius of an affected shift are freed."""
+        day = 24 * 60
+        starts = np.array([0, day, 2 * day, 5 * day])
+        ends = starts + 8 * 60
+        affected = np.array([False, True, False, False])
+
+        free = neighbourhood_mask(starts, ends, affected, radius_minutes=day)
+
+        assert free.tolist() == [True, True, True, False]
+
+    def test_removed_employee_is_replaced_and_distant_shifts_stay_fixed(self):
+        """Test that a repair only re-assigns shifts near the removed employee's."""
+        shifts = [
+            {
+                "id": f"shift-{day}", "department_id": "dept-1",
+                "min_staffing": 1, "max_staffing": 1,
+                "start_time": f"2024-01-{day:02d}T09:00:00Z",
+                "end_time": f"2024-01-{day:02d}T17:00:00Z"
+            }
+            for day in (1, 10, 20)
+        ]
+        request = RepairRequest(
+            employees=[
+                {"id": f"emp-{i}", "name": f"Employee {i}", "email": f"emp{i}@example.com"}
+                for i in range(3)
+            ],
+            shifts=shifts,
+            constraints=[],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"objective": "maximize_fairness", "maxOptimizationTime": 5, "solutionCount": 1},
+            assignments=[
+                {"employeeId": "emp-0", "shiftId": "shift-1"},
+                {"employeeId": "emp-1", "shiftId": "shift-10"},
+                {"employeeId": "emp-1", "shiftId": "shift-20"},
+            ],
+            removedEmployees=["emp-0"],
+            neighbourhoodHours=24
+        )
+
+        result = RepairSolver().solve(request)
+
+        assert result["status"] == "completed"
+        assert result["repair"] == {"affectedShifts": ["shift-1"], "freeShifts": 1, "frozenShifts": 2}
+        assigned = {a["shiftId"]: a["employeeId"] for a in result["solutions"][0]["assignments"]}
+        # emp-1 keeps both fixed shifts even though emp-2 would be fairer
+        assert assigned == {"shift-1": "emp-2", "shift-10": "emp-1", "shift-20": "emp-1"}
+
+
+class TestDecomposition:
+    """Tests for splitting requests into independent components."""
+
+    @staticmethod
+    def _request(objective):
+        return OptimizationRequest(
+            employees=[
+                {"id": f"emp-{dept}-{i}", "name": f"Employee {i}", "email": f"{dept}{i}@example.com",
+                 "skills": [{"name": dept}]}
+                for dept in ("icu", "er") for i in range(2)
+            ],
+            shifts=[
+                {"id": f"shift-{dept}-{day}", "department_id": dept, "required_skills": [dept],
+                 "min_staffing": 1, "max_staffing": 1,
+                 "start_time": f"2024-01-0{day}T09:00:00Z", "end_time": f"2024-01-0{day}T17:00:00Z"}
+                for dept in ("icu", "er") for day in (1, 2)
+            ],
+            constraints=[],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"objective": objective, "maxOptimizationTime": 5, "solutionCount": 1}
+        )
+
+    def test_departments_without_shared_employees_are_components(self):
+        """Test union-find over eligible pairs."""
+        instance = compile_request(self._request("balance"))
+
+        components = find_components(compute_eligibility(instance))
+
+        assert len(components) == 2
+        assert sorted(
+            [instance.shift_ids[idx] for idx in component.shifts] for component in components
+        ) == [["shift-er-1", "shift-er-2"], ["shift-icu-1", "shift-icu-2"]]
+
+    def test_eligibility_is_split_between_components_and_reused(self):
+        """Test that engines reuse the eligibility computed for the feasibility pre-check."""
+        request = self._request("balance")
+        instance = compile_request(request)
+        eligibility = compute_eligibility(instance)
+
+        for component in find_components(eligibility):
+            sub_instance = instance.subset(component.employees, component.shifts)
+            split = eligibility.subset(component.employees, component.shifts)
+            assert split.pairs == compute_eligibility(sub_instance).pairs
+
+        engine = OptimizationEngine(
+            employees=instance.employees, shifts=instance.shifts, constraints=[], current_schedules=[],
+            options=request.get_options(), instance=instance, eligibility=eligibility
+        )
+        assert engine.solve()
+        assert engine.eligibility is eligibility
+
+    def test_components_are_solved_and_merged(self):
+        """Test that a decomposed solve returns one roster covering every component."""
+        request = self._request("balance")
+        incumbents = []
+
+        result = ScheduleSolver().solve(request, on_solution=incumbents.append)
+
+        solution = result["solutions"][0]
+        assert result["status"] == "completed"
+        assert solution["score"] == 4 * 480
+        assert sorted(a["shiftId"] for a in solution["assignments"]) == sorted(
+            shift["id"] for shift in request.shifts
+        )
+        assert solution["metrics"]["coverage"] == 1
+        assert len(incumbents[-1]["assignments"]) == 4
+        assert not is_decomposable(OptimizationOptions(objective="maximize_fairness"), [])
+
+    def test_components_share_the_time_limit(self):
+        """Test that components queued behind busy workers don't each get the full time limit."""
+        departments = ("icu", "er", "ward")
+        request = OptimizationRequest(
+            employees=[
+                {"id": f"emp-{dept}-{i}", "name": f"Employee {i}", "email": f"{dept}{i}@example.com",
+                 "skills": [{"name": dept}], "metadata": {"hourlyRate": 20 + 7 * i % 13}}
+                for dept in departments for i in range(4)
+            ],
+            shifts=[
+                {"id": f"shift-{dept}-{day}-{hour}", "department_id": dept, "required_skills": [dept],
+                 "min_staffing": 1, "max_staffing": 4,
+                 "start_time": f"2024-01-{day:02d}T{hour:02d}:00:00Z",
+                 "end_time": f"2024-01-{day:02d}T{hour + 7:02d}:00:00Z"}
+                for dept in departments for day in range(1, 8) for hour in (0, 8, 16)
+            ],
+            constraints=[
+                {"id": "rest", "type": "min_rest", "rules": {"minRestHours": 11}},
+                {"id": "hours", "type": "max_hours", "rules": {"maxHours": 42, "periodInDays": 7}},
+                {"id": "run", "type": "max_consecutive_days", "rules": {"maxDays": 4}},
+            ],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"objective": "balance", "maxOptimizationTime": 2, "solutionCount": 1}
+        )
+
+        started = time.time()
+        result = ScheduleSolver(num_workers=1).solve(request)
+
+        assert result["status"] == "completed"
+        assert result["profile"]["model"]["models"] == 3
+        assert time.time() - started < 3
+
+
+class TestRollingHorizon:
+    """Tests for rolling-horizon solving."""
+
+    def test_carry_over_covers_rest_and_max_hours_periods(self):
+        """Test how many committed days are frozen into each window."""
+        constraints = [
+            Constraint(id="rest", type="min_rest", rules={"minRestHours": 11}),
+            Constraint(id="hours", type="max_hours", rules={"maxHours": 40, "periodInDays": 7}),
+        ]
+
+        assert carry_over_days([]) == 1
+        assert carry_over_days(constraints[:1]) == 2
+        assert carry_over_days(constraints) == 7
+
+    def test_min_rest_holds_across_window_boundaries(self):
+        """Test that windows commit a full roster that respects rest between windows."""
+        shifts = [
+            {
+                "id": f"shift-{day}-{slot}", "department_id": "dept-1",
+                "min_staffing": 1, "max_staffing": 1,
+                "start_time": f"2024-01-{day:02d}T{hour:02d}:00:00Z",
+                "end_time": f"2024-01-{day:02d}T{hour + 8:02d}:00:00Z"
+            }
+            for day in range(1, 11) for slot, hour in enumerate((6, 14))
+        ]
+        request = OptimizationRequest(
+            employees=[
+                {"id": f"emp-{i}", "name": f"Employee {i}", "email": f"emp{i}@example.com"}
+                for i in range(2)
+            ],
+            shifts=shifts,
+            constraints=[{"id": "rest", "type": "min_rest", "rules": {"minRestHours": 12}}],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"maxOptimizationTime": 10, "rollingWindowDays": 3, "rollingOverlapDays": 0}
+        )
+
+        result = ScheduleSolver().solve(request)
+
+        assignments = result["solutions"][0]["assignments"]
+        assert result["status"] == "completed"
+        assert sorted(a["shiftId"] for a in assignments) == sorted(s["id"] for s in shifts)
+        by_employee = {}
+        for assignment in assignments:
+            by_employee.setdefault(assignment["employeeId"], []).append(assignment)
+        for worked in by_employee.values():
+            worked.sort(key=lambda a: a["startTime"])
+            for previous, following in zip(worked, worked[1:]):
+                rest = (
+                    datetime.fromisoformat(following["startTime"].replace("Z", "+00:00"))
+                    - datetime.fromisoformat(previous["endTime"].replace("Z", "+00:00"))
+                )
+                assert rest.total_seconds() >= 12 * 3600
+
+    def test_stopped_solve_returns_partial_roster(self):
+        """Test that stopping a rolling solve keeps the windows solved so far."""
+        shifts = [
+            {
+                "id": f"shift-{day}", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                "start_time": f"2024-01-{day:02d}T09:00:00Z", "end_time": f"2024-01-{day:02d}T17:00:00Z"
+            }
+            for day in range(1, 13)
+        ]
+        request = OptimizationRequest(
+            employees=[{"id": "emp-1", "name": "Employee 1", "email": "emp1@example.com"}],
+            shifts=shifts,
+            constraints=[],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"maxOptimizationTime": 10, "rollingWindowDays": 3, "rollingOverlapDays": 1}
+        )
+        stop_event = threading.Event()
+
+        def stop_in_second_window(event):
+            if event["window"] == 1:
+                stop_event.set()
+
+        result = ScheduleSolver().solve(request, stop_event=stop_event, on_solution=stop_in_second_window)
+
+        solution = result["solutions"][0]
+        assert result["status"] == "partial"
+        assert solution["partial"] is True
+        assert (solution["windowsSolved"], solution["windows"]) == (2, 4)
+        # Two committed windows plus the overlap day of the stopped one
+        assert sorted(a["shiftId"] for a in solution["assignments"]) == [f"shift-{day}" for day in range(1, 8)]
+
+    def test_window_without_solution_keeps_partial_message(self):
+        """Test that a partial roster is not replaced by an infeasibility diagnosis."""
+        shifts = [
+            {
+                "id": f"shift-{day}", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                "start_time": f"2024-01-{day:02d}T09:00:00Z", "end_time": f"2024-01-{day:02d}T17:00:00Z"
+            }
+            for day in range(1, 10)
+        ]
+        request = OptimizationRequest(
+            employees=[{"id": "emp-1", "name": "Employee 1", "email": "emp1@example.com"}],
+            shifts=shifts,
+            constraints=[{"id": "run", "type": "max_consecutive_days", "rules": {"maxDays": 3}}],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"maxOptimizationTime": 10, "rollingWindowDays": 3, "rollingOverlapDays": 0}
+        )
+
+        result = ScheduleSolver().solve(request)
+
+        solution = result["solutions"][0]
+        assert result["status"] == "partial"
+        assert result["message"].startswith("Stopped after 1 of 3 rolling windows")
+        assert "conflictingConstraints" not in result
+        assert sorted(a["shiftId"] for a in solution["assignments"]) == ["shift-1", "shift-2", "shift-3"]
+
+
+class TestProfiling:
+    """Tests for per-phase timings and model statistics of a solve."""
+
+    def test_result_carries_phases_model_size_and_search_stats(self):
+        """Test the profile of a single-model solve."""
+        request = TestDecomposition._request("maximize_fairness")
+        reported = []
+        hook = lambda phase, ms: reported.append(phase)
+        add_profiling_hook(hook)
+        try:
+            result = ScheduleSolver().solve(request)
+        finally:
+            remove_profiling_hook(hook)
+
+        profile = result["profile"]
+        assert result["status"] == "completed"
+        assert {"parse", "date_filter", "compile", "feasibility", "eligibility", "variables",
+                "constraints.staffing", "hints", "objective", "search", "extraction"} <= set(profile["phases"])
+        assert set(reported) == set(profile["phases"])
+        assert profile["model"]["models"] == 1
+        assert profile["model"]["variables"] >= 8
+        assert profile["model"]["constraints"] > 0
+        assert profile["search"]["status"] == "OPTIMAL"
+        assert profile["search"]["objective"] == result["solutions"][0]["score"]
+        assert profile["search"]["gap"] == 0
+        assert result["totalSolveTime"] >= profile["phases"]["search"]
+
+    def test_components_sum_model_statistics(self):
+        """Test that a decomposed solve reports every component's model."""
+        result = ScheduleSolver().solve(TestDecomposition._request("balance"))
+
+        search = result["profile"]["search"]
+        assert result["profile"]["model"]["models"] == 2
+        assert search["bound"] == search["objective"] == result["solutions"][0]["score"]
+
+    def test_phases_accumulate(self):
+        """Test that a phase entered twice adds up its time."""
+        profile = SolveProfile()
+        for _ in range(2):
+            with profile.phase("search"):
+                pass
+
+        summary = profile.as_dict()
+        assert list(summary["phases"]) == ["search"]
+        assert summary["search"]["status"] is None
+        assert summary["search"]["bound"] is None
+
+
+class TestFeasibility:
+    """Tests for the polynomial feasibility pre-check."""
+
+    @staticmethod
+    def _request(shifts, constraints=None, nurses=1, porters=1):
+        return OptimizationRequest(
+            employees=[
+                {"id": f"emp-{skill}-{i}", "name": f"Employee {i}", "email": f"{skill}{i}@example.com",
+                 "skills": [{"name": skill}]}
+                for skill, count in (("nursing", nurses), ("portering", porters)) for i in range(count)
+            ],
+            shifts=[
+                {"department_id": "dept-1", "max_staffing": 3, **shift} for shift in shifts
+            ],
+            constraints=constraints or [],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"maxOptimizationTime": 5}
+        )
+
+    @staticmethod
+    def _issues(request):
+        instance = compile_request(request)
+        return check_feasibility(instance, compute_eligibility(instance), request.get_constraints())
+
+    def test_shift_without_enough_qualified_employees(self):
+        """Test that a shift needing more qualified staff than exist names the skill."""
+        request = self._request([
+            {"id": "shift-1", "required_skills": ["nursing"], "min_staffing": 2,
+             "start_time": "2024-01-01T09:00:00Z", "end_time": "2024-01-01T17:00:00Z"},
+        ])
+
+        issues = self._issues(request)
+
+        assert [issue["check"] for issue in issues] == ["qualified_headcount"]
+        assert issues[0]["shiftIds"] == ["shift-1"]
+        assert issues[0]["skills"] == ["nursing"]
+        assert (issues[0]["required"], issues[0]["available"]) == (2, 1)
+
+    def test_conflicting_shifts_competing_for_the_same_employees(self):
+        """Test that overlapping shifts cannot share one qualified employee."""
+        request = self._request([
+            {"id": "shift-day", "required_skills": ["nursing"], "min_staffing": 1,
+             "start_time": "2024-01-01T09:00:00Z", "end_time": "2024-01-01T17:00:00Z"},
+            {"id": "shift-late", "required_skills": ["nursing"], "min_staffing": 1,
+             "start_time": "2024-01-01T13:00:00Z", "end_time": "2024-01-01T21:00:00Z"},
+            {"id": "shift-porter", "required_skills": ["portering"], "min_staffing": 1,
+             "start_time": "2024-01-01T09:00:00Z", "end_time": "2024-01-01T17:00:00Z"},
+        ])
+
+        issues = self._issues(request)
+
+        assert [issue["check"] for issue in issues] == ["concurrent_demand"]
+        assert set(issues[0]["shiftIds"]) == {"shift-day", "shift-late", "shift-porter"}
+        assert issues[0]["skills"] == ["nursing"]
+        assert (issues[0]["required"], issues[0]["available"]) == (3, 2)
+        assert self._issues(self._request(
+            [{**shift, "min_staffing": 0} if shift["id"] == "shift-late" else shift
+             for shift in request.shifts]
+        )) == []
+
+    def test_long_augmenting_paths_do_not_recurse(self):
+        """Test concurrent demand whose augmenting paths are longer than the recursion limit."""
+        size = 1100
+        employees = [Employee(id=f"emp-{i}", name=f"Employee {i}", email=f"emp{i}@example.com") for i in range(size)]
+        shifts = [
+            Shift(id=f"shift-{i:04d}", department_id="dept-1", min_staffing=1, max_staffing=1,
+                  start_time="2024-01-01T09:00:00Z", end_time="2024-01-01T17:00:00Z")
+            for i in range(size + 1)
+        ]
+        # Employee i can work shifts i and i + 1, so shift i + 1 has to move every earlier employee
+        pairs = [(i, i) for i in range(size)] + [(i, i + 1) for i in range(size)]
+        instance = compile_instance(employees, shifts)
+
+        issues = check_feasibility(instance, Eligibility(size, size + 1, pairs, set()), [])
+
+        assert [issue["check"] for issue in issues] == ["concurrent_demand"]
+        assert (issues[0]["required"], issues[0]["available"]) == (size + 1, size)
+
+    def test_max_hours_capacity_per_skill(self):
+        """Test that staffed hours needing a skill must fit its max-hours capacity."""
+        request = self._request(
+            [
+                {"id": f"shift-{day}", "required_skills": ["nursing"], "min_staffing": 1,
+                 "start_time": f"2024-01-0{day}T09:00:00Z", "end_time": f"2024-01-0{day}T17:00:00Z"}
+                for day in range(1, 7)
+            ],
+            constraints=[{"id": "hours", "type": "max_hours", "rules": {"maxHours": 40, "periodInDays": 7}}],
+        )
+
+        issues = self._issues(request)
+
+        assert [issue["check"] for issue in issues] == ["hours_capacity"]
+        assert issues[0]["skills"] == ["nursing"]
+        assert (issues[0]["required"], issues[0]["available"]) == (48, 40)
+
+    def test_solver_fails_fast_with_the_bottleneck(self):
+        """Test that the solver returns the pre-check issues without searching."""
+        request = self._request([
+            {"id": "shift-1", "required_skills": ["nursing"], "min_staffing": 2,
+             "start_time": "2024-01-01T09:00:00Z", "end_time": "2024-01-01T17:00:00Z"},
+        ])
+
+        result = ScheduleSolver().solve(request)
+
+        assert result["status"] == "failed"
+        assert "shift-1" in result["message"] and "nursing" in result["message"]
+        assert result["infeasibility"][0]["check"] == "qualified_headcount"
+
+
+def _rest_and_hours_request(soft_priority_threshold=0):
+    """Three shifts two employees cannot cover under both max_hours and min_rest.
+
+    Rest keeps whoever works the late shift off both day shifts, which
+    together take 17 hours; fair distribution plays no part.
+    """
+    shifts = [
+        ("shift-a", "2024-01-01T09:00:00Z", "2024-01-01T17:00:00Z"),
+        ("shift-b", "2024-01-01T20:00:00Z", "2024-01-02T04:00:00Z"),
+        ("shift-c", "2024-01-02T09:00:00Z", "2024-01-02T18:00:00Z"),
+    ]
+    return OptimizationRequest(
+        employees=[
+            {"id": f"emp-{i}", "name": f"Employee {i}", "email": f"emp{i}@example.com"}
+            for i in range(2)
+        ],
+        shifts=[
+            {"id": shift_id, "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+             "start_time": start, "end_time": end}
+            for shift_id, start, end in shifts
+        ],
+        constraints=[
+            {"id": "hours", "type": "max_hours", "rules": {"maxHours": 16, "periodInDays": 7}, "priority": 1},
+            {"id": "rest", "type": "min_rest", "rules": {"minRestHours": 11}, "priority": 2},
+            {"id": "fair", "type": "fair_distribution", "rules": {}},
+        ],
+        startDate="2024-01-01T00:00:00Z",
+        endDate="2024-01-31T23:59:59Z",
+        options={"maxOptimizationTime": 10, "softPriorityThreshold": soft_priority_threshold}
+    )
+
+
+class TestMaxHours:
+    """Tests for rolling-period max_hours constraints."""
+
+    @staticmethod
+    def _request(days, rules, employees=1, hours=((9, 17),)):
+        return OptimizationRequest(
+            employees=[
+                {"id": f"emp-{i}", "name": f"Employee {i}", "email": f"emp{i}@example.com"}
+                for i in range(employees)
+            ],
+            shifts=[
+                {"id": f"shift-{day}-{start}", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                 "start_time": f"2024-01-{day:02d}T{start:02d}:00:00Z",
+                 "end_time": f"2024-01-{day:02d}T{end:02d}:00:00Z"}
+                for day in days for start, end in hours
+            ],
+            constraints=[{"id": "hours", "type": "max_hours", "rules": rules}],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"maxOptimizationTime": 10, "solutionCount": 1}
+        )
+
+    def test_limit_applies_per_rolling_period(self):
+        """Test that 40 hours per 7 days allows two working weeks in a fortnight."""
+        request = self._request([1, 2, 3, 4, 5, 8, 9, 10, 11, 12], {"maxHours": 40, "periodInDays": 7})
+
+        result = ScheduleSolver().solve(request)
+
+        assert result["status"] == "completed"
+        assert len(result["solutions"][0]["assignments"]) == 10
+
+    def test_every_window_is_capped(self):
+        """Test that a 7-day window straddling two weeks is capped too."""
+        request = self._request(
+            [1, 2, 3, 4, 5, 6, 9, 10], {"maxHours": 40, "periodInDays": 7}, employees=2
+        )
+
+        result = ScheduleSolver().solve(request)
+
+        worked = {}
+        for assignment in result["solutions"][0]["assignments"]:
+            worked.setdefault(assignment["employeeId"], []).append(int(assignment["shiftId"].split("-")[1]))
+        for days in worked.values():
+            assert all(sum(first <= day < first + 7 for day in days) <= 5 for first in range(1, 11))
+
+    def test_daily_and_weekly_limits(self):
+        """Test maxHoursPerDay and maxHoursPerWeek."""
+        split_day = self._request([1], {"maxHoursPerDay": 10}, employees=2, hours=((6, 12), (14, 20)))
+        long_week = self._request(range(1, 7), {"maxHoursPerWeek": 40})
+
+        result = ScheduleSolver().solve(split_day)
+
+        assert result["status"] == "completed"
+        assert len({a["employeeId"] for a in result["solutions"][0]["assignments"]}) == 2
+        assert ScheduleSolver().solve(long_week)["status"] == "failed"
+
+
+class TestConsecutiveDays:
+    """Tests for max/min consecutive working days."""
+
+    @staticmethod
+    def _request(num_days, constraint, employees=2):
+        return OptimizationRequest(
+            employees=[
+                {"id": f"emp-{i}", "name": f"Employee {i}", "email": f"emp{i}@example.com"}
+                for i in range(employees)
+            ],
+            shifts=[
+                {"id": f"shift-{day}", "department_id": "dept-1", "min_staffing": 1, "max_staffing": 1,
+                 "start_time": f"2024-01-{day:02d}T09:00:00Z", "end_time": f"2024-01-{day:02d}T17:00:00Z"}
+                for day in range(1, num_days + 1)
+            ],
+            constraints=[constraint],
+            startDate="2024-01-01T00:00:00Z",
+            endDate="2024-01-31T23:59:59Z",
+            options={"maxOptimizationTime": 10, "solutionCount": 1, "objective": "maximize_fairness"}
+        )
+
+    @staticmethod
+    def _runs(solution):
+        """Lengths of the runs of working days per employee, with their first day."""
+        days = {}
+        for assignment in solution["assignments"]:
+            days.setdefault(assignment["employeeId"], []).append(int(assignment["shiftId"].split("-")[1]))
+        runs = []
+        for worked in days.values():
+            worked.sort()
+            start = worked[0]
+            for previous, day in zip(worked, worked[1:] + [None]):
+                if day is None or day != previous + 1:
+                    runs.append((start, previous - start + 1))
+                    start = day
+        return runs
+
+    def test_max_consecutive_days(self):
+        """Test that no employee works more than maxDays days in a row."""
+        request = self._request(10, {"id": "max-run", "type": "max_consecutive_days", "rules": {"maxDays": 2}})
+
+        result = ScheduleSolver().solve(request)
+
+        assert result["status"] == "completed"
+        assert max(length for _, length in self._runs(result["solutions"][0])) <= 2
+        single = self._request(5, request.constraints[0], employees=1)
+        assert ScheduleSolver().solve(single)["conflictingConstraints"] == ["staffing", "max-run"]
+
+    def test_min_consecutive_days(self):
+        """Test that runs inside the horizon last at least minDays days."""
+        request = self._request(10, {"id": "min-run", "type": "min_consecutive_days", "rules": {"minDays": 3}})
+
+        result = ScheduleSolver().solve(request)
+
+        assert result["status"] == "completed"
+        runs = self._runs(result["solutions"][0])
+        assert all(length >= 3 for start, length in runs if start > 1 and start + length <= 10)
+
+
+class TestInfeasibilityDiagnosis:
+    """Tests for naming conflicting constraints with assumption literals."""
+
+    def test_minimal_conflicting_constraints_are_reported(self):
+        """Test that only the constraints needed for infeasibility are named."""
+        result = ScheduleSolver().solve(_rest_and_hours_request())
+
+        assert result["status"] == "failed"
+        assert result["conflictingConstraints"] == ["staffing", "hours", "rest"]
+        assert "hours" in result["message"]
+
+
+class TestSoftConstraints:
+    """Tests for priority-weighted soft constraints."""
+
+    def test_low_priority_constraint_is_relaxed_and_reported(self):
+        """Test that a soft constraint is violated instead of failing the solve."""
+        result = ScheduleSolver().solve(_rest_and_hours_request(soft_priority_threshold=2))
+
+        solution = result["solutions"][0]
+        assert result["status"] == "completed"
+        assert solution["metrics"]["constraintViolations"] == 1
+        assert "violations" in result["profile"]["phases"]
+        # Rest still holds: the late shift is worked alone
+        late = [a["employeeId"] for a in solution["assignments"] if a["shiftId"] == "shift-b"]
+        assert sum(a["employeeId"] == late[0] for a in solution["assignments"]) == 1
+
+    def test_least_violation_roster_is_kept_when_stopped(self):
+        """Test that the roster of the violation search is returned if the objective search is stopped."""
+        stop_event = threading.Event()
+        incumbents = []
+
+        def stop_after_violations(phase, ms):
+            if phase == "violations":
+                stop_event.set()
+
+        add_profiling_hook(stop_after_violations)
+        try:
+            result = ScheduleSolver().solve(
+                _rest_and_hours_request(soft_priority_threshold=2), stop_event=stop_event, on_solution=incumbents.append
+            )
+        finally:
+            remove_profiling_hook(stop_after_violations)
+
+        assert result["status"] == "completed"
+        assert result["solutions"][0]["metrics"]["constraintViolations"] == 1
+        assert len(incumbents) == 1
+
+    def test_higher_priority_soft_constraint_is_violated_last(self):
+        """Test that violations are weighted by priority."""
+        result = ScheduleSolver().solve(_rest_and_hours_request(soft_priority_threshold=3))
+
+        solution = result["solutions"][0]
+        worked = {}
+        for assignment in solution["assignments"]:
+            worked.setdefault(assignment["employeeId"], []).append(assignment["shiftId"])
+        # Overtime (priority 1) is cheaper than missing rest (priority 2)
+        assert sorted(sorted(shifts) for shifts in worked.values()) == [["shift-a", "shift-c"], ["shift-b"]]
+        assert solution["metrics"]["constraintViolations"] == 1
+
+    def test_all_soft_request_is_solved_like_hard(self):
+        """Test that soft constraints that can all hold are solved without searching violations."""
+        request = _rest_and_hours_request(soft_priority_threshold=3)
+        request.employees.append({"id": "emp-2", "name": "Employee 2", "email": "emp2@example.com"})
+        request.options["maxOptimizationTime"] = 30
+
+        result = ScheduleSolver().solve(request)
+
+        assert result["status"] == "completed"
+        assert result["solutions"][0]["metrics"]["constraintViolations"] == 0
+        assert "violations" not in result["profile"]["phases"]
+        assert result["totalSolveTime"] < 5000
+
+
+class TestSymmetry:
+    """Tests for employee equivalence classes and symmetry breaking."""
+
+    def test_classes_group_employees_with_identical_eligibility(self):
+        """Test that only unexcluded employees with the same eligible shifts are grouped."""
+        instance = compile_instance(
+            [
+                Employee(id=f"emp-{i}", name=f"Employee {i}", email=f"emp{i}@example.com",
+                         skills=[{"name": skill}])
+                for i, skill in enumerate(["nursing", "nursing", "cpr", "nursing", "cpr"])
+            ],
+            [
+                Shift(id=f"shift-{skill}", department_id="dept-1", required_skills=[skill],
+                      min_staffing=1, max_staffing=1,
+                      start_time="2024-01-01T09:00:00Z", end_time="2024-01-01T17:00:00Z")
+                for skill in ("nursing", "cpr")
+            ]
+        )
+
+        classes = employee_classes(compute_eligibility(instance), excluded={3})
+
+        assert sorted(classes) == [[0, 1], [2, 4]]
+
+    def test_lex_constraint_keeps_exactly_ordered_rows(self):
+        """Test the lexicographic encoding against every pair of 3-bit rows."""
+        model = cp_model.CpModel()
+        left = [model.NewBoolVar(f"l{i}") for i in range(3)]
+        right = [model.NewBoolVar(f"r{i}") for i in range(3)]
+        add_lex_greater_equal(model, left, right)
+
+        for left_bits, right_bits in itertools.product(itertools.product([0, 1], repeat=3), repeat=2):
+            fixed = model.Clone()
+            for var, value in zip(left + right, left_bits + right_bits):
+                fixed.Add(fixed.GetBoolVarFromProtoIndex(var.Index()) == value)
+            status = cp_model.CpSolver().Solve(fixed)
+            assert (status == cp_model.OPTIMAL) == (left_bits >= right_bits)